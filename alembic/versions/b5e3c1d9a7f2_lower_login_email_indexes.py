@@ -0,0 +1,38 @@
+"""Unique lower login/email indexes (case-insensitive uniqueness and sign in)
+
+Fails if users that differ only by login/email case already exist,
+they have to be resolved before the upgrade.
+
+Revision ID: b5e3c1d9a7f2
+Revises: 40ad1ded6b42
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e3c1d9a7f2"
+down_revision: Union[str, Sequence[str], None] = "40ad1ded6b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_users_login_lower", "users", [sa.text("lower(login)")], unique=True
+    )
+    op.create_index(
+        "idx_users_email_lower", "users", [sa.text("lower(email)")], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_users_email_lower", table_name="users")
+    op.drop_index("idx_users_login_lower", table_name="users")
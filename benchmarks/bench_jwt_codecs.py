@@ -0,0 +1,48 @@
+"""
+Сравнение пропускной способности JWT кодеков (encode/decode) на HS256.
+
+Запуск (из корня проекта):
+    python -m benchmarks.bench_jwt_codecs
+"""
+
+import argparse
+import time
+import timeit
+from uuid import uuid4
+
+from src.auth.jwt_codecs import HS256JWTCodec, JoseJWTCodec, JWTCodec
+
+SECRET = "benchmark-secret"
+
+
+def bench(codec: JWTCodec, number: int) -> tuple[float, float]:
+    """
+    :return: Кол-во операций encode и decode в секунду
+    """
+    now = int(time.time())
+    claims = {"iat": now, "sub": str(uuid4()), "exp": now + 900, "jti": str(uuid4())}
+    token = codec.encode(claims)
+
+    encode_s = timeit.timeit(lambda: codec.encode(claims), number=number)
+    decode_s = timeit.timeit(lambda: codec.decode(token), number=number)
+    return number / encode_s, number / decode_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    codecs: dict[str, JWTCodec] = {
+        "python-jose": JoseJWTCodec(SECRET, "HS256"),
+        "native HS256": HS256JWTCodec(SECRET),
+    }
+
+    print(f"{'codec':<14}{'encode ops/s':>14}{'decode ops/s':>14}")
+    for name, codec in codecs.items():
+        encode_ops, decode_ops = bench(codec, args.number)
+        print(f"{name:<14}{encode_ops:>14,.0f}{decode_ops:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
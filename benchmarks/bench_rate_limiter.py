@@ -0,0 +1,91 @@
+"""
+Сравнение латентности проверки лимита запросов в режимах exact (каждая проверка —
+Lua скрипт в redis) и hybrid (проверка в памяти воркера, пакетная синхронизация)
+под конкурентной нагрузкой. Нужен запущенный redis из настроек.
+
+Запуск (из корня проекта):
+    python -m benchmarks.bench_rate_limiter --concurrency 200 --requests 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from src.rate_limiter.hybrid import HybridRateLimitState
+from src.rate_limiter.scripts import gcra_script
+from src.redis.client import redis_client
+
+INTERVAL_MS, TOLERANCE_MS, TIMES = 1, 10**9, 10**9  # лимит не должен срабатывать
+
+
+async def run(
+    check: Callable[[str], Awaitable[object]],
+    concurrency: int,
+    requests: int,
+    keys: int,
+) -> list[float]:
+    """
+    :return: Латентности проверок, секунды
+    """
+    latencies: list[float] = []
+
+    async def client(n: int) -> None:
+        key = f"rate_limit:bench:{n % keys}"
+        for _ in range(requests):
+            started = time.perf_counter()
+            await check(key)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<8}{len(latencies) / elapsed:>12,.0f}"
+        f"{quantiles[49] * 1000:>10.3f}{quantiles[98] * 1000:>10.3f}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    async def exact(key: str) -> object:
+        return await gcra_script(
+            keys=[key], args=[INTERVAL_MS, TOLERANCE_MS], client=redis_client
+        )
+
+    hybrid_state = HybridRateLimitState(
+        enabled=True, sync_interval_seconds=args.sync_interval, max_error=0.1
+    )
+
+    async def hybrid(key: str) -> object:
+        return await hybrid_state.check(key, TIMES, INTERVAL_MS, TOLERANCE_MS)
+
+    print(f"{'mode':<8}{'checks/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, check in (("exact", exact), ("hybrid", hybrid)):
+        if check is hybrid:
+            hybrid_state.start()
+        started = time.perf_counter()
+        latencies = await run(check, args.concurrency, args.requests, args.keys)
+        report(name, latencies, time.perf_counter() - started)
+    await hybrid_state.stop()
+
+    await redis_client.delete(*(f"rate_limit:bench:{n}" for n in range(args.keys)))
+    await redis_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200, help="На одного клиента")
+    parser.add_argument("--keys", type=int, default=20, help="Кол-во разных ключей")
+    parser.add_argument("--sync-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Сравнение пропускной способности обычного клиента redis и клиента с автоматической
+конвейеризацией (AutoPipelineRedis) на командах проверки refresh токенов при разной
+конкурентности. Ошибки — команды, не дождавшиеся свободного соединения пула
+(REDIS_POOL_TIMEOUT). Нужен запущенный redis из настроек.
+
+Запуск (из корня проекта):
+    python -m benchmarks.bench_redis_auto_pipeline --concurrency 1 10 100 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.redis.client import AutoPipelineRedis, InstrumentedRedis, redis_client
+
+
+async def run(
+    client: Redis, concurrency: int, requests: int
+) -> tuple[list[float], int]:
+    """
+    Каждый клиент повторяет проверку refresh токена (ZSCORE + ZMSCORE)
+    :return: Латентности успешных проверок (секунды), кол-во ошибок
+    """
+    latencies: list[float] = []
+    errors = 0
+    key, jti = "refresh:bench", str(uuid4())
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in range(requests):
+            started = time.perf_counter()
+            try:
+                await client.zscore(key, jti)
+                await client.zmscore(key, [jti, "legacy"])
+            except RedisError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def report(
+    name: str, concurrency: int, latencies: list[float], errors: int, elapsed: float
+) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<8}{concurrency:>8}{len(latencies) / elapsed:>12,.0f}"
+        f"{quantiles[49] * 1000:>10.3f}{quantiles[98] * 1000:>10.3f}{errors:>8}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    pool = redis_client.connection_pool
+    clients = {
+        "plain": InstrumentedRedis(connection_pool=pool),
+        "auto": AutoPipelineRedis(connection_pool=pool),
+    }
+    await redis_client.zadd("refresh:bench", {str(uuid4()): 1})
+
+    print(
+        f"{'client':<8}{'conc':>8}{'checks/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    )
+    for concurrency in args.concurrency:
+        for name, client in clients.items():
+            requests = max(args.total // concurrency, 1)
+            started = time.perf_counter()
+            latencies, errors = await run(client, concurrency, requests)
+            report(name, concurrency, latencies, errors, time.perf_counter() - started)
+
+    await redis_client.delete("refresh:bench")
+    await redis_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument(
+        "--total", type=int, default=20000, help="Всего проверок на один прогон"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
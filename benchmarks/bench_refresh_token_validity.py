@@ -0,0 +1,100 @@
+"""
+Сравнение пропускной способности проверки refresh токена (is_refresh_jti_valid)
+напрямую в redis и через локальный кэш с инвалидацией CLIENT TRACKING.
+Нужен запущенный redis из настроек (>= 6.0).
+
+Запуск (из корня проекта):
+    python -m benchmarks.bench_refresh_token_validity --concurrency 100 --requests 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID, uuid4
+
+from src.auth.config import get_auth_settings
+from src.auth.services.redis_refresh_token_service import (
+    add_new_refresh_token,
+    is_refresh_jti_valid,
+    remove_all_refresh_tokens,
+)
+from src.auth.services.refresh_token_client_cache import (
+    INVALIDATION_CHANNEL,
+    refresh_token_client_cache,
+)
+from src.redis import pubsub_listener, redis_manager
+
+
+async def run(
+    tokens: list[tuple[UUID, UUID]], concurrency: int, requests: int
+) -> list[float]:
+    """
+    :return: Латентности проверок, секунды
+    """
+    latencies: list[float] = []
+
+    async def client(n: int) -> None:
+        user_id, jti = tokens[n % len(tokens)]
+        for _ in range(requests):
+            started = time.perf_counter()
+            await is_refresh_jti_valid(user_id, jti)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<8}{len(latencies) / elapsed:>12,.0f}"
+        f"{quantiles[49] * 1000:>10.3f}{quantiles[98] * 1000:>10.3f}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    await redis_manager.start()
+    tokens = [(uuid4(), uuid4()) for _ in range(args.users)]
+    for user_id, jti in tokens:
+        await add_new_refresh_token(user_id, jti)
+
+    if not get_auth_settings().refresh_token_client_cache:
+        # те же обработчики, что регистрируются при AUTH_REFRESH_TOKEN_CLIENT_CACHE=1
+        pubsub_listener.add_connection_setup(refresh_token_client_cache.setup_tracking)
+        pubsub_listener.subscribe(
+            INVALIDATION_CHANNEL, refresh_token_client_cache.handle_invalidation
+        )
+        pubsub_listener.on_reconnect(refresh_token_client_cache.activate)
+        pubsub_listener.on_disconnect(refresh_token_client_cache.deactivate)
+
+    print(f"{'mode':<8}{'checks/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    started = time.perf_counter()
+    latencies = await run(tokens, args.concurrency, args.requests)
+    report("redis", latencies, time.perf_counter() - started)
+
+    pubsub_listener.start()
+    while not refresh_token_client_cache.active:
+        await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    latencies = await run(tokens, args.concurrency, args.requests)
+    report("cached", latencies, time.perf_counter() - started)
+    await pubsub_listener.stop()
+
+    for user_id, _ in tokens:
+        await remove_all_refresh_tokens(user_id)
+    await redis_manager.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500, help="На одного клиента")
+    parser.add_argument("--users", type=int, default=50, help="Кол-во разных ключей")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Сравнение стоимости проверки access токена с кэшем и без него.
+
+Запуск (из корня проекта, нужен .env с AUTH_* переменными):
+    python -m benchmarks.bench_verified_token_cache
+"""
+
+import argparse
+import timeit
+from uuid import uuid4
+
+from src.auth.services.verified_token_cache import VerifiedTokenCache
+from src.auth.utils import JWTUtils
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = JWTUtils.create_access_token(uuid4())
+    cache = VerifiedTokenCache(max_size=10000)
+    cache.put(token, JWTUtils.decode_token(token))
+
+    decode_s = timeit.timeit(lambda: JWTUtils.decode_token(token), number=args.number)
+    cached_s = timeit.timeit(lambda: cache.get(token), number=args.number)
+
+    decode_us = decode_s / args.number * 1e6
+    cached_us = cached_s / args.number * 1e6
+    print(f"decode_token:      {decode_us:8.2f} us/call")
+    print(f"cache hit:         {cached_us:8.2f} us/call")
+    print(
+        f"saving per request {decode_us - cached_us:8.2f} us ({decode_us / cached_us:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Подбор параметров argon2 под целевое время хэширования на текущей машине.
+
+Запуск (из корня проекта, на машине развертывания):
+    python -m src.auth.commands.calibrate_argon2 --target-ms 250 --env-file .env
+
+Выбирается самый "тяжелый" набор параметров (сначала по памяти, затем по time_cost),
+медианное время хэширования которого не превышает целевое. Результат записывается
+в env файл как AUTH_ARGON2_* (поля AuthSettings). Уже сохраненные хэши будут
+перехэшированы с новыми параметрами при следующем входе пользователей.
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from argon2 import PasswordHasher
+
+from ..config import get_auth_settings
+
+MEMORY_COST_CANDIDATES_KIB = (19456, 32768, 47104, 65536, 131072, 262144)
+
+
+class Argon2Params(NamedTuple):
+    time_cost: int
+    memory_cost: int  # KiB
+    parallelism: int
+
+
+def measure(params: Argon2Params, samples: int) -> float:
+    """
+    :return: Медианное время хэширования в миллисекундах
+    """
+    hasher = PasswordHasher(*params)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(
+    target_ms: float,
+    max_memory_kib: int,
+    max_time_cost: int,
+    parallelism_candidates: list[int],
+    samples: int,
+) -> tuple[Argon2Params, float] | None:
+    """
+    Перебирает параметры и возвращает самые "тяжелые", укладывающиеся в target_ms
+    :return: Параметры и их медианное время (мс) или None, если ничего не подошло
+    """
+    best: tuple[Argon2Params, float] | None = None
+
+    for parallelism in parallelism_candidates:
+        for memory_cost in MEMORY_COST_CANDIDATES_KIB:
+            if memory_cost > max_memory_kib:
+                break
+
+            fitted = False
+            for time_cost in range(1, max_time_cost + 1):
+                params = Argon2Params(time_cost, memory_cost, parallelism)
+                elapsed = measure(params, samples)
+                print(
+                    f"t={time_cost:<2} m={memory_cost // 1024:>4}MiB "
+                    f"p={parallelism}: {elapsed:8.1f} ms"
+                )
+                if elapsed > target_ms:
+                    break
+
+                fitted = True
+                key = (memory_cost, time_cost, -parallelism)
+                if best is None or key > (
+                    best[0].memory_cost,
+                    best[0].time_cost,
+                    -best[0].parallelism,
+                ):
+                    best = (params, elapsed)
+
+            if not fitted:  # большая память будет еще медленнее
+                break
+
+    return best
+
+
+def update_env_file(path: Path, values: dict[str, str]) -> None:
+    """
+    Обновляет (или дописывает) переменные в env файле, не трогая остальные строки
+    """
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    pending = dict(values)
+
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in pending:
+            lines[i] = f"{key}={pending.pop(key)}"
+
+    lines.extend(f"{key}={value}" for key, value in pending.items())
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main() -> None:
+    auth_settings = get_auth_settings()
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument(
+        "--max-memory-mib",
+        type=int,
+        default=min(256, auth_settings.password_hash_memory_budget_mib),
+    )
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--env-file", type=Path, default=Path(".env"))
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только вывести результат"
+    )
+    args = parser.parse_args()
+
+    result = calibrate(
+        target_ms=args.target_ms,
+        max_memory_kib=args.max_memory_mib * 1024,
+        max_time_cost=args.max_time_cost,
+        parallelism_candidates=args.parallelism,
+        samples=args.samples,
+    )
+    if result is None:
+        raise SystemExit(
+            f"No argon2 parameters fit into {args.target_ms} ms, increase --target-ms"
+        )
+
+    params, elapsed = result
+    current = Argon2Params(
+        auth_settings.argon2_time_cost,
+        auth_settings.argon2_memory_cost,
+        auth_settings.argon2_parallelism,
+    )
+    print(f"\nCurrent:  {current}\nSelected: {params} ({elapsed:.1f} ms)")
+
+    if args.dry_run:
+        return
+
+    update_env_file(
+        args.env_file,
+        {
+            "AUTH_ARGON2_TIME_COST": str(params.time_cost),
+            "AUTH_ARGON2_MEMORY_COST": str(params.memory_cost),
+            "AUTH_ARGON2_PARALLELISM": str(params.parallelism),
+        },
+    )
+    print(f"Written to {args.env_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Онлайн перевод jti в ключах refresh:* между строковой (UUID, 36 символов)
+и компактной (16 байт) формами.
+
+Порядок перехода на компактный формат:
+    1. Включить AUTH_REFRESH_TOKEN_COMPACT_JTI=1 и перезапустить приложение
+       (оно понимает обе формы, пока миграция не завершена)
+    2. python -m src.auth.commands.migrate_refresh_jti --to compact
+
+Откат: выключить настройку и перезапустить приложение, затем выполнить миграцию
+с --to text (приложение в любом режиме принимает обе формы jti).
+Каждый ключ конвертируется атомарно (Lua), время выпуска и TTL сохраняются.
+В конце выводится отчет MEMORY USAGE по выборке ключей до и после миграции.
+"""
+
+import argparse
+import asyncio
+
+from redis.exceptions import ResponseError
+
+from ...redis.client import redis_bytes_client
+
+# Возвращает кол-во сконвертированных jti в ключе
+_TO_COMPACT_LUA = """
+local members = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local converted = 0
+for i = 1, #members, 2 do
+    local member = members[i]
+    if #member == 36 then
+        local hex = string.gsub(member, '-', '')
+        local raw = string.gsub(hex, '..', function(h)
+            return string.char(tonumber(h, 16))
+        end)
+        redis.call('ZADD', KEYS[1], members[i + 1], raw)
+        redis.call('ZREM', KEYS[1], member)
+        converted = converted + 1
+    end
+end
+return converted
+"""
+
+_TO_TEXT_LUA = """
+local members = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local converted = 0
+for i = 1, #members, 2 do
+    local member = members[i]
+    if #member == 16 then
+        local hex = string.gsub(member, '.', function(c)
+            return string.format('%02x', string.byte(c))
+        end)
+        local text = string.sub(hex, 1, 8) .. '-' .. string.sub(hex, 9, 12) .. '-'
+            .. string.sub(hex, 13, 16) .. '-' .. string.sub(hex, 17, 20) .. '-'
+            .. string.sub(hex, 21, 32)
+        redis.call('ZADD', KEYS[1], members[i + 1], text)
+        redis.call('ZREM', KEYS[1], member)
+        converted = converted + 1
+    end
+end
+return converted
+"""
+
+
+async def memory_usage(keys: list[bytes]) -> int | None:
+    """
+    :return: Суммарный MEMORY USAGE ключей в байтах или None, если команда недоступна
+    """
+    if not keys:
+        return 0
+
+    pipe = redis_bytes_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key, samples=0)
+    try:
+        results = await pipe.execute()
+    except ResponseError:
+        return None
+    return sum(size or 0 for size in results)
+
+
+async def migrate(to: str, batch_size: int, sample_size: int, dry_run: bool) -> None:
+    script = redis_bytes_client.register_script(
+        _TO_COMPACT_LUA if to == "compact" else _TO_TEXT_LUA
+    )
+
+    sample: list[bytes] = []
+    keys_total = keys_converted = members_converted = 0
+
+    # Выборка для отчета по памяти — первые ключи
+    async for key in redis_bytes_client.scan_iter(match="refresh:*", count=batch_size):
+        sample.append(key)
+        if len(sample) >= sample_size:
+            break
+    memory_before = await memory_usage(sample)
+
+    if not dry_run:
+        async for key in redis_bytes_client.scan_iter(
+            match="refresh:*", count=batch_size
+        ):
+            converted = await script(keys=[key])
+            keys_total += 1
+            if converted:
+                keys_converted += 1
+                members_converted += converted
+
+    memory_after = await memory_usage(sample)
+
+    print(
+        f"Keys scanned: {keys_total}, converted: {keys_converted}, "
+        f"jti converted: {members_converted}"
+    )
+    if memory_before is None or memory_after is None:
+        print("MEMORY USAGE is not available on this server")
+    elif not sample or not memory_before:
+        # ключей нет или они истекли до MEMORY USAGE — сравнивать не с чем
+        print(f"MEMORY USAGE of {len(sample)} sampled keys: {memory_after} B")
+    else:
+        print(
+            f"MEMORY USAGE of {len(sample)} sampled keys: "
+            f"before {memory_before} B ({memory_before / len(sample):.1f} B/key), "
+            f"after {memory_after} B ({memory_after / len(sample):.1f} B/key), "
+            f"saved {(1 - memory_after / memory_before) * 100:.1f}%"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--to", choices=["compact", "text"], default="compact")
+    parser.add_argument("--batch-size", type=int, default=500, help="COUNT для SCAN")
+    parser.add_argument(
+        "--sample-size", type=int, default=1000, help="Ключей в отчете MEMORY USAGE"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только отчет по текущей памяти"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.to, args.batch_size, args.sample_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Онлайн перевод ключей refresh токенов между раскладками refresh:<user_id>
+и refresh:{<user_id>} (hash tag — ключи пользователя в одном слоте redis cluster).
+
+Порядок перехода на redis cluster:
+    1. Включить AUTH_REFRESH_TOKEN_HASH_TAGGED_KEYS=1 и AUTH_REFRESH_TOKEN_LEGACY_KEY_FALLBACK=1
+       и перезапустить приложение (пока миграция не завершена, ключ старой раскладки
+       подхватывается при обращении)
+    2. python -m src.auth.commands.migrate_refresh_keys --to tagged
+    3. Выключить AUTH_REFRESH_TOKEN_LEGACY_KEY_FALLBACK и перезапустить приложение
+    4. Перенести данные в кластер (например, redis-cli --cluster import)
+       и включить REDIS_CLUSTER=1
+
+Откат (до перехода на кластер): выключить настройку, затем выполнить миграцию с --to plain
+(до ее завершения пользователи с непереведенными ключами должны будут войти заново).
+Каждый ключ переносится атомарно (Lua), токены объединяются с уже существующими
+в новой раскладке, время выпуска и TTL сохраняются. Выполняется на одном узле redis.
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+from ...redis.client import redis_client
+from ..services.redis_refresh_token_service import move_refresh_key
+
+
+def parse_user_id(key: str, hash_tagged: bool) -> UUID | None:
+    """
+    :param key: Ключ refresh:*
+    :param hash_tagged: Ожидаемая раскладка ключа
+    :return: UUID пользователя или None, если ключ в другой раскладке
+    """
+    suffix = key.removeprefix("refresh:")
+    if suffix.startswith("{") != hash_tagged:
+        return None
+    try:
+        return UUID(suffix.strip("{}"))
+    except ValueError:
+        return None
+
+
+async def migrate(to: str, batch_size: int, dry_run: bool) -> None:
+    to_hash_tagged = to == "tagged"
+    keys_total = keys_moved = 0
+
+    async for key in redis_client.scan_iter(match="refresh:*", count=batch_size):
+        user_id = parse_user_id(key, hash_tagged=not to_hash_tagged)
+        if user_id is None:
+            continue
+        keys_total += 1
+        if not dry_run and await move_refresh_key(user_id, to_hash_tagged):
+            keys_moved += 1
+
+    print(f"Keys to migrate: {keys_total}, moved: {keys_moved}")
+    await redis_client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--to", choices=["tagged", "plain"], default="tagged")
+    parser.add_argument("--batch-size", type=int, default=500, help="COUNT для SCAN")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только подсчитать ключи"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.to, args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
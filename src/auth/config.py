@@ -1,5 +1,6 @@
 from functools import lru_cache
 from logging import getLogger
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +13,52 @@ class AuthSettings(BaseSettings):
 
     jwt_algorithm: str
     jwt_secret: str
+    jwt_codec: Literal["native", "jose"] = "native"  # native — только для HS256
+
+    access_token_cache_size: int = 10000  # 0 — кэш проверенных access токенов выключен
+
+    # Параметры argon2 (по умолчанию совпадают с argon2-cffi), подбираются calibrate_argon2
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
+
+    password_hash_workers: int = 2  # кол-во процессов для хэширования паролей
+    password_hash_memory_budget_mib: int = 512  # память под одновременные хэши, MiB
+    password_hash_max_waiters: int = 100  # макс. очередь ожидающих хэширования
+    password_hash_max_wait_seconds: float = 5.0  # макс. время ожидания в очереди
+
+    # Хранилище refresh токенов: redis или memory (в памяти процесса — для тестов,
+    # бенчмарков и однопроцессной разработки)
+    refresh_token_store: Literal["redis", "memory"] = "redis"
+
+    # Хранить jti в refresh:{user_id} как 16 байт вместо строки UUID (36 символов).
+    # Существующие ключи переводятся командой migrate_refresh_jti
+    refresh_token_compact_jti: bool = False
+
+    # Ключи refresh:{<user_id>} с hash tag: все ключи пользователя попадают в один слот
+    # redis cluster. Существующие ключи переводятся командой migrate_refresh_keys
+    refresh_token_hash_tagged_keys: bool = False
+    # Пока идет миграция migrate_refresh_keys: ключ пользователя в старой раскладке
+    # переносится перед каждым изменением и при промахе чтения (лишний запрос в redis).
+    # Выключается после завершения миграции, в redis cluster не используется
+    refresh_token_legacy_key_fallback: bool = False
+
+    # Локальный кэш проверок refresh токенов с инвалидацией через CLIENT TRACKING
+    refresh_token_client_cache: bool = False
+    refresh_token_client_cache_size: int = 10000  # кол-во ключей refresh:{user_id}
+
+    # Фоновая очистка истекших jti из refresh:{user_id} (0 — выключена)
+    refresh_sweep_interval_seconds: int = 3600
+    refresh_sweep_batch_size: int = 500  # COUNT для SCAN
+    refresh_sweep_max_keys_per_second: int = 5000
+
+    @property
+    def access_token_expires_in_seconds(self) -> int:
+        return self.access_token_expires_in * 60
+
+    @property
+    def refresh_token_expires_in_seconds(self) -> int:
+        return self.refresh_token_expires_in * 60
 
     model_config = SettingsConfigDict(
         env_file=".env", extra="ignore", env_prefix="AUTH_"
@@ -2,7 +2,7 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_async_session
-from ..user.services import check_email_unique, check_login_unique
+from ..user.services import check_user_uniqueness
 from .schemas import SignUpSchema
 
 
@@ -15,6 +15,5 @@ async def validate_user_uniqueness(
     :param user_in: Схема регистрации пользователя
     :param session: Сессия
     """
-    await check_email_unique(user_in.email, session)
-    await check_login_unique(user_in.login, session)
+    await check_user_uniqueness(session, login=user_in.login, email=user_in.email)
     return user_in
@@ -45,6 +45,20 @@ class PasswordsAreSameException(BaseAPIException):
         )
 
 
+class PasswordHashingOverloadedException(BaseAPIException):
+    """
+    Вызывается если очередь на хэширование паролей переполнена или ожидание слишком долгое
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            msg="Too many concurrent password operations, try again later",
+            err_type="service_error.password_hashing_overloaded",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class TokenExpiredException(BaseAPIException):
     """
     Вызывается при истечении срока валидности токена (как access, так и refresh)
@@ -59,6 +73,20 @@ class TokenExpiredException(BaseAPIException):
         )
 
 
+class AccessTokenRevokedException(BaseAPIException):
+    """
+    Вызывается если access токен был отозван (смена пароля, выход из аккаунта)
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            msg="Token has been revoked",
+            loc=["header", "token"],
+            err_type="token_error.token_revoked",
+        )
+
+
 class InvalidTokenException(BaseAPIException):
     """
     Вызывается если токен в целом не верен, например был модифицирован или изменен на произвольный
@@ -0,0 +1,165 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+from functools import lru_cache
+from logging import getLogger
+from typing import Any, Protocol
+
+import orjson
+from jose import ExpiredSignatureError, JWTError, jwt
+
+from .config import get_auth_settings
+from .exceptions import InvalidTokenException, TokenExpiredException
+
+logger = getLogger(__name__)
+
+
+class JWTCodec(Protocol):
+    """
+    Кодирование/декодирование JWT. Временные метки — секунды Unix time (exp — целые,
+    iat access токена — с точностью до миллисекунд)
+    """
+
+    def encode(self, claims: dict[str, Any]) -> str: ...
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        :raises TokenExpiredException: Если истекло время жизни токена
+        :raises InvalidTokenException: При любой другой проблеме с токеном
+        """
+        ...
+
+
+class JoseJWTCodec:
+    """
+    Реализация на python-jose, поддерживает все алгоритмы jose
+    """
+
+    def __init__(self, secret: str, algorithm: str):
+        self._secret = secret
+        self._algorithm = algorithm
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return jwt.encode(claims=claims, key=self._secret, algorithm=self._algorithm)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            return jwt.decode(token, key=self._secret, algorithms=self._algorithm)
+        except ExpiredSignatureError as err:
+            raise TokenExpiredException() from err
+        except JWTError as err:
+            raise InvalidTokenException() from err
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _is_numeric_date(value: Any) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def _validate_claims(claims: dict[str, Any]) -> None:
+    """
+    Проверки registered claims, как в python-jose без audience/issuer:
+    iat/nbf/exp — числа, nbf наступил, exp не наступил, sub/jti — строки, aud отсутствует.
+    В отличие от jose, exp обязателен (у всех наших токенов он есть)
+    :raises TokenExpiredException: Если истекло время жизни токена
+    :raises InvalidTokenException: Если claims некорректны
+    """
+    now = time.time()
+
+    if not _is_numeric_date(claims.get("exp")):
+        raise InvalidTokenException()
+    for claim in ("iat", "nbf"):
+        if claim in claims and not _is_numeric_date(claims[claim]):
+            raise InvalidTokenException()
+    if "nbf" in claims and claims["nbf"] > now:
+        raise InvalidTokenException()
+    for claim in ("sub", "jti"):
+        if claim in claims and not isinstance(claims[claim], str):
+            raise InvalidTokenException()
+    # Токен для другого получателя (audience у нас не задается — jose отклоняет любой aud)
+    if "aud" in claims:
+        raise InvalidTokenException()
+
+    if claims["exp"] <= now:
+        raise TokenExpiredException()
+
+
+class HS256JWTCodec:
+    """
+    Облегченная реализация HS256 на hmac/hashlib: заголовок закодирован заранее,
+    HMAC ключ подготовлен один раз, claims сериализуются через orjson.
+    Совместима с токенами, выпущенными python-jose.
+    """
+
+    _HEADER = {"alg": "HS256", "typ": "JWT"}
+
+    def __init__(self, secret: str):
+        self._hmac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        self._header_segment = _b64encode(
+            orjson.dumps(self._HEADER, option=orjson.OPT_SORT_KEYS)
+        )
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        signing_input = self._header_segment + b"." + _b64encode(orjson.dumps(claims))
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            raw = token.encode("ascii")
+            signing_input, _, signature_segment = raw.rpartition(b".")
+            header_segment, _, payload_segment = signing_input.partition(b".")
+
+            if header_segment != self._header_segment:
+                header = orjson.loads(_b64decode(header_segment))
+                if not isinstance(header, dict) or header.get("alg") != "HS256":
+                    raise InvalidTokenException()
+
+            if not hmac.compare_digest(
+                self._sign(signing_input), _b64decode(signature_segment)
+            ):
+                raise InvalidTokenException()
+
+            claims = orjson.loads(_b64decode(payload_segment))
+        except (
+            ValueError,
+            binascii.Error,
+        ) as err:  # orjson.JSONDecodeError — ValueError
+            raise InvalidTokenException() from err
+
+        if not isinstance(claims, dict):
+            raise InvalidTokenException()
+
+        _validate_claims(claims)
+        return claims
+
+
+@lru_cache
+def get_jwt_codec() -> JWTCodec:
+    """
+    Выбор реализации JWT по настройкам (AUTH_JWT_CODEC)
+    """
+    auth_settings = get_auth_settings()
+
+    if auth_settings.jwt_codec == "native":
+        if auth_settings.jwt_algorithm == "HS256":
+            return HS256JWTCodec(auth_settings.jwt_secret)
+        logger.warning(
+            "Native JWT codec supports only HS256, falling back to python-jose for %s",
+            auth_settings.jwt_algorithm,
+        )
+
+    return JoseJWTCodec(auth_settings.jwt_secret, auth_settings.jwt_algorithm)
@@ -0,0 +1,40 @@
+# Ключи лимитов запросов, зависящие от аутентификации (см. src/rate_limiter)
+import hashlib
+
+from starlette.requests import Request
+
+from ..exceptions import BaseAPIException
+from ..rate_limiter import by_ip
+from .services import verified_token_cache
+from .utils import JWTUtils
+
+
+async def by_user(request: Request) -> str:
+    """
+    По пользователю из access токена, без валидного токена — по IP
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = verified_token_cache.get(token)
+        if payload is None:
+            try:
+                payload = JWTUtils.decode_token(token)
+            except BaseAPIException:
+                return f"ip:{await by_ip(request)}"
+        return f"user:{payload.sub}"
+    return f"ip:{await by_ip(request)}"
+
+
+async def by_identifier(request: Request) -> str:
+    """
+    По login/email из тела запроса входа (защита конкретного аккаунта от перебора),
+    при некорректном теле — по IP
+    """
+    try:
+        identifier = (await request.json()).get("identifier")
+    except (ValueError, AttributeError):
+        identifier = None
+    if isinstance(identifier, str):
+        digest = hashlib.blake2b(identifier.lower().encode(), digest_size=16)
+        return f"identifier:{digest.hexdigest()}"
+    return f"ip:{await by_ip(request)}"
@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, BackgroundTasks, Body, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.requests import Request
@@ -8,10 +8,12 @@ from starlette.responses import Response
 
 from ..config import get_settings
 from ..database import get_async_session
+from ..rate_limiter import RateLimiter, by_ip
 from ..schemas import ErrorResponseModel, SuccessResponseModel
 from .config import get_auth_settings
 from .dependencies import validate_user_uniqueness
 from .exceptions import RefreshTokenNotFound
+from .rate_limit_keys import by_identifier, by_user
 from .schemas import (
     AccessTokenSchema,
     ChangePasswordSchema,
@@ -55,7 +57,14 @@ auth_settings = get_auth_settings()
         },
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
+        503: {
+            "description": "Слишком много одновременных операций с паролями.",
+            "model": ErrorResponseModel,
+        },
     },
+    dependencies=[
+        Depends(RateLimiter("sign_up_ip", times=20, seconds=3600, key=by_ip)),
+    ],
 )
 async def sign_up_user_route(
     response: Response,
@@ -98,14 +107,25 @@ async def sign_up_user_route(
         },
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
+        503: {
+            "description": "Слишком много одновременных операций с паролями.",
+            "model": ErrorResponseModel,
+        },
     },
+    dependencies=[
+        Depends(RateLimiter("sign_in_ip", times=30, seconds=60, key=by_ip)),
+        Depends(
+            RateLimiter("sign_in_identifier", times=10, seconds=300, key=by_identifier)
+        ),
+    ],
 )
 async def sign_in_user_route(
     response: Response,
     user_in: Annotated[SignInSchema, Body(...)],
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    background_tasks: BackgroundTasks,
 ) -> AccessTokenSchema:
-    login_result = await sign_in_user(user_in, session)
+    login_result = await sign_in_user(user_in, session, background_tasks)
 
     response.set_cookie(
         key="refresh_token",
@@ -141,6 +161,9 @@ async def sign_in_user_route(
         },
         500: {"description": "Внутренняя ошибка сервера."},
     },
+    dependencies=[
+        Depends(RateLimiter("refresh_ip", times=60, seconds=60, key=by_ip)),
+    ],
 )
 async def refresh_tokens_route(
     request: Request, response: Response
@@ -187,8 +210,13 @@ async def refresh_tokens_route(
         },
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
+        503: {
+            "description": "Слишком много одновременных операций с паролями.",
+            "model": ErrorResponseModel,
+        },
     },
     dependencies=[
+        Depends(RateLimiter("change_password_user", times=5, seconds=300, key=by_user)),
         Depends(token_verification),
     ],
 )
@@ -212,7 +240,9 @@ async def change_password_route(
     name="Выход",
     response_model=None,
     status_code=status.HTTP_204_NO_CONTENT,
-    description="При выходе будет удален refresh токен из куки + БД сервера",
+    description="При выходе будет удален refresh токен из куки + БД сервера. "
+    "Отзываются все ранее выданные access токены пользователя (на всех устройствах), "
+    "остальные сессии продолжают работать после обновления токенов по refresh токену",
     responses={
         204: {"description": "Успешный выход", "model": None},
         400: {
@@ -223,8 +253,12 @@ async def change_password_route(
             "description": "RefreshToken не найден, истек или некорректен",
             "model": ErrorResponseModel,
         },
+        429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
     },
+    dependencies=[
+        Depends(RateLimiter("logout_ip", times=30, seconds=60, key=by_ip)),
+    ],
 )
 async def logout_user_route(request: Request, response: Response) -> None:
     refresh_token = request.cookies.get("refresh_token")
@@ -4,7 +4,8 @@ from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from starlette.requests import Request
 
-from .exceptions import AccessTokenNotFound
+from .exceptions import AccessTokenNotFound, AccessTokenRevokedException
+from .services import is_access_token_revoked, verified_token_cache
 from .utils import JWTUtils
 
 if TYPE_CHECKING:  # To avoid circular imports
@@ -37,9 +38,16 @@ async def token_verification(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(custom_http_bearer)],
 ) -> "TokenPayloadSchema":
     """
-    Верифицирует access токен
+    Верифицирует access токен. Уже проверенные токены берутся из кэша
     :param credentials: Заголовок авторизации
+    :raises AccessTokenRevokedException: Если токен был отозван
     """
     token = credentials.credentials
-    payload = JWTUtils.decode_token(token)
+    payload = verified_token_cache.get(token)
+    if payload is None:
+        payload = JWTUtils.decode_token(token)
+        verified_token_cache.put(token, payload)
+
+    if is_access_token_revoked(payload):
+        raise AccessTokenRevokedException()
     return payload
@@ -1,15 +1,18 @@
-from .redis_refresh_token_service import (
-    add_new_refresh_token,
-    is_refresh_jti_valid,
-    remove_all_refresh_tokens,
-    remove_all_refresh_tokens_except,
-    remove_refresh_token,
+from .access_token_revocation_service import (
+    is_access_token_revoked,
+    revoke_access_tokens,
 )
+from .password_hashing_service import password_hashing_engine
+from .refresh_token_store import RefreshTokenStore, refresh_token_store
+from .refresh_token_sweeper_service import refresh_token_sweeper
+from .verified_token_cache import verified_token_cache
 
 __all__ = [
-    "add_new_refresh_token",
-    "remove_all_refresh_tokens",
-    "remove_refresh_token",
-    "is_refresh_jti_valid",
-    "remove_all_refresh_tokens_except",
+    "RefreshTokenStore",
+    "refresh_token_store",
+    "password_hashing_engine",
+    "verified_token_cache",
+    "refresh_token_sweeper",
+    "revoke_access_tokens",
+    "is_access_token_revoked",
 ]
@@ -0,0 +1,122 @@
+import time
+from logging import getLogger
+from uuid import UUID
+
+from ...metrics import metrics
+from ...redis.client import execute_and_publish, redis_client
+from ...redis.pubsub import pubsub_listener
+from ..config import get_auth_settings
+from ..schemas import TokenPayloadSchema
+from .verified_token_cache import verified_token_cache
+
+logger = getLogger(__name__)
+
+auth_settings = get_auth_settings()
+
+REVOCATION_CHANNEL = "auth:access_token_revocations"
+
+
+def _revocation_key(user_id: UUID | str) -> str:
+    return f"revoked_before:{user_id}"
+
+
+class AccessTokenRevocationTable:
+    """
+    Зеркало "водяных знаков" отзыва access токенов в памяти воркера.
+    Токен пользователя отозван, если выпущен раньше (iat) его водяного знака.
+    Знак и iat access токена — с точностью до миллисекунд: токен, украденный в ту же
+    секунду, что и отзыв, отзывается, а выпущенный сразу после отзыва — нет.
+    Знак хранится, пока не истекут все токены, выпущенные до него.
+    """
+
+    def __init__(self):
+        self._watermarks: dict[
+            UUID, tuple[float, float]
+        ] = {}  # (revoked_before, expires_at)
+
+        metrics.gauge(
+            "auth_access_token_revocations",
+            "Кол-во пользователей с активным отзывом access токенов",
+            callback=lambda: len(self._watermarks),
+        )
+
+    def apply(self, user_id: UUID, revoked_before: float, ttl_seconds: float) -> None:
+        current = self._watermarks.get(user_id)
+        if current is None or current[0] < revoked_before:
+            self._watermarks[user_id] = (revoked_before, time.time() + ttl_seconds)
+        verified_token_cache.evict_user(user_id)
+
+    def is_revoked(self, payload: TokenPayloadSchema) -> bool:
+        entry = self._watermarks.get(payload.sub)
+        if entry is None:
+            return False
+
+        revoked_before, expires_at = entry
+        if expires_at <= time.time():
+            del self._watermarks[payload.sub]
+            return False
+        return payload.iat.timestamp() < revoked_before
+
+    def clear(self) -> None:
+        self._watermarks.clear()
+
+
+access_token_revocations = AccessTokenRevocationTable()
+
+
+def _handle_revocation_message(data: str) -> None:
+    user_id, revoked_before = data.split(":")
+    access_token_revocations.apply(
+        UUID(user_id),
+        float(revoked_before),
+        auth_settings.access_token_expires_in_seconds,
+    )
+
+
+async def _resync_revocations() -> None:
+    """
+    Загружает все действующие водяные знаки (после (пере)подключения к pub/sub)
+    """
+    keys = [key async for key in redis_client.scan_iter(match="revoked_before:*")]
+    if not keys:
+        return
+
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.get(key)
+        pipe.ttl(key)
+    results = await pipe.execute()
+
+    for key, revoked_before, ttl in zip(keys, results[::2], results[1::2], strict=True):
+        if revoked_before is not None and ttl > 0:
+            access_token_revocations.apply(
+                UUID(key.split(":", 1)[1]), float(revoked_before), ttl
+            )
+
+
+pubsub_listener.subscribe(REVOCATION_CHANNEL, _handle_revocation_message)
+pubsub_listener.on_reconnect(_resync_revocations)
+
+
+async def revoke_access_tokens(user_id: UUID) -> None:
+    """
+    Отзывает все access токены пользователя, выпущенные до текущего момента
+    (во всех воркерах — через redis pub/sub)
+    :param user_id: UUID пользователя
+    """
+    revoked_before = round(time.time(), 3)
+    ttl = auth_settings.access_token_expires_in_seconds
+
+    access_token_revocations.apply(user_id, revoked_before, ttl)
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(_revocation_key(user_id), revoked_before, ex=ttl)
+    await execute_and_publish(pipe, REVOCATION_CHANNEL, f"{user_id}:{revoked_before}")
+
+
+def is_access_token_revoked(payload: TokenPayloadSchema) -> bool:
+    """
+    Проверка отзыва access токена (без обращения к redis)
+    :param payload: Payload access токена
+    """
+    return access_token_revocations.is_revoked(payload)
@@ -0,0 +1,105 @@
+import heapq
+import time
+from collections.abc import Callable
+from uuid import UUID
+
+from ..constants import MAX_REFRESH_TOKENS
+
+
+class InMemoryRefreshTokenStore:
+    """
+    Хранилище refresh токенов в памяти процесса с той же семантикой, что и redis:
+    {user_id: {jti: время выпуска}}, не больше max_tokens токенов на пользователя,
+    срок жизни набора продлевается при выпуске токена.
+
+    Сроки жизни хранятся в куче, истекшие наборы удаляются лениво при обращениях.
+    Состояние не разделяется между воркерами — для тестов, бенчмарков
+    и однопроцессной разработки без redis.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_tokens: int = MAX_REFRESH_TOKENS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self._max_tokens = max_tokens
+        self._clock = clock
+        self._tokens: dict[UUID, dict[UUID, float]] = {}
+        self._expires_at: dict[UUID, float] = {}
+        # (срок, user_id); при продлении старая запись остается и пропускается
+        self._expiry_heap: list[tuple[float, UUID]] = []
+
+    def _purge_expired(self) -> float:
+        """
+        :return: Текущее время
+        """
+        now = self._clock()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, user_id = heapq.heappop(self._expiry_heap)
+            if self._expires_at.get(user_id) == expires_at:
+                self._drop(user_id)
+        return now
+
+    def _drop(self, user_id: UUID) -> int:
+        self._expires_at.pop(user_id, None)
+        return len(self._tokens.pop(user_id, ()))
+
+    def _issue(self, user_id: UUID, jti: UUID, now: float) -> None:
+        tokens = self._tokens.setdefault(user_id, {})
+        tokens[jti] = now
+        if len(tokens) > self._max_tokens:
+            # Как ZREMRANGEBYRANK: самые старые по времени выпуска
+            oldest = sorted(tokens, key=lambda k: (tokens[k], str(k)))
+            for stale_jti in oldest[: len(tokens) - self._max_tokens]:
+                del tokens[stale_jti]
+
+        expires_at = now + self._ttl_seconds
+        self._expires_at[user_id] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, user_id))
+        if len(self._expiry_heap) > 2 * len(self._expires_at) + 64:
+            # Слишком много устаревших записей после продлений — пересобираем кучу
+            self._expiry_heap = [(t, u) for u, t in self._expires_at.items()]
+            heapq.heapify(self._expiry_heap)
+
+    async def add_new_refresh_token(self, user_id: UUID, token_jti: UUID) -> None:
+        self._issue(user_id, token_jti, self._purge_expired())
+
+    async def rotate_refresh_token(
+        self, user_id: UUID, old_token_jti: UUID, new_token_jti: UUID
+    ) -> bool:
+        now = self._purge_expired()
+        tokens = self._tokens.get(user_id)
+        if tokens is None or tokens.pop(old_token_jti, None) is None:
+            return False
+        self._issue(user_id, new_token_jti, now)
+        return True
+
+    async def remove_all_refresh_tokens_except(
+        self, user_id: UUID, except_token_jti: UUID
+    ) -> int:
+        self._purge_expired()
+        tokens = self._tokens.get(user_id)
+        if not tokens:
+            return 0
+        if except_token_jti not in tokens:
+            return self._drop(user_id)
+        # срок жизни набора сохраняется
+        self._tokens[user_id] = {except_token_jti: tokens[except_token_jti]}
+        return len(tokens) - 1
+
+    async def remove_refresh_token(self, user_id: UUID, token_jti: UUID) -> None:
+        self._purge_expired()
+        tokens = self._tokens.get(user_id)
+        if tokens is not None and tokens.pop(token_jti, None) is not None:
+            if not tokens:
+                self._drop(user_id)
+
+    async def remove_all_refresh_tokens(self, user_id: UUID) -> int:
+        self._purge_expired()
+        return self._drop(user_id)
+
+    async def is_refresh_jti_valid(self, user_id: UUID, jti: UUID) -> bool:
+        self._purge_expired()
+        return jti in self._tokens.get(user_id, ())
@@ -0,0 +1,239 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+from collections.abc import AsyncGenerator, Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import TypeVar
+
+from ...metrics import Histogram, metrics
+from ..config import get_auth_settings
+from ..exceptions import PasswordHashingOverloadedException
+from ..utils import PasswordUtils
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+auth_settings = get_auth_settings()
+
+
+def _warm_up() -> int:
+    """
+    Прогрев процесса пула: импорт модулей и первое выделение памяти под argon2
+    :return: PID процесса
+    """
+    PasswordUtils.hash_password("warm-up")
+    return os.getpid()
+
+
+class HashingAdmissionController:
+    """
+    Ограничивает кол-во одновременных вычислений argon2 числом процессов пула и
+    бюджетом памяти (меньшим из них). Запросы сверх лимита ждут в очереди ограниченного размера и не дольше max_wait_seconds,
+    остальные отклоняются с PasswordHashingOverloadedException.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        memory_budget_mib: int,
+        memory_per_hash_kib: int,
+        max_waiters: int,
+        max_wait_seconds: float,
+    ):
+        # Сверх workers хэши все равно ждут свободный процесс — пусть ждут здесь,
+        # в ограниченной очереди с таймаутом, а не в очереди пула без ограничений
+        self.slots = max(
+            1, min(workers, memory_budget_mib * 1024 // memory_per_hash_kib)
+        )
+        self._max_waiters = max_waiters
+        self._max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(self.slots)
+        self._active = 0
+        self._waiting = 0
+
+        metrics.gauge(
+            "auth_password_hashing_slots",
+            "Кол-во одновременных хэширований (мин. из процессов пула и бюджета памяти)",
+            callback=lambda: self.slots,
+        )
+        metrics.gauge(
+            "auth_password_hashing_active",
+            "Кол-во допущенных и еще не завершенных хэширований",
+            callback=lambda: self._active,
+        )
+        metrics.gauge(
+            "auth_password_hashing_waiting",
+            "Кол-во запросов, ожидающих допуска к хэшированию",
+            callback=lambda: self._waiting,
+        )
+        self._admitted = metrics.counter(
+            "auth_password_hashing_admitted_total", "Допущено к хэшированию"
+        )
+        self._rejected_queue_full = metrics.counter(
+            "auth_password_hashing_rejected_queue_full_total",
+            "Отклонено: очередь ожидания переполнена",
+        )
+        self._rejected_timeout = metrics.counter(
+            "auth_password_hashing_rejected_timeout_total",
+            "Отклонено: истекло время ожидания в очереди",
+        )
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self._max_wait_seconds))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncGenerator[None]:
+        """
+        Резервирует слот на время хэширования
+        :raises PasswordHashingOverloadedException: Если очередь переполнена или ожидание истекло
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self._max_waiters:
+                self._rejected_queue_full.inc()
+                raise PasswordHashingOverloadedException(self.retry_after)
+
+            self._waiting += 1
+            try:
+                async with asyncio.timeout(self._max_wait_seconds):
+                    await self._semaphore.acquire()
+            except TimeoutError as err:
+                self._rejected_timeout.inc()
+                raise PasswordHashingOverloadedException(self.retry_after) from err
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self._admitted.inc()
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+
+class PasswordHashingEngine:
+    """
+    Асинхронное хэширование паролей в отдельном пуле процессов,
+    чтобы argon2 не блокировал event loop воркера.
+
+    Если пул не запущен (например, приложение поднято без lifespan), вычисления
+    выполняются в пуле потоков по умолчанию.
+    """
+
+    def __init__(self, workers: int, admission: HashingAdmissionController):
+        self._workers = workers
+        self._admission = admission
+        self._pool: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+
+        metrics.gauge(
+            "auth_password_hashing_in_flight",
+            "Кол-во вызовов хэширования, ожидающих результата",
+            callback=lambda: self._in_flight,
+        )
+        metrics.gauge(
+            "auth_password_hashing_queue_depth",
+            "Кол-во вызовов хэширования, ожидающих свободный процесс",
+            callback=lambda: self.queue_depth,
+        )
+        self._hash_latency = metrics.histogram(
+            "auth_password_hash_latency_seconds",
+            "Время хэширования пароля (с учетом ожидания в очереди)",
+        )
+        self._verify_latency = metrics.histogram(
+            "auth_password_verify_latency_seconds",
+            "Время проверки пароля (с учетом ожидания в очереди)",
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        if self._pool is None:
+            return 0
+        return max(0, self._in_flight - self._workers)
+
+    async def start(self) -> None:
+        """
+        Запускает пул процессов и прогревает каждый процесс
+        """
+        if self._pool is not None:
+            return
+
+        # fork процесса с запущенным event loop небезопасен
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(self._pool, _warm_up) for _ in range(self._workers))
+        )
+        logger.info("Password hashing pool started, pids: %s", sorted(set(pids)))
+
+    async def stop(self) -> None:
+        """
+        Останавливает пул процессов, отменяя задачи, которые еще не начались
+        """
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        logger.info("Password hashing pool stopped")
+
+    async def hash_password(self, password: str) -> str:
+        """
+        Хэширует пароль (используется argon2)
+        :param password: Пароль
+        :return: Захешированный пароль
+        """
+        return await self._run(
+            self._hash_latency, PasswordUtils.hash_password, password
+        )
+
+    async def verify_password(self, hashed_password: str, password: str) -> bool:
+        """
+        Проверяет валидность введенного пароля
+        :param hashed_password: Хэшированный пароль, с которым хотим сравнить.
+        :param password: Пароль, с которым сравниваем хэш
+        :return: Являются ли пароли одинаковыми
+        """
+        return await self._run(
+            self._verify_latency,
+            PasswordUtils.verify_password,
+            hashed_password,
+            password,
+        )
+
+    async def _run(self, histogram: Histogram, func: Callable[..., T], *args) -> T:
+        async with self._admission.admit():
+            start = time.perf_counter()
+            self._in_flight += 1
+            try:
+                if self._pool is None:
+                    return await asyncio.to_thread(func, *args)
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._pool, func, *args
+                )
+            finally:
+                self._in_flight -= 1
+                histogram.observe(time.perf_counter() - start)
+
+
+password_hashing_engine = PasswordHashingEngine(
+    workers=auth_settings.password_hash_workers,
+    admission=HashingAdmissionController(
+        workers=auth_settings.password_hash_workers,
+        memory_budget_mib=auth_settings.password_hash_memory_budget_mib,
+        memory_per_hash_kib=PasswordUtils.get_memory_cost(),
+        max_waiters=auth_settings.password_hash_max_waiters,
+        max_wait_seconds=auth_settings.password_hash_max_wait_seconds,
+    ),
+)
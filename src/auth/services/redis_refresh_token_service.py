@@ -1,58 +1,241 @@
 import time
 from uuid import UUID
 
-from ...redis.client import redis_client
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+
+from ...config import get_settings
+from ...redis.client import redis_bytes_client, redis_client
 from ..config import get_auth_settings
 from ..constants import MAX_REFRESH_TOKENS
+from .refresh_token_client_cache import refresh_token_client_cache
 
 auth_settings = get_auth_settings()
 
+# Во время миграции ключей в раскладку с hash tag ключ пользователя в старой раскладке
+# подхватывается (переносится) перед изменениями и при промахе чтения.
+# В кластере старые ключи не поддерживаются (ключи в разных слотах)
+_LEGACY_KEY_FALLBACK = (
+    auth_settings.refresh_token_hash_tagged_keys
+    and auth_settings.refresh_token_legacy_key_fallback
+    and not get_settings().redis_cluster
+)
+
+# Общая часть скриптов: удаляет самые старые токены сверх лимита и продлевает ключ.
+# KEYS[1] - refresh:{user_id}; ARGV[1] - время выпуска; ARGV[2] - лимит токенов; ARGV[3] - TTL
+_TRIM_AND_EXPIRE_LUA = """
+local count = redis.call('ZCARD', KEYS[1])
+local max_tokens = tonumber(ARGV[2])
+if count > max_tokens then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, count - max_tokens - 1)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+"""
+
+# ARGV[4]: jti
+_ADD_LUA = (
+    """
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+"""
+    + _TRIM_AND_EXPIRE_LUA
+    + "return 1"
+)
+
+# ARGV[4]: новый jti; ARGV[5..]: старый jti (во всех формах хранения)
+# Возвращает 0, если старого jti уже нет (токен отозван или уже использован)
+_ROTATE_LUA = (
+    """
+if redis.call('ZREM', KEYS[1], unpack(ARGV, 5)) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+"""
+    + _TRIM_AND_EXPIRE_LUA
+    + "return 1"
+)
+
+# ARGV[1]: jti, который нужно оставить ('' — удалить все), ARGV[2..]: другие его формы.
+# Сохраняет время выпуска и TTL. Возвращает кол-во удаленных токенов
+_KEEP_ONLY_LUA = """
+local count = redis.call('ZCARD', KEYS[1])
+if count == 0 then
+    return 0
+end
+local score = false
+if ARGV[1] ~= '' then
+    for i = 1, #ARGV do
+        score = score or redis.call('ZSCORE', KEYS[1], ARGV[i])
+    end
+end
+if not score then
+    redis.call('DEL', KEYS[1])
+    return count
+end
+local ttl = redis.call('PTTL', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+if ttl > 0 then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return count - 1
+"""
+
+# Переносит токены из KEYS[1] в KEYS[2] (смена раскладки ключей), объединяя с уже
+# имеющимися и сохраняя наибольший TTL. ARGV[1] - лимит токенов.
+# Возвращает 1, если KEYS[1] существовал
+_MOVE_KEY_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    return 1
+end
+local ttl = math.max(redis.call('PTTL', KEYS[1]), redis.call('PTTL', KEYS[2]))
+redis.call('ZUNIONSTORE', KEYS[2], 2, KEYS[2], KEYS[1], 'AGGREGATE', 'MAX')
+redis.call('DEL', KEYS[1])
+local count = redis.call('ZCARD', KEYS[2])
+local max_tokens = tonumber(ARGV[1])
+if count > max_tokens then
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, count - max_tokens - 1)
+end
+if ttl > 0 then
+    redis.call('PEXPIRE', KEYS[2], ttl)
+end
+return 1
+"""
+
+# EVALSHA с автоматической загрузкой скрипта при NOSCRIPT.
+# Скрипты выполняются на клиенте, выбранном _get_client()
+_add_script = redis_client.register_script(_ADD_LUA)
+_rotate_script = redis_client.register_script(_ROTATE_LUA)
+_keep_only_script = redis_client.register_script(_KEEP_ONLY_LUA)
+_move_key_script = redis_client.register_script(_MOVE_KEY_LUA)
+
+
+def _get_client() -> Redis | RedisCluster:
+    """
+    Компактный формат работает с бинарными jti, поэтому нужен клиент без decode_responses
+    """
+    if auth_settings.refresh_token_compact_jti:
+        return redis_bytes_client
+    return redis_client
+
+
+def _refresh_key(user_id: UUID, hash_tagged: bool | None = None) -> str:
+    """
+    :param hash_tagged: Раскладка ключа (по умолчанию — из настроек)
+    """
+    if hash_tagged is None:
+        hash_tagged = auth_settings.refresh_token_hash_tagged_keys
+    if hash_tagged:
+        return f"refresh:{{{user_id}}}"
+    return f"refresh:{user_id}"
+
+
+async def move_refresh_key(user_id: UUID, to_hash_tagged: bool) -> bool:
+    """
+    Атомарно переносит refresh токены пользователя в ключ другой раскладки
+    (только в пределах одного узла redis)
+    :param user_id: UUID пользователя
+    :param to_hash_tagged: True — в refresh:{<user_id>}, False — в refresh:<user_id>
+    :return: Был ли ключ в исходной раскладке
+    """
+    source = _refresh_key(user_id, hash_tagged=not to_hash_tagged)
+    target = _refresh_key(user_id, hash_tagged=to_hash_tagged)
+    moved = await _move_key_script(
+        keys=[source, target], args=[MAX_REFRESH_TOKENS], client=_get_client()
+    )
+    if moved:
+        refresh_token_client_cache.invalidate(source)
+        refresh_token_client_cache.invalidate(target)
+    return bool(moved)
+
+
+async def _pick_up_legacy_key(user_id: UUID) -> bool:
+    """
+    Переносит ключ старой раскладки, пока миграция ключей не завершена
+    :return: Были ли перенесены токены
+    """
+    if not _LEGACY_KEY_FALLBACK:
+        return False
+    return await move_refresh_key(user_id, to_hash_tagged=True)
+
+
+def _jti_members(jti: UUID) -> list[str | bytes]:
+    """
+    Формы хранения jti в zset, первая — используемая для новых записей.
+    Проверка и удаление учитывают обе формы в любом режиме: ключи, еще не прошедшие
+    миграцию migrate_refresh_jti (в т.ч. при откате на строковую форму), остаются валидными
+    """
+    if auth_settings.refresh_token_compact_jti:
+        return [jti.bytes, str(jti)]
+    return [str(jti), jti.bytes]
+
+
+def _add_args() -> list[int]:
+    return [
+        int(time.time()),
+        MAX_REFRESH_TOKENS,
+        auth_settings.refresh_token_expires_in_seconds,
+    ]
+
 
 async def add_new_refresh_token(user_id: UUID, token_jti: UUID) -> None:
     """
-    Добавляет новый refresh токен пользователю, удаляет самый старый если токенов > 5
+    Добавляет новый refresh токен пользователю, удаляет самые старые если токенов > MAX_REFRESH_TOKENS
     :param user_id: UUID пользователя
     :param token_jti: UUID токена который будет сохранен
     """
-    key = f"refresh:{user_id}"
-
-    async with redis_client.lock(f"lock:refresh_tokens:{user_id}", timeout=5):
-        pipe = redis_client.pipeline()
-        pipe.zadd(key, {str(token_jti): int(time.time())})
-        pipe.zcard(key)
-        pipe.expire(key, auth_settings.refresh_token_expires_in)
+    await _add_script(
+        keys=[_refresh_key(user_id)],
+        args=[*_add_args(), _jti_members(token_jti)[0]],
+        client=_get_client(),
+    )
+    refresh_token_client_cache.invalidate(_refresh_key(user_id))
 
-        results = await pipe.execute()
-        _, count, _ = results
 
-        if count > MAX_REFRESH_TOKENS:
-            remove_count = count - MAX_REFRESH_TOKENS
-            await redis_client.zremrangebyrank(key, 0, remove_count - 1)
+async def rotate_refresh_token(
+    user_id: UUID, old_token_jti: UUID, new_token_jti: UUID
+) -> bool:
+    """
+    Атомарно заменяет refresh токен на новый (за один запрос к redis)
+    :param user_id: UUID пользователя
+    :param old_token_jti: UUID токена, по которому происходит обновление
+    :param new_token_jti: UUID нового токена
+    :return: False если старого токена нет в списке валидных (ничего не изменено)
+    """
+    await _pick_up_legacy_key(user_id)
+    rotated = await _rotate_script(
+        keys=[_refresh_key(user_id)],
+        args=[
+            *_add_args(),
+            _jti_members(new_token_jti)[0],
+            *_jti_members(old_token_jti),
+        ],
+        client=_get_client(),
+    )
+    refresh_token_client_cache.invalidate(_refresh_key(user_id))
+    return bool(rotated)
 
 
 async def remove_all_refresh_tokens_except(
     user_id: UUID, except_token_jti: UUID
-) -> None:
+) -> int:
     """
-    Удаляет refresh token пользователя кроме определенного
+    Удаляет refresh token пользователя кроме определенного (атомарно, за один запрос)
     :param user_id: UUID пользователя
     :param except_token_jti: UUID токена который будет сохранен
+    :return: Кол-во удаленных токенов
     """
-    lock_key = f"lock:change_password:{user_id}"
-    async with redis_client.lock(lock_key, timeout=5):
-        key = f"refresh:{user_id}"
-        pipe = redis_client.pipeline()
-
-        pipe.zrange(key, 0, -1)
-        results = await pipe.execute()
-        all_tokens = results[0]
-
-        tokens_to_remove = [
-            token for token in all_tokens if token != str(except_token_jti)
-        ]
-        if tokens_to_remove:
-            pipe.zrem(key, *tokens_to_remove)
-            await pipe.execute()
+    await _pick_up_legacy_key(user_id)
+    removed = await _keep_only_script(
+        keys=[_refresh_key(user_id)],
+        args=_jti_members(except_token_jti),
+        client=_get_client(),
+    )
+    refresh_token_client_cache.invalidate(_refresh_key(user_id))
+    return removed
 
 
 async def remove_refresh_token(user_id: UUID, token_jti: UUID) -> None:
@@ -61,23 +244,41 @@ async def remove_refresh_token(user_id: UUID, token_jti: UUID) -> None:
     :param user_id: UUID пользователя
     :param token_jti: UUID токена
     """
-    await redis_client.zrem(f"refresh:{user_id}", str(token_jti))
+    await _pick_up_legacy_key(user_id)
+    await _get_client().zrem(_refresh_key(user_id), *_jti_members(token_jti))
+    refresh_token_client_cache.invalidate(_refresh_key(user_id))
 
 
-async def remove_all_refresh_tokens(user_id: UUID) -> None:
+async def remove_all_refresh_tokens(user_id: UUID) -> int:
     """
     Удаляет ВСЕ refresh токены пользователя
     :param user_id: UUID пользователя
+    :return: Кол-во удаленных токенов
     """
-    await redis_client.delete(f"refresh:{user_id}")
+    await _pick_up_legacy_key(user_id)
+    removed = await _keep_only_script(
+        keys=[_refresh_key(user_id)], args=[""], client=_get_client()
+    )
+    refresh_token_client_cache.invalidate(_refresh_key(user_id))
+    return removed
 
 
 async def is_refresh_jti_valid(user_id: UUID, jti: UUID) -> bool:
     """
     Проверяет, есть ли refresh токен в списке валидных
+    (при AUTH_REFRESH_TOKEN_CLIENT_CACHE — через локальный кэш с инвалидацией от redis)
     :param user_id:
     :param jti:
     :return:
     """
-    score = await redis_client.zscore(f"refresh:{user_id}", str(jti))
-    return score is not None
+    key = _refresh_key(user_id)
+    members = _jti_members(jti)
+
+    async def fetch() -> bool:
+        # zmscore() типизирован только для str, jti может быть в форме bytes
+        scores = await _get_client().execute_command("ZMSCORE", key, *members)
+        return any(score is not None for score in scores)
+
+    if await refresh_token_client_cache.get_or_fetch(key, str(jti), fetch):
+        return True
+    return await _pick_up_legacy_key(user_id) and await fetch()
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+
+from redis.asyncio.connection import AbstractConnection
+from redis.exceptions import ResponseError
+
+from ...config import get_settings
+from ...metrics import metrics
+from ...redis.pubsub import pubsub_listener
+from ..config import get_auth_settings
+
+logger = getLogger(__name__)
+
+auth_settings = get_auth_settings()
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+TRACKED_PREFIX = "refresh:"
+
+
+class RefreshTokenClientCache:
+    """
+    Кэш проверок refresh токенов (refresh:{user_id} -> {jti: валиден ли}) в памяти воркера
+    на основе server-assisted client side caching redis.
+
+    Соединение pub/sub слушателя включает CLIENT TRACKING ... REDIRECT на себя в режиме
+    BCAST для префикса refresh:, поэтому при любом изменении или истечении ключа
+    (из любого воркера) приходит сообщение инвалидации и запись удаляется.
+    Пока отслеживание не активно (нет соединения, сервер не поддерживает) кэш не используется.
+
+    Если инвалидация ключа пришла во время чтения из redis, результат чтения не кэшируется:
+    ответ мог быть получен до изменения, а сообщение — уже обработано.
+    """
+
+    def __init__(self, max_keys: int):
+        self._max_keys = max_keys
+        self._entries: OrderedDict[str, dict[str, bool]] = OrderedDict()
+        self._in_flight: dict[str, int] = {}  # кол-во текущих чтений по ключу
+        self._dirty: set[str] = set()  # ключи, инвалидированные во время чтения
+        self._tracking = False
+        self.active = False
+
+        self._hits = metrics.counter(
+            "auth_refresh_token_client_cache_hits_total",
+            "Проверки refresh токенов из локального кэша",
+        )
+        self._misses = metrics.counter(
+            "auth_refresh_token_client_cache_misses_total",
+            "Проверки refresh токенов, ушедшие в redis",
+        )
+        metrics.gauge(
+            "auth_refresh_token_client_cache_keys",
+            "Кол-во ключей refresh:* в локальном кэше",
+            callback=lambda: len(self._entries),
+        )
+
+    async def get_or_fetch(
+        self, key: str, member: str, fetch: Callable[[], Awaitable[bool]]
+    ) -> bool:
+        """
+        :param key: Ключ refresh:{user_id}
+        :param member: jti
+        :param fetch: Проверка в redis при промахе
+        """
+        if not self.active:
+            return await fetch()
+
+        members = self._entries.get(key)
+        if members is not None and member in members:
+            self._entries.move_to_end(key)
+            self._hits.inc()
+            return members[member]
+
+        self._misses.inc()
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        try:
+            result = await fetch()
+            if self.active and key not in self._dirty:
+                self._entries.setdefault(key, {})[member] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_keys:
+                    self._entries.popitem(last=False)
+            return result
+        finally:
+            self._in_flight[key] -= 1
+            if not self._in_flight[key]:
+                del self._in_flight[key]
+                self._dirty.discard(key)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Удаляет запись ключа (сообщение инвалидации или запись из этого воркера)
+        """
+        self._entries.pop(key, None)
+        if key in self._in_flight:
+            self._dirty.add(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dirty.update(self._in_flight)
+
+    def handle_invalidation(self, keys: list[str] | None) -> None:
+        # None — сервер сбросил все отслеживаемые ключи (FLUSHALL и т.п.)
+        if keys is None:
+            self.clear()
+            return
+        for key in keys:
+            self.invalidate(key)
+
+    async def setup_tracking(
+        self, connection: AbstractConnection, client_id: int
+    ) -> None:
+        """
+        Включает отслеживание ключей refresh:* с перенаправлением на соединение слушателя
+        """
+        await connection.send_command(
+            "CLIENT",
+            "TRACKING",
+            "ON",
+            "REDIRECT",
+            client_id,
+            "BCAST",
+            "PREFIX",
+            TRACKED_PREFIX,
+        )
+        try:
+            await connection.read_response()
+        except ResponseError as e:
+            logger.error("CLIENT TRACKING is not available, cache is disabled: %s", e)
+            self._tracking = False
+            return
+        self._tracking = True
+
+    async def activate(self) -> None:
+        # вызывается после подписки на канал инвалидации
+        self.clear()
+        self.active = self._tracking
+
+    def deactivate(self) -> None:
+        self.active = False
+        self._tracking = False
+        self.clear()
+
+
+refresh_token_client_cache = RefreshTokenClientCache(
+    max_keys=auth_settings.refresh_token_client_cache_size
+)
+
+if auth_settings.refresh_token_client_cache and get_settings().redis_cluster:
+    # отслеживание работает только для ключей узла, к которому подключен слушатель
+    logger.warning("Refresh token client cache is not supported with Redis Cluster")
+elif auth_settings.refresh_token_client_cache:
+    pubsub_listener.add_connection_setup(refresh_token_client_cache.setup_tracking)
+    pubsub_listener.subscribe(
+        INVALIDATION_CHANNEL, refresh_token_client_cache.handle_invalidation
+    )
+    pubsub_listener.on_reconnect(refresh_token_client_cache.activate)
+    pubsub_listener.on_disconnect(refresh_token_client_cache.deactivate)
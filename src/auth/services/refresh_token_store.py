@@ -0,0 +1,86 @@
+from typing import Protocol
+from uuid import UUID
+
+from ..config import get_auth_settings
+from . import redis_refresh_token_service
+from .memory_refresh_token_store import InMemoryRefreshTokenStore
+
+auth_settings = get_auth_settings()
+
+
+class RefreshTokenStore(Protocol):
+    """
+    Хранилище списков разрешенных refresh токенов (jti) пользователей
+    """
+
+    async def add_new_refresh_token(self, user_id: UUID, token_jti: UUID) -> None:
+        """
+        Добавляет новый refresh токен, удаляет самые старые если токенов > MAX_REFRESH_TOKENS
+        """
+        ...
+
+    async def rotate_refresh_token(
+        self, user_id: UUID, old_token_jti: UUID, new_token_jti: UUID
+    ) -> bool:
+        """
+        Атомарно заменяет refresh токен на новый
+        :return: False если старого токена нет в списке валидных (ничего не изменено)
+        """
+        ...
+
+    async def remove_all_refresh_tokens_except(
+        self, user_id: UUID, except_token_jti: UUID
+    ) -> int:
+        """
+        :return: Кол-во удаленных токенов
+        """
+        ...
+
+    async def remove_refresh_token(self, user_id: UUID, token_jti: UUID) -> None: ...
+
+    async def remove_all_refresh_tokens(self, user_id: UUID) -> int:
+        """
+        :return: Кол-во удаленных токенов
+        """
+        ...
+
+    async def is_refresh_jti_valid(self, user_id: UUID, jti: UUID) -> bool: ...
+
+
+class RedisRefreshTokenStore:
+    """
+    Хранилище в redis (общее для всех воркеров), см. redis_refresh_token_service
+    """
+
+    add_new_refresh_token = staticmethod(
+        redis_refresh_token_service.add_new_refresh_token
+    )
+    rotate_refresh_token = staticmethod(
+        redis_refresh_token_service.rotate_refresh_token
+    )
+    remove_all_refresh_tokens_except = staticmethod(
+        redis_refresh_token_service.remove_all_refresh_tokens_except
+    )
+    remove_refresh_token = staticmethod(
+        redis_refresh_token_service.remove_refresh_token
+    )
+    remove_all_refresh_tokens = staticmethod(
+        redis_refresh_token_service.remove_all_refresh_tokens
+    )
+    is_refresh_jti_valid = staticmethod(
+        redis_refresh_token_service.is_refresh_jti_valid
+    )
+
+
+def create_refresh_token_store(backend: str) -> RefreshTokenStore:
+    """
+    :param backend: redis или memory (AUTH_REFRESH_TOKEN_STORE)
+    """
+    if backend == "memory":
+        return InMemoryRefreshTokenStore(
+            ttl_seconds=auth_settings.refresh_token_expires_in_seconds
+        )
+    return RedisRefreshTokenStore()
+
+
+refresh_token_store = create_refresh_token_store(auth_settings.refresh_token_store)
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from logging import getLogger
+from typing import NamedTuple
+
+from ...metrics import metrics
+from ...redis.client import redis_client
+from ..config import get_auth_settings
+
+logger = getLogger(__name__)
+
+auth_settings = get_auth_settings()
+
+SWEEPER_LOCK_KEY = "lock:refresh_token_sweeper"
+
+
+class SweepResult(NamedTuple):
+    keys_scanned: int
+    keys_cleaned: int  # ключи, из которых удален хотя бы один jti
+    keys_deleted: int  # ключи, ставшие пустыми
+    members_removed: int
+
+
+class RefreshTokenSweeper:
+    """
+    Фоновая очистка refresh:{user_id} от jti, выпущенных раньше, чем живет refresh токен.
+    Ключи обходятся SCAN пачками, по каждой пачке один pipeline с ZREMRANGEBYSCORE.
+    Скорость ограничена max_keys_per_second, чтобы не конкурировать с запросами.
+    За один интервал очистку выполняет только один воркер (lock в redis).
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int,
+        batch_size: int,
+        max_keys_per_second: int,
+        max_age_seconds: int,
+    ):
+        self._interval_seconds = interval_seconds
+        self._batch_size = batch_size
+        self._max_keys_per_second = max_keys_per_second
+        self._max_age_seconds = max_age_seconds
+        self._task: asyncio.Task | None = None
+
+        self._keys_scanned = metrics.counter(
+            "auth_refresh_sweeper_keys_scanned_total", "Просмотрено ключей refresh:*"
+        )
+        self._keys_cleaned = metrics.counter(
+            "auth_refresh_sweeper_keys_cleaned_total",
+            "Ключи refresh:*, из которых удалены истекшие jti",
+        )
+        self._keys_deleted = metrics.counter(
+            "auth_refresh_sweeper_keys_deleted_total",
+            "Ключи refresh:*, удаленные после очистки (стали пустыми)",
+        )
+        self._members_removed = metrics.counter(
+            "auth_refresh_sweeper_members_removed_total", "Удалено истекших jti"
+        )
+
+    async def sweep_once(self) -> SweepResult:
+        """
+        Один полный проход по ключам refresh:*
+        :return: Статистика прохода
+        """
+        max_score = int(time.time()) - self._max_age_seconds
+        scanned = cleaned = deleted = removed = 0
+
+        async for keys in self._scan_batches():
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.zremrangebyscore(key, "-inf", max_score)
+                pipe.exists(key)
+            results = await pipe.execute()
+
+            for removed_count, exists in zip(results[::2], results[1::2], strict=True):
+                if removed_count:
+                    cleaned += 1
+                    removed += removed_count
+                    deleted += not exists
+            scanned += len(keys)
+
+            # Ограничение скорости: не более max_keys_per_second ключей
+            await asyncio.sleep(len(keys) / self._max_keys_per_second)
+
+        self._keys_scanned.inc(scanned)
+        self._keys_cleaned.inc(cleaned)
+        self._keys_deleted.inc(deleted)
+        self._members_removed.inc(removed)
+
+        return SweepResult(scanned, cleaned, deleted, removed)
+
+    async def _scan_batches(self) -> AsyncIterator[list[str]]:
+        """
+        Ключи refresh:* пачками по batch_size (scan_iter обходит все основные узлы
+        и в режиме redis cluster)
+        """
+        batch: list[str] = []
+        async for key in redis_client.scan_iter(
+            match="refresh:*", count=self._batch_size
+        ):
+            batch.append(key)
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            try:
+                if not await redis_client.set(
+                    SWEEPER_LOCK_KEY, "1", nx=True, ex=self._interval_seconds
+                ):
+                    continue  # в этом интервале очистку выполняет другой воркер
+
+                result = await self.sweep_once()
+                logger.info(
+                    "Refresh token sweep: scanned %d keys, cleaned %d, deleted %d, "
+                    "removed %d expired jti",
+                    *result,
+                )
+            except Exception as e:
+                logger.error("Refresh token sweep failed: %s", e)
+
+    def start(self) -> None:
+        if self._task is None and self._interval_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+refresh_token_sweeper = RefreshTokenSweeper(
+    # в хранилище в памяти истекшие наборы токенов удаляются самим хранилищем
+    interval_seconds=auth_settings.refresh_sweep_interval_seconds
+    if auth_settings.refresh_token_store == "redis"
+    else 0,
+    batch_size=auth_settings.refresh_sweep_batch_size,
+    max_keys_per_second=auth_settings.refresh_sweep_max_keys_per_second,
+    max_age_seconds=auth_settings.refresh_token_expires_in_seconds,
+)
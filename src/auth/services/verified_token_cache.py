@@ -0,0 +1,116 @@
+import hashlib
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from ...metrics import metrics
+from ..config import get_auth_settings
+from ..schemas import TokenPayloadSchema
+
+auth_settings = get_auth_settings()
+
+
+class VerifiedTokenCache:
+    """
+    LRU кэш уже проверенных access токенов (в памяти воркера).
+    Ключ — хэш токена, запись живет до exp токена. При попадании подпись
+    и Pydantic валидация не выполняются.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[TokenPayloadSchema, float]] = (
+            OrderedDict()
+        )
+        self._by_user: dict[UUID, set[bytes]] = {}
+
+        self._hits = metrics.counter(
+            "auth_verified_token_cache_hits_total", "Попадания в кэш access токенов"
+        )
+        self._misses = metrics.counter(
+            "auth_verified_token_cache_misses_total", "Промахи кэша access токенов"
+        )
+        metrics.gauge(
+            "auth_verified_token_cache_size",
+            "Кол-во access токенов в кэше",
+            callback=lambda: len(self._entries),
+        )
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+    def get(self, token: str) -> TokenPayloadSchema | None:
+        """
+        :param token: Access токен
+        :return: Payload ранее проверенного токена или None, если его нет в кэше или он истек
+        """
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses.inc()
+            return None
+
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            self._remove(key, payload.sub)
+            self._misses.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return payload
+
+    def put(self, token: str, payload: TokenPayloadSchema) -> None:
+        """
+        Сохраняет payload проверенного токена до истечения его срока действия
+        :param token: Access токен
+        :param payload: Провалидированный payload токена
+        """
+        if self._max_size <= 0:
+            return
+
+        key = self._digest(token)
+        self._entries[key] = (payload, payload.exp.timestamp())
+        self._entries.move_to_end(key)
+        self._by_user.setdefault(payload.sub, set()).add(key)
+
+        while len(self._entries) > self._max_size:
+            old_key, (old_payload, _) = self._entries.popitem(last=False)
+            self._discard_user_key(old_payload.sub, old_key)
+
+    def evict(self, token: str) -> None:
+        """
+        Удаляет токен из кэша
+        :param token: Access токен
+        """
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._remove(key, entry[0].sub)
+
+    def evict_user(self, user_id: UUID) -> None:
+        """
+        Удаляет из кэша все токены пользователя (используется при отзыве токенов)
+        :param user_id: UUID пользователя
+        """
+        for key in self._by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_user.clear()
+
+    def _remove(self, key: bytes, user_id: UUID) -> None:
+        self._entries.pop(key, None)
+        self._discard_user_key(user_id, key)
+
+    def _discard_user_key(self, user_id: UUID, key: bytes) -> None:
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+verified_token_cache = VerifiedTokenCache(auth_settings.access_token_cache_size)
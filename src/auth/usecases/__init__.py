@@ -1,6 +1,7 @@
 from .change_user_password import change_user_password
 from .logout_user import logout_user
 from .refresh_user_tokens import refresh_user_tokens
+from .rehash_user_password import rehash_user_password
 from .sign_in_user import sign_in_user
 from .sign_up_user import sign_up_user
 
@@ -10,4 +11,5 @@ __all__ = [
     "refresh_user_tokens",
     "logout_user",
     "change_user_password",
+    "rehash_user_password",
 ]
@@ -10,10 +10,11 @@ from ..exceptions import (
 )
 from ..schemas import ChangePasswordSchema
 from ..services import (
-    is_refresh_jti_valid,
-    remove_all_refresh_tokens_except,
+    password_hashing_engine,
+    refresh_token_store,
+    revoke_access_tokens,
 )
-from ..utils import JWTUtils, PasswordUtils
+from ..utils import JWTUtils
 
 logger = getLogger(__name__)
 
@@ -38,7 +39,7 @@ async def change_user_password(
 
     refresh_token_payload = JWTUtils.decode_token(refresh_token)
 
-    if not await is_refresh_jti_valid(
+    if not await refresh_token_store.is_refresh_jti_valid(
         refresh_token_payload.sub,
         refresh_token_payload.jti,  # ty: ignore[invalid-argument-type]
     ):
@@ -46,13 +47,18 @@ async def change_user_password(
 
     user = await get_user(refresh_token_payload.sub, session)
 
-    if not PasswordUtils.verify_password(user.hashed_password, passwords.old_password):
+    if not await password_hashing_engine.verify_password(
+        user.hashed_password, passwords.old_password
+    ):
         raise InvalidOldPasswordException()
 
-    user.hashed_password = PasswordUtils.hash_password(passwords.new_password)
+    user.hashed_password = await password_hashing_engine.hash_password(
+        passwords.new_password
+    )
     await session.commit()
 
-    await remove_all_refresh_tokens_except(
+    await refresh_token_store.remove_all_refresh_tokens_except(
         user_id=refresh_token_payload.sub,
         except_token_jti=refresh_token_payload.jti,  # ty: ignore[invalid-argument-type]
     )
+    await revoke_access_tokens(refresh_token_payload.sub)
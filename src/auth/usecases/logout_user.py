@@ -1,10 +1,7 @@
 from logging import getLogger
 
 from ..exceptions import RefreshTokenNotWhitelisted
-from ..services import (
-    is_refresh_jti_valid,
-    remove_refresh_token,
-)
+from ..services import refresh_token_store, revoke_access_tokens
 from ..utils import JWTUtils
 
 logger = getLogger(__name__)
@@ -14,16 +11,23 @@ async def logout_user(
     refresh_token: str,
 ) -> None:
     """
-    Логика выхода пользователя с сайта (удаление refresh токена из списка разрешенных)
+    Логика выхода пользователя с сайта (удаление refresh токена из списка разрешенных).
+    Отзываются все ранее выданные access токены пользователя, в т.ч. на других
+    устройствах: отдельный access токен отозвать нельзя, другие устройства
+    получат новые access токены по своим refresh токенам
     :param refresh_token: Refresh токен
     :raises RefreshTokenNotWhitelisted: Если refresh токен уже не в списке разрешенных
     """
     refresh_token_payload = JWTUtils.decode_token(refresh_token)
 
-    if not await is_refresh_jti_valid(
+    if not await refresh_token_store.is_refresh_jti_valid(
         refresh_token_payload.sub,
         refresh_token_payload.jti,  # ty: ignore[invalid-argument-type]
     ):
         raise RefreshTokenNotWhitelisted()
 
-    await remove_refresh_token(refresh_token_payload.sub, refresh_token_payload.jti)  # type: ignore[arg-type]
+    await refresh_token_store.remove_refresh_token(
+        refresh_token_payload.sub,
+        refresh_token_payload.jti,  # ty: ignore[invalid-argument-type]
+    )
+    await revoke_access_tokens(refresh_token_payload.sub)
@@ -1,10 +1,6 @@
 from ..exceptions import RefreshTokenNotWhitelisted
 from ..schemas import TokenSchema
-from ..services import (
-    add_new_refresh_token,
-    is_refresh_jti_valid,
-    remove_refresh_token,
-)
+from ..services import refresh_token_store
 from ..utils import JWTUtils
 
 
@@ -19,19 +15,16 @@ async def refresh_user_tokens(
     """
     refresh_token_payload = JWTUtils.decode_token(refresh_token)
 
-    if not await is_refresh_jti_valid(
-        refresh_token_payload.sub,
-        refresh_token_payload.jti,  # ty: ignore[invalid-argument-type]
-    ):
-        raise RefreshTokenNotWhitelisted()
-
     new_tokens = JWTUtils.refresh_tokens(refresh_token_payload.sub)
 
-    await remove_refresh_token(
+    # Проверка и замена jti выполняются атомарно, повторное использование токена невозможно
+    if not await refresh_token_store.rotate_refresh_token(
         user_id=refresh_token_payload.sub,
-        token_jti=refresh_token_payload.jti,  # type: ignore[arg-type]
-    )
-    await add_new_refresh_token(refresh_token_payload.sub, new_tokens.refresh_token.jti)
+        old_token_jti=refresh_token_payload.jti,  # ty: ignore[invalid-argument-type]
+        new_token_jti=new_tokens.refresh_token.jti,
+    ):
+        raise RefreshTokenNotWhitelisted()
+
     return TokenSchema(
         access_token=new_tokens.access_token,
         refresh_token=new_tokens.refresh_token.token,
@@ -0,0 +1,42 @@
+from logging import getLogger
+from uuid import UUID
+
+from sqlalchemy import update
+
+from ...database import AsyncSessionLocal
+from ...user import User
+from ..exceptions import PasswordHashingOverloadedException
+from ..services import password_hashing_engine
+
+logger = getLogger(__name__)
+
+
+async def rehash_user_password(
+    user_id: UUID,
+    old_hashed_password: str,
+    password: str,
+) -> None:
+    """
+    Перехэширование пароля с актуальными параметрами argon2 (фоновая задача после входа).
+    Хэш обновляется только если пароль не был изменен за время перехэширования.
+    :param user_id: UUID пользователя
+    :param old_hashed_password: Хэш, с которым был выполнен вход
+    :param password: Пароль пользователя
+    """
+    try:
+        new_hashed_password = await password_hashing_engine.hash_password(password)
+    except PasswordHashingOverloadedException:
+        # Не нагружаем и так перегруженный пул, перехэшируем при следующем входе
+        return
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hashed_password)
+            .values(hashed_password=new_hashed_password)
+        )
+        await session.commit()
+
+    logger.info(
+        "Password hash of user %s upgraded to current argon2 parameters", user_id
+    )
@@ -1,31 +1,44 @@
+from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...user.services import get_user_by_identifier
+from ...user.services import get_user_credentials
 from ..exceptions import InvalidPasswordException
 from ..schemas import SignInSchema, TokenSchema
-from ..services import add_new_refresh_token
+from ..services import password_hashing_engine, refresh_token_store
 from ..utils import JWTUtils, PasswordUtils
+from .rehash_user_password import rehash_user_password
 
 
 async def sign_in_user(
     user_in: SignInSchema,
     session: AsyncSession,
+    background_tasks: BackgroundTasks,
 ) -> TokenSchema:
     """
     Логика входа пользователя на сайт
     :param user_in: Схема данных для входа
     :param session: Сессия
+    :param background_tasks: Фоновые задачи (перехэширование пароля с новыми параметрами)
     :return: Схема содержащая access и refresh токены
     :raises InvalidPasswordException: Если пароль неверен
     """
-    user = await get_user_by_identifier(user_in.identifier, session)
+    user = await get_user_credentials(user_in.identifier, session)
 
-    if not PasswordUtils.verify_password(user.hashed_password, user_in.password):
+    if not await password_hashing_engine.verify_password(
+        user.hashed_password, user_in.password
+    ):
         raise InvalidPasswordException()
 
+    if PasswordUtils.check_needs_rehash(user.hashed_password):
+        background_tasks.add_task(
+            rehash_user_password, user.id, user.hashed_password, user_in.password
+        )
+
     access_token = JWTUtils.create_access_token(user.id)
     refresh_token = JWTUtils.create_refresh_token(user.id)
 
-    await add_new_refresh_token(user_id=user.id, token_jti=refresh_token.jti)
+    await refresh_token_store.add_new_refresh_token(
+        user_id=user.id, token_jti=refresh_token.jti
+    )
 
     return TokenSchema(access_token=access_token, refresh_token=refresh_token.token)
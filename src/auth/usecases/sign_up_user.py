@@ -4,10 +4,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...user import User, UserProfile
 from ...user.exceptions import LoginAlreadyInUseException
-from ...user.services import check_email_unique
+from ...user.services import (
+    check_user_uniqueness,
+    identifier_negative_cache,
+    user_bloom_filter,
+)
 from ..schemas import SignUpSchema, TokenSchema
-from ..services import add_new_refresh_token
-from ..utils import JWTUtils, PasswordUtils
+from ..services import password_hashing_engine, refresh_token_store
+from ..utils import JWTUtils
 
 
 async def sign_up_user(
@@ -20,7 +24,7 @@ async def sign_up_user(
     :param session: Сессия
     :return: Схема содержащая access и refresh токены
     """
-    hashed_password = PasswordUtils.hash_password(user_in.password)
+    hashed_password = await password_hashing_engine.hash_password(user_in.password)
 
     user = User(
         login=user_in.login,
@@ -41,16 +45,21 @@ async def sign_up_user(
         await session.rollback()
         if isinstance(err.orig, UniqueViolationError):
             # если выбросит EmailAlreadyInUseException
-            await check_email_unique(user_in.email, session)
+            await check_user_uniqueness(
+                session, email=user_in.email, use_bloom_filter=False
+            )
             # если не выбросило, значит email свободен, ошибка по логину
             raise LoginAlreadyInUseException() from err
         raise
 
+    await user_bloom_filter.add(user.login, user.email)
+    await identifier_negative_cache.invalidate(user.login, user.email)
+
     # Создание токенов
     access_token = JWTUtils.create_access_token(user.id)
     refresh_token = JWTUtils.create_refresh_token(user.id)
 
     # Сохраняем refresh_token в БД/Redis
-    await add_new_refresh_token(user.id, refresh_token.jti)
+    await refresh_token_store.add_new_refresh_token(user.id, refresh_token.jti)
 
     return TokenSchema(access_token=access_token, refresh_token=refresh_token.token)
@@ -1,23 +1,26 @@
-from datetime import UTC, datetime, timedelta
+import time
 from logging import getLogger
 from uuid import UUID, uuid4
 
 from argon2 import PasswordHasher
 from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
-from jose import ExpiredSignatureError, JWTError, jwt
+from pydantic import ValidationError
 
 from .config import get_auth_settings
-from .exceptions import (
-    InvalidTokenException,
-    TokenExpiredException,
-)
+from .exceptions import InvalidTokenException
+from .jwt_codecs import get_jwt_codec
 from .schemas import RefreshTokenDataSchema, TokenPayloadSchema, TokenRefreshSchema
 
 logger = getLogger(__name__)
 
 
 class PasswordUtils:
-    __password_hasher = PasswordHasher()
+    __auth_settings = get_auth_settings()
+    __password_hasher = PasswordHasher(
+        time_cost=__auth_settings.argon2_time_cost,
+        memory_cost=__auth_settings.argon2_memory_cost,
+        parallelism=__auth_settings.argon2_parallelism,
+    )
 
     @classmethod
     def hash_password(cls, password: str) -> str:
@@ -28,6 +31,25 @@ class PasswordUtils:
         """
         return cls.__password_hasher.hash(password)
 
+    @classmethod
+    def check_needs_rehash(cls, hashed_password: str) -> bool:
+        """
+        Проверяет, создан ли хэш с параметрами, отличными от текущих настроек
+        :param hashed_password: Хэшированный пароль
+        """
+        try:
+            return cls.__password_hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError as e:
+            logger.error(e)
+            return False
+
+    @classmethod
+    def get_memory_cost(cls) -> int:
+        """
+        :return: Память, необходимая argon2 на один хэш (KiB)
+        """
+        return cls.__password_hasher.memory_cost
+
     @classmethod
     def verify_password(cls, hashed_password: str, password: str) -> bool:
         """
@@ -47,6 +69,7 @@ class PasswordUtils:
 
 class JWTUtils:
     __auth_settings = get_auth_settings()
+    __codec = get_jwt_codec()
 
     @classmethod
     def create_access_token(cls, user_id: str | UUID) -> str:
@@ -54,19 +77,16 @@ class JWTUtils:
         Создает access token
         :param user_id: UUID пользователя
         """
-        now = datetime.now(UTC)
+        now = time.time()
 
         payload = {
-            "iat": now,
+            # Миллисекунды — для сравнения с водяным знаком отзыва access токенов
+            "iat": round(now, 3),
             "sub": str(user_id),
-            "exp": now + timedelta(minutes=cls.__auth_settings.access_token_expires_in),
+            "exp": int(now) + cls.__auth_settings.access_token_expires_in * 60,
         }
 
-        return jwt.encode(
-            claims=payload,
-            key=cls.__auth_settings.jwt_secret,
-            algorithm=cls.__auth_settings.jwt_algorithm,
-        )
+        return cls.__codec.encode(payload)
 
     @classmethod
     def create_refresh_token(cls, user_id: str | UUID) -> RefreshTokenDataSchema:
@@ -75,24 +95,16 @@ class JWTUtils:
         :param user_id: UUID пользователя
         """
         jti = uuid4()
-        now = datetime.now(UTC)
+        now = int(time.time())
 
         payload = {
             "iat": now,
             "sub": str(user_id),
-            "exp": now
-            + timedelta(minutes=cls.__auth_settings.refresh_token_expires_in),
+            "exp": now + cls.__auth_settings.refresh_token_expires_in * 60,
             "jti": str(jti),
         }
 
-        return RefreshTokenDataSchema(
-            token=jwt.encode(
-                claims=payload,
-                key=cls.__auth_settings.jwt_secret,
-                algorithm=cls.__auth_settings.jwt_algorithm,
-            ),
-            jti=jti,
-        )
+        return RefreshTokenDataSchema(token=cls.__codec.encode(payload), jti=jti)
 
     @classmethod
     def decode_token(cls, token: str) -> TokenPayloadSchema:
@@ -102,16 +114,10 @@ class JWTUtils:
         :raises TokenExpiredException: Если истекло время жизни токена
         :raises InvalidTokenException: При любой другой проблеме с токеном
         """
+        payload = cls.__codec.decode(token)
         try:
-            payload = jwt.decode(
-                token,
-                key=cls.__auth_settings.jwt_secret,
-                algorithms=cls.__auth_settings.jwt_algorithm,
-            )
             return TokenPayloadSchema.model_validate(payload)
-        except ExpiredSignatureError as err:
-            raise TokenExpiredException() from err
-        except JWTError as err:
+        except ValidationError as err:
             raise InvalidTokenException() from err
 
     @classmethod
@@ -33,6 +33,14 @@ class Settings(BaseSettings):
     redis_host: str
     redis_port: int
     redis_out_port: int
+    redis_max_connections: int = 100  # на один клиент воркера
+    redis_pool_timeout: float = 1.0  # ожидание свободного соединения пула, с
+    redis_socket_timeout: float = 2.0  # с
+    redis_socket_connect_timeout: float = 1.0  # с
+    redis_health_check_interval: int = 30  # с
+    redis_protocol: Literal[2, 3] = 2  # 3 — RESP3
+    redis_auto_pipeline: bool = False  # объединять команды одного тика цикла в пайплайн
+    redis_cluster: bool = False  # redis_host:redis_port — один из узлов redis cluster
 
     minio_root_user: str
     minio_root_password: str
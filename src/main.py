@@ -2,6 +2,8 @@ import asyncio
 import logging.config
 import os
 import sys
+from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
 from typing import TypedDict
 
@@ -11,11 +13,15 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import PlainTextResponse
 
 from .auth import auth_router
+from .auth.services import password_hashing_engine, refresh_token_sweeper
 from .config import get_settings
 from .logging_config import LOGGING_CONFIG
+from .metrics import metrics
 
 # To correctly load all models
 from .models import *  # noqa: F401, F403
+from .rate_limiter import hybrid_rate_limit_state
+from .redis import pubsub_listener, redis_manager
 from .user import profile_router
 
 BASE_DIR = Path(os.getcwd())  # project_root
@@ -39,6 +45,24 @@ if sys.platform != "win32" and settings.environment != "TEST":
     logger.info("uvloop enabled")
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None]:
+    # Each stop is registered right after its start succeeds, so if a later start fails
+    # the components already started are stopped (in reverse order)
+    async with AsyncExitStack() as stack:
+        await redis_manager.start()
+        stack.push_async_callback(redis_manager.stop)
+        await password_hashing_engine.start()
+        stack.push_async_callback(password_hashing_engine.stop)
+        refresh_token_sweeper.start()
+        stack.push_async_callback(refresh_token_sweeper.stop)
+        pubsub_listener.start()
+        stack.push_async_callback(pubsub_listener.stop)
+        hybrid_rate_limit_state.start()
+        stack.push_async_callback(hybrid_rate_limit_state.stop)
+        yield
+
+
 def create_app() -> FastAPI:
     docs_settings: ExtraAppConfig = {}
     if settings.environment != "PROD":
@@ -53,6 +77,7 @@ def create_app() -> FastAPI:
         title=settings.project_name,
         version=settings.version,
         default_response_class=ORJSONResponse,
+        lifespan=lifespan,
         **docs_settings,
     )
 
@@ -70,6 +95,11 @@ def create_app() -> FastAPI:
     async def health_check():
         return PlainTextResponse("OK")
 
+    # Метрики воркера (закрыты на nginx)
+    @fast_api_app.get("/metrics", include_in_schema=False)
+    async def metrics_snapshot():
+        return metrics.snapshot()
+
     # API Router
     api_router = APIRouter(prefix=settings.api_prefix)
     api_router.include_router(auth_router)
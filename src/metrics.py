@@ -0,0 +1,162 @@
+# Глобальный реестр метрик процесса (воркера uvicorn)
+import bisect
+from collections.abc import Callable, Sequence
+from threading import Lock
+from typing import Any, TypeVar
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)  # секунды
+
+
+class Counter:
+    """
+    Монотонно возрастающий счетчик
+    """
+
+    def __init__(self, description: str):
+        self.description = description
+        self._value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "counter", "value": self._value}
+
+
+class Gauge:
+    """
+    Текущее значение величины. Может быть задано вручную или вычисляться при чтении (callback)
+    """
+
+    def __init__(self, description: str, callback: Callable[[], float] | None = None):
+        self.description = description
+        self._value: float = 0
+        self._callback = callback
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._value -= amount
+
+    @property
+    def value(self) -> float:
+        if self._callback is not None:
+            return self._callback()
+        return self._value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    """
+    Гистограмма распределения значений (обычно латентность в секундах)
+    """
+
+    def __init__(
+        self, description: str, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        self.description = description
+        self._buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._buckets) + 1)  # последний — +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = Lock()  # observe может вызываться из потоков пула
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self._buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative = 0
+        buckets: dict[str, int] = {}
+        for bound, count in zip(
+            (*map(str, self._buckets), "+Inf"), self._counts, strict=True
+        ):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "type": "histogram",
+            "count": self._count,
+            "sum": self._sum,
+            "buckets": buckets,
+        }
+
+
+_Metric = TypeVar("_Metric", Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик. Повторная регистрация метрики с тем же именем возвращает существующую
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(name, Counter, lambda: Counter(description))
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        callback: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self._register(name, Gauge, lambda: Gauge(description, callback))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(name, Histogram, lambda: Histogram(description, buckets))
+
+    def _register(
+        self, name: str, kind: type[_Metric], factory: Callable[[], _Metric]
+    ) -> _Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = factory()
+        if not isinstance(metric, kind):
+            raise TypeError(
+                f"Metric {name} is already registered as {type(metric).__name__}"
+            )
+        return metric
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        :return: Текущее состояние всех метрик {имя: {type, value/count/...}}
+        """
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+metrics = MetricsRegistry()
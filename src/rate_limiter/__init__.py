@@ -0,0 +1,11 @@
+from .exceptions import RateLimitExceededException
+from .hybrid import hybrid_rate_limit_state
+from .keys import by_ip
+from .limiter import RateLimiter
+
+__all__ = [
+    "RateLimiter",
+    "RateLimitExceededException",
+    "by_ip",
+    "hybrid_rate_limit_state",
+]
@@ -0,0 +1,27 @@
+from functools import lru_cache
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class RateLimitSettings(BaseSettings):
+    enabled: bool = True
+    # exact — каждая проверка в redis; hybrid — проверки в памяти воркера
+    # с пакетной синхронизацией расхода квоты (см. HybridRateLimitState)
+    mode: Literal["exact", "hybrid"] = "exact"
+    hybrid_sync_interval_seconds: float = 0.5
+    # Доля лимита, которую воркер может разрешить по ключу между синхронизациями
+    hybrid_max_error: float = 0.1
+
+    model_config = SettingsConfigDict(
+        env_file=".env", extra="ignore", env_prefix="RATE_LIMIT_"
+    )
+
+
+# noinspection PyArgumentList
+@lru_cache
+def get_rate_limit_settings() -> RateLimitSettings:
+    """
+    Получение конфига ограничения частоты запросов
+    """
+    return RateLimitSettings()
@@ -0,0 +1,19 @@
+import math
+
+from starlette import status
+
+from ..exceptions import BaseAPIException
+
+
+class RateLimitExceededException(BaseAPIException):
+    """
+    Вызывается при превышении лимита запросов
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            msg="Too many requests, try again later",
+            err_type="api_error.too_many_requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
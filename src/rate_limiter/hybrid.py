@@ -0,0 +1,234 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from logging import getLogger
+
+from redis.exceptions import RedisError
+
+from ..config import get_settings
+from ..metrics import metrics
+from ..redis.client import redis_client
+from .config import get_rate_limit_settings
+from .scripts import gcra_consume_script, gcra_script
+
+logger = getLogger(__name__)
+
+rate_limit_settings = get_rate_limit_settings()
+
+
+@dataclass(slots=True)
+class _LocalBucket:
+    interval: float  # секунды между запросами
+    tolerance: float  # допустимое опережение, секунды
+    tat: float  # теоретическое время следующего запроса (time.monotonic)
+    pending: int = 0  # запросы, разрешенные локально и еще не учтенные в redis
+    touched: bool = True  # были ли запросы с прошлой синхронизации
+
+
+class HybridRateLimitState:
+    """
+    Приближенный режим лимитов: решение принимается по GCRA состоянию в памяти воркера,
+    а расход квоты отправляется в redis пачкой раз в sync_interval_seconds
+    (в ответ приходит общий TAT, учитывающий остальные воркеры).
+
+    Между синхронизациями воркер разрешает по ключу не больше
+    max(1, times * max_error) запросов сверх известного redis, дальше —
+    точная проверка. Превышение лимита ограничено этой долей на каждый воркер
+    за интервал синхронизации; запрещающие решения всегда точные.
+    """
+
+    def __init__(self, enabled: bool, sync_interval_seconds: float, max_error: float):
+        self._enabled = enabled
+        self._sync_interval_seconds = sync_interval_seconds
+        self._max_error = max_error
+        self._buckets: dict[str, _LocalBucket] = {}
+        self._task: asyncio.Task | None = None
+
+        self._local_decisions = metrics.counter(
+            "rate_limit_hybrid_local_decisions_total",
+            "Решения лимитов, принятые без обращения к redis",
+        )
+        self._sync_latency = metrics.histogram(
+            "rate_limit_hybrid_sync_seconds", "Время синхронизации лимитов с redis"
+        )
+        metrics.gauge(
+            "rate_limit_hybrid_buckets",
+            "Кол-во ключей лимитов в памяти воркера",
+            callback=lambda: len(self._buckets),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def local_quota(self, times: int) -> int:
+        return max(1, math.floor(times * self._max_error))
+
+    async def check(
+        self, redis_key: str, times: int, interval_ms: int, tolerance_ms: int
+    ) -> float | None:
+        """
+        :return: None, если запрос разрешен, иначе через сколько секунд повторить
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(redis_key)
+        if bucket is None:
+            bucket = await self._load(redis_key, interval_ms, tolerance_ms)
+
+        new_tat = max(bucket.tat, now) + bucket.interval
+        if new_tat - bucket.tolerance > now:
+            self._local_decisions.inc()
+            return new_tat - bucket.tolerance - now
+
+        if bucket.pending >= self.local_quota(times):
+            return await self._check_exact(redis_key, bucket, interval_ms, tolerance_ms)
+
+        bucket.tat = new_tat
+        bucket.pending += 1
+        bucket.touched = True
+        self._local_decisions.inc()
+        return None
+
+    async def _load(
+        self, redis_key: str, interval_ms: int, tolerance_ms: int
+    ) -> _LocalBucket:
+        (ahead_ms,) = await gcra_consume_script(
+            keys=[redis_key], args=[0, interval_ms], client=redis_client
+        )
+        bucket = self._buckets.setdefault(
+            redis_key,
+            _LocalBucket(
+                interval=interval_ms / 1000,
+                tolerance=tolerance_ms / 1000,
+                tat=time.monotonic() + ahead_ms / 1000,
+            ),
+        )
+        return bucket
+
+    async def _check_exact(
+        self,
+        redis_key: str,
+        bucket: _LocalBucket,
+        interval_ms: int,
+        tolerance_ms: int,
+    ) -> float | None:
+        """
+        Учитывает локальный расход по ключу и проверяет запрос в redis (один запрос)
+        """
+        pending, bucket.pending = bucket.pending, 0
+        # Пайплайн одного узла: с redis cluster гибридный режим не запускается
+        pipe = redis_client.pipeline(transaction=False)
+        await gcra_consume_script(
+            keys=[redis_key],
+            args=[pending, interval_ms],
+            client=pipe,  # ty: ignore[invalid-argument-type]
+        )
+        await gcra_script(
+            keys=[redis_key],
+            args=[interval_ms, tolerance_ms],
+            client=pipe,  # ty: ignore[invalid-argument-type]
+        )
+        try:
+            (ahead_ms,), (allowed, retry_after_ms) = await pipe.execute()
+        except RedisError:
+            bucket.pending += pending
+            raise
+
+        bucket.tat = (
+            time.monotonic()
+            + ahead_ms / 1000
+            + (bucket.interval if allowed else 0)
+            + bucket.pending * bucket.interval
+        )
+        return None if allowed else retry_after_ms / 1000
+
+    async def sync(self) -> None:
+        """
+        Отправляет накопленный расход всех ключей в redis и получает их общее состояние
+        """
+        keys = [key for key, bucket in self._buckets.items() if bucket.touched]
+        if not keys:
+            self._evict_idle()
+            return
+
+        sent = {key: self._buckets[key].pending for key in keys}
+        args: list[int | float] = []
+        for key in keys:
+            bucket = self._buckets[key]
+            bucket.touched = False
+            args += [sent[key], round(bucket.interval * 1000)]
+
+        started = time.perf_counter()
+        try:
+            ahead = await gcra_consume_script(keys=keys, args=args, client=redis_client)
+        except Exception as e:
+            if isinstance(e, RedisError):
+                logger.warning("Rate limit sync failed: %s", e)
+            else:
+                logger.exception("Rate limit sync failed")
+            # Расход отправится при следующей синхронизации
+            for key in keys:
+                self._buckets[key].touched = True
+            return
+        finally:
+            self._sync_latency.observe(time.perf_counter() - started)
+
+        now = time.monotonic()
+        for key, ahead_ms in zip(keys, ahead, strict=True):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            # запросы, разрешенные во время синхронизации, еще не учтены в redis
+            bucket.pending = max(0, bucket.pending - sent[key])
+            bucket.tat = now + ahead_ms / 1000 + bucket.pending * bucket.interval
+        self._evict_idle()
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        idle = [
+            key
+            for key, bucket in self._buckets.items()
+            if not bucket.touched and not bucket.pending and bucket.tat <= now
+        ]
+        for key in idle:
+            del self._buckets[key]
+
+    def start(self) -> None:
+        if self._task is None and self._enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await self.sync()  # не теряем расход, накопленный с последней синхронизации
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._sync_interval_seconds)
+            # Ошибка одной синхронизации не должна останавливать фоновую задачу
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Rate limit sync failed")
+
+
+_hybrid_enabled = rate_limit_settings.enabled and rate_limit_settings.mode == "hybrid"
+
+if _hybrid_enabled and get_settings().redis_cluster:
+    # Синхронизация отправляет расход всех ключей одним скриптом, а точная проверка —
+    # два скрипта одним пайплайном, в кластере ключи лимитов лежат в разных слотах
+    raise RuntimeError("RATE_LIMIT_MODE=hybrid is not supported with Redis Cluster")
+
+hybrid_rate_limit_state = HybridRateLimitState(
+    enabled=_hybrid_enabled,
+    sync_interval_seconds=rate_limit_settings.hybrid_sync_interval_seconds,
+    max_error=rate_limit_settings.hybrid_max_error,
+)
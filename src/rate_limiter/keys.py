@@ -0,0 +1,12 @@
+# Функции, определяющие, по кому считается лимит запросов
+from starlette.requests import Request
+
+
+async def by_ip(request: Request) -> str:
+    """
+    По IP клиента (за nginx — заголовок X-Real-IP)
+    """
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+    return request.client.host if request.client else "unknown"
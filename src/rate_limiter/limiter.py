@@ -0,0 +1,89 @@
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+
+from redis.exceptions import RedisError
+from starlette.requests import Request
+
+from ..metrics import metrics
+from ..redis.client import redis_client
+from .config import get_rate_limit_settings
+from .exceptions import RateLimitExceededException
+from .hybrid import hybrid_rate_limit_state
+from .keys import by_ip
+from .scripts import gcra_script
+
+logger = getLogger(__name__)
+
+rate_limit_settings = get_rate_limit_settings()
+
+KeyFunc = Callable[[Request], Awaitable[str]]
+
+
+class RateLimiter:
+    """
+    Зависимость FastAPI, ограничивающая частоту запросов (GCRA в redis, один запрос;
+    в режиме hybrid — приближенно, в памяти воркера).
+    Лимит — times запросов за seconds секунд, допускается всплеск до times запросов.
+    При недоступности redis запрос пропускается.
+
+    Пример:
+        @router.post("/sign_in", dependencies=[Depends(RateLimiter("sign_in", 10, 60))])
+    """
+
+    def __init__(
+        self,
+        name: str,
+        times: int,
+        seconds: float,
+        key: KeyFunc = by_ip,
+    ):
+        """
+        :param name: Название лимита (часть ключа redis)
+        :param times: Кол-во запросов за период
+        :param seconds: Период, секунды
+        :param key: Функция, определяющая по кому считается лимит
+        """
+        self.name = name
+        self.key = key
+        self.times = times
+        self.interval_ms = max(1, round(seconds * 1000 / times))
+        self.tolerance_ms = round(seconds * 1000)
+
+        self._rejected = metrics.counter(
+            f"rate_limit_{name}_rejected_total",
+            f"Запросы, отклоненные лимитом {name}",
+        )
+
+    async def __call__(self, request: Request) -> None:
+        """
+        :raises RateLimitExceededException: Если лимит превышен
+        """
+        if not rate_limit_settings.enabled:
+            return
+
+        redis_key = f"rate_limit:{self.name}:{await self.key(request)}"
+        try:
+            if hybrid_rate_limit_state.running:
+                retry_after = await hybrid_rate_limit_state.check(
+                    redis_key, self.times, self.interval_ms, self.tolerance_ms
+                )
+            else:
+                retry_after = await self._check_exact(redis_key)
+        except RedisError as e:
+            logger.warning("Rate limiter %s is unavailable: %s", self.name, e)
+            return
+
+        if retry_after is not None:
+            self._rejected.inc()
+            raise RateLimitExceededException(retry_after)
+
+    async def _check_exact(self, redis_key: str) -> float | None:
+        """
+        :return: None, если запрос разрешен, иначе через сколько секунд повторить
+        """
+        allowed, retry_after_ms = await gcra_script(
+            keys=[redis_key],
+            args=[self.interval_ms, self.tolerance_ms],
+            client=redis_client,
+        )
+        return None if allowed else retry_after_ms / 1000
@@ -0,0 +1,54 @@
+# Lua скрипты GCRA (generic cell rate algorithm). В ключе лимита хранится
+# "теоретическое время прибытия" (TAT) следующего запроса, мс по часам redis.
+from ..redis.client import redis_client
+
+# Проверка одного запроса. ARGV: [1] — интервал между запросами, мс,
+# [2] — допустимое опережение (размер всплеска), мс.
+# Возвращает {1, 0} если запрос разрешен, иначе {0, через сколько мс повторить}
+_GCRA_LUA = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, allow_at - now}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0}
+"""
+
+gcra_script = redis_client.register_script(_GCRA_LUA)
+
+# Учет расхода квоты, накопленного воркером, в GCRA ключах.
+# KEYS — ключи лимитов, ARGV — пары (кол-во запросов, интервал между запросами, мс).
+# Возвращает для каждого ключа, на сколько мс его TAT опережает текущее время
+_GCRA_CONSUME_LUA = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local result = {}
+for i, key in ipairs(KEYS) do
+    local consumed = tonumber(ARGV[i * 2 - 1])
+    local interval = tonumber(ARGV[i * 2])
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then
+        tat = now
+    end
+    if consumed > 0 then
+        tat = tat + consumed * interval
+        redis.call('SET', key, tat, 'PX', tat - now)
+    end
+    result[i] = tat - now
+end
+return result
+"""
+
+gcra_consume_script = redis_client.register_script(_GCRA_CONSUME_LUA)
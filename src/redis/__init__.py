@@ -1,3 +1,4 @@
-from .client import redis_client
+from .client import redis_bytes_client, redis_client, redis_manager
+from .pubsub import pubsub_listener
 
-__all__ = ["redis_client"]
+__all__ = ["redis_client", "redis_bytes_client", "redis_manager", "pubsub_listener"]
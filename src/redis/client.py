@@ -1,14 +1,264 @@
-from redis.asyncio import Redis
+import asyncio
+import time
+from logging import getLogger
+from typing import Any
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import ClusterPipeline, RedisCluster
+from redis.exceptions import RedisError
 
 from .. import get_settings
+from ..config import Settings
+from ..metrics import metrics
+
+logger = getLogger(__name__)
 
 settings = get_settings()
 
+_command_latency = metrics.histogram(
+    "redis_command_seconds", "Время выполнения одиночной команды redis"
+)
+_pipeline_latency = metrics.histogram(
+    "redis_pipeline_seconds", "Время выполнения пайплайна redis"
+)
+_auto_pipeline_size = metrics.histogram(
+    "redis_auto_pipeline_commands",
+    "Кол-во команд в одном автоматическом пайплайне",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            _pipeline_latency.observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    """
+    Клиент redis, записывающий латентность команд и пайплайнов в метрики
+    """
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            _command_latency.observe(time.perf_counter() - started)
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: str | None = None
+    ) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedRedisCluster(RedisCluster):
+    """
+    Клиент redis cluster, записывающий латентность команд в метрики
+    """
+
+    async def execute_command(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **kwargs)
+        finally:
+            _command_latency.observe(time.perf_counter() - started)
+
+
+class AutoPipelineRedis(InstrumentedRedis):
+    """
+    Клиент redis с автоматической конвейеризацией: команды, отправленные любыми корутинами
+    за один проход цикла событий, собираются и отправляются одним пайплайном
+    (без транзакции), каждая корутина получает свой результат или исключение.
+    Одиночная команда выполняется как обычно.
+
+    API совпадает с Redis (команды, скрипты через EVALSHA, NOSCRIPT), явные pipeline()
+    и pub/sub работают напрямую. Блокирующие команды (BLPOP и т.п.) задерживают
+    весь пакет — для них нужен обычный клиент.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queue: list[tuple[tuple, dict[str, Any], asyncio.Future]] = []
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def execute_command(self, *args, **options):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._queue:
+            loop.call_soon(self._flush)
+        self._queue.append((args, options, future))
+        return await future
+
+    def _flush(self) -> None:
+        batch, self._queue = self._queue, []
+        task = asyncio.create_task(self._execute_batch(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _execute_batch(
+        self, batch: list[tuple[tuple, dict[str, Any], asyncio.Future]]
+    ) -> None:
+        _auto_pipeline_size.observe(len(batch))
+        if len(batch) == 1:
+            args, options, future = batch[0]
+            try:
+                result = await super().execute_command(*args, **options)
+            except BaseException as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            return
+
+        try:
+            async with self.pipeline(transaction=False) as pipe:
+                for args, options, _ in batch:
+                    pipe.execute_command(*args, **options)
+                results = await pipe.execute(raise_on_error=False)
+        except BaseException as e:
+            results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results, strict=True):
+            if future.done():  # ожидающая корутина отменена
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+async def execute_and_publish(
+    pipe: Pipeline | ClusterPipeline, channel: str, message: str
+) -> list[Any]:
+    """
+    Выполняет пайплайн и публикует сообщение после его команд. В redis cluster PUBLISH
+    в пайплайне не поддерживается и отправляется отдельной командой после пайплайна
+    :param pipe: Пайплайн с командами
+    :return: Результаты команд пайплайна (без PUBLISH)
+    """
+    if isinstance(pipe, ClusterPipeline):
+        results = await pipe.execute()
+        await pipe.cluster_client.publish(channel, message)
+        return results
+
+    pipe.publish(channel, message)
+    return (await pipe.execute())[:-1]
+
+
+class RedisClientManager:
+    """
+    Фабрика клиентов redis с общими настройками пула соединений и таймаутов.
+    Пул ограничен (max_connections), при его исчерпании запрос ждет свободное
+    соединение не дольше redis_pool_timeout, а зависший redis обрывается по
+    socket таймаутам — задачи запросов не висят бесконечно.
+    Клиенты создаются при импорте, проверяются при старте приложения и закрываются при остановке.
+
+    При redis_cluster клиенты работают с кластером (redis_host:redis_port — любой его узел,
+    остальные узлы и слоты определяются автоматически), соединения ограничены
+    max_connections на каждый узел, redis_auto_pipeline не используется.
+    В пайплайнах кластера нет скриптов (EVALSHA), PUBLISH и RENAME, а ключи одной
+    транзакции или скрипта должны быть в одном слоте (hash tag).
+    """
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._clients: dict[str, Redis | RedisCluster] = {}
+
+    def create_client(
+        self, name: str, decode_responses: bool = True, single_node: bool = False
+    ) -> Redis | RedisCluster:
+        """
+        :param name: Название клиента (в метриках пула)
+        :param decode_responses: Декодировать ли ответы в str
+        :param single_node: Клиент одного узла и в режиме кластера (pub/sub и т.п.)
+        """
+        if self._settings.redis_cluster and not single_node:
+            return self._create_cluster_client(name, decode_responses)
+
+        pool = BlockingConnectionPool(
+            host=self._settings.redis_host,
+            port=self._settings.redis_port,
+            username=self._settings.redis_user,
+            password=self._settings.redis_password,
+            decode_responses=decode_responses,
+            max_connections=self._settings.redis_max_connections,
+            timeout=self._settings.redis_pool_timeout,
+            socket_timeout=self._settings.redis_socket_timeout,
+            socket_connect_timeout=self._settings.redis_socket_connect_timeout,
+            health_check_interval=self._settings.redis_health_check_interval,
+            protocol=self._settings.redis_protocol,
+        )
+        client_class = (
+            AutoPipelineRedis
+            if self._settings.redis_auto_pipeline
+            else InstrumentedRedis
+        )
+        client = client_class.from_pool(pool)
+
+        metrics.gauge(
+            f"redis_{name}_pool_in_use_connections",
+            f"Занятые соединения пула redis ({name})",
+            callback=lambda: len(pool._in_use_connections),
+        )
+        metrics.gauge(
+            f"redis_{name}_pool_max_connections",
+            f"Размер пула redis ({name})",
+            callback=lambda: pool.max_connections,
+        )
+
+        self._clients[name] = client
+        return client
+
+    def _create_cluster_client(self, name: str, decode_responses: bool) -> RedisCluster:
+        client = InstrumentedRedisCluster(
+            host=self._settings.redis_host,
+            port=self._settings.redis_port,
+            username=self._settings.redis_user,
+            password=self._settings.redis_password,
+            decode_responses=decode_responses,
+            max_connections=self._settings.redis_max_connections,
+            socket_timeout=self._settings.redis_socket_timeout,
+            socket_connect_timeout=self._settings.redis_socket_connect_timeout,
+            health_check_interval=self._settings.redis_health_check_interval,
+            protocol=self._settings.redis_protocol,
+        )
+        self._clients[name] = client
+        return client
+
+    async def start(self) -> None:
+        """
+        Проверка доступности redis при старте (недоступность не мешает запуску)
+        """
+        for name, client in self._clients.items():
+            try:
+                await client.ping()
+            except RedisError as e:
+                logger.error("Redis client %s is unavailable: %s", name, e)
+
+    async def stop(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+
+
+redis_manager = RedisClientManager(settings)
+
+redis_client = redis_manager.create_client("default")
+
+# Клиент для бинарных данных (без декодирования ответов в str)
+redis_bytes_client = redis_manager.create_client("bytes", decode_responses=False)
 
-redis_client = Redis(
-    host=settings.redis_host,
-    port=settings.redis_port,
-    username=settings.redis_user,
-    password=settings.redis_password,
-    decode_responses=True,
+# Pub/sub слушателю нужно одно соединение с одним узлом (в кластере сообщения PUBLISH
+# рассылаются всем узлам, поэтому подходит любой)
+redis_pubsub_client = (
+    redis_manager.create_client("pubsub", single_node=True)
+    if settings.redis_cluster
+    else redis_client
 )
@@ -0,0 +1,129 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+from typing import Any
+
+from redis.asyncio.connection import AbstractConnection
+from redis.exceptions import ConnectionError, TimeoutError
+
+from .client import redis_pubsub_client
+
+logger = getLogger(__name__)
+
+MessageHandler = Callable[[Any], None]
+ReconnectHandler = Callable[[], Awaitable[None]]
+DisconnectHandler = Callable[[], None]
+# Выполняется на соединении слушателя до подписки (например, CLIENT TRACKING ... REDIRECT)
+ConnectionSetup = Callable[[AbstractConnection, int], Awaitable[None]]
+
+
+class RedisPubSubListener:
+    """
+    Одно pub/sub соединение на воркер для рассылки событий инвалидации между воркерами.
+    Обработчики сообщений должны быть быстрыми и синхронными (обновление in-memory состояния).
+    После каждого (пере)подключения вызываются reconnect обработчики — для синхронизации
+    состояния, сообщения о котором могли быть пропущены, при потере соединения — disconnect.
+    """
+
+    def __init__(
+        self, reconnect_delay_seconds: float = 1.0, poll_timeout_seconds: float = 1.0
+    ):
+        self._handlers: dict[str, list[MessageHandler]] = {}
+        self._reconnect_handlers: list[ReconnectHandler] = []
+        self._disconnect_handlers: list[DisconnectHandler] = []
+        self._connection_setups: list[ConnectionSetup] = []
+        self._reconnect_delay_seconds = reconnect_delay_seconds
+        self._poll_timeout_seconds = poll_timeout_seconds
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """
+        Регистрирует обработчик сообщений канала (до запуска слушателя)
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        self._reconnect_handlers.append(handler)
+
+    def on_disconnect(self, handler: DisconnectHandler) -> None:
+        self._disconnect_handlers.append(handler)
+
+    def add_connection_setup(self, setup: ConnectionSetup) -> None:
+        """
+        Регистрирует настройку соединения слушателя, выполняемую до подписки
+        (получает соединение и его CLIENT ID)
+        """
+        self._connection_setups.append(setup)
+
+    async def _on_silent_reconnect(self, _: AbstractConnection) -> None:
+        # redis-py может сам переподключить соединение и переподписаться, но настройки
+        # соединения и пропущенные сообщения при этом теряются — нужен полный перезапуск
+        raise ConnectionError("Pub/sub connection was re-established, resync required")
+
+    def start(self) -> None:
+        if self._task is None and self._handlers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = redis_pubsub_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.connect()
+                connection = pubsub.connection
+                if connection is None:
+                    raise ConnectionError("Pub/sub connection is not established")
+                if self._connection_setups:
+                    await connection.send_command("CLIENT", "ID")
+                    client_id = await connection.read_response()
+                    for setup in self._connection_setups:
+                        await setup(connection, client_id)
+                connection.register_connect_callback(self._on_silent_reconnect)
+
+                await pubsub.subscribe(*self._handlers)
+                for reconnect_handler in self._reconnect_handlers:
+                    await reconnect_handler()
+
+                while True:
+                    # get_message с таймаутом не упирается в socket_timeout клиента
+                    # и выполняет health check соединения
+                    message = await pubsub.get_message(
+                        timeout=self._poll_timeout_seconds
+                    )
+                    if message is None or message["type"] != "message":
+                        continue
+                    for handler in self._handlers.get(message["channel"], ()):
+                        try:
+                            handler(message["data"])
+                        except Exception as e:
+                            logger.error(
+                                "Pub/sub handler for %s failed: %s",
+                                message["channel"],
+                                e,
+                            )
+            except (ConnectionError, TimeoutError) as e:
+                logger.warning("Redis pub/sub connection lost: %s", e)
+            finally:
+                for disconnect_handler in self._disconnect_handlers:
+                    disconnect_handler()
+                if pubsub.connection is not None:
+                    # соединение вернется в общий пул
+                    pubsub.connection.deregister_connect_callback(
+                        self._on_silent_reconnect
+                    )
+                await pubsub.aclose()
+
+            await asyncio.sleep(self._reconnect_delay_seconds)
+
+
+pubsub_listener = RedisPubSubListener()
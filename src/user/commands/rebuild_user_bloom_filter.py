@@ -0,0 +1,102 @@
+"""
+Перестроение bloom фильтров логинов и email пользователей в redis.
+
+Фильтры строятся во временных ключах и атомарно подменяют текущие (RENAME в Lua),
+после чего выставляется флаг готовности — до этого проверки уникальности
+всегда идут в БД. Пользователи, зарегистрированные во время перестроения,
+добавляются повторно после подмены.
+
+Запуск (при USER_BLOOM_FILTER_ENABLED=1):
+    python -m src.user.commands.rebuild_user_bloom_filter
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from ... import models  # noqa: F401
+from ...database import AsyncSessionLocal
+from ...redis.client import redis_client
+from ..models import User
+from ..services.user_bloom_filter_service import (
+    BLOOM_EMAIL_KEY,
+    BLOOM_LOGIN_KEY,
+    BLOOM_READY_KEY,
+    user_bloom_filter,
+)
+
+_REBUILD_KEYS = (f"{BLOOM_LOGIN_KEY}:rebuild", f"{BLOOM_EMAIL_KEY}:rebuild")
+
+# Подмена фильтров перестроенными и выставление флага готовности (атомарно).
+# KEYS[1], KEYS[2] - новые фильтры; KEYS[3], KEYS[4] - текущие; KEYS[5] - флаг готовности
+_SWAP_LUA = """
+redis.call('RENAME', KEYS[1], KEYS[3])
+redis.call('RENAME', KEYS[2], KEYS[4])
+redis.call('SET', KEYS[5], 1)
+"""
+
+_swap_script = redis_client.register_script(_SWAP_LUA)
+
+
+async def fill(keys: tuple[str, str], batch_size: int, since: datetime | None) -> int:
+    """
+    Добавляет логины и email пользователей из БД в фильтры
+    :param since: Только пользователи, зарегистрированные начиная с этого момента
+    :return: Кол-во добавленных пользователей
+    """
+    query = select(User.login, User.email)
+    if since is not None:
+        query = query.where(User.created_at >= since)
+
+    added = 0
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            pipe = redis_client.pipeline(transaction=False)
+            for login, email in partition:
+                user_bloom_filter.queue_add(pipe, login, email, keys=keys)
+            await pipe.execute()
+            added += len(partition)
+    return added
+
+
+async def rebuild(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        started_at = (await session.execute(select(func.localtimestamp()))).scalar_one()
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(*_REBUILD_KEYS)
+    for key in _REBUILD_KEYS:
+        pipe.setbit(
+            key, 0, 0
+        )  # ключ должен существовать для RENAME даже без пользователей
+    await pipe.execute()
+
+    total = await fill(_REBUILD_KEYS, batch_size, since=None)
+
+    await _swap_script(
+        keys=[*_REBUILD_KEYS, BLOOM_LOGIN_KEY, BLOOM_EMAIL_KEY, BLOOM_READY_KEY],
+        client=redis_client,
+    )
+
+    late = await fill((BLOOM_LOGIN_KEY, BLOOM_EMAIL_KEY), batch_size, since=started_at)
+    print(f"Users added: {total}, registered during rebuild: {late}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Пользователей за один пайплайн"
+    )
+    args = parser.parse_args()
+
+    if not user_bloom_filter.enabled:
+        parser.error("USER_BLOOM_FILTER_ENABLED is off")
+
+    asyncio.run(rebuild(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class UserSettings(BaseSettings):
+    # Bloom фильтр логинов/email в redis для проверки уникальности без запроса в БД.
+    # Заполняется командой rebuild_user_bloom_filter, до этого не используется
+    bloom_filter_enabled: bool = False
+    bloom_filter_bits: int = 2**24  # размер одного фильтра (login/email), бит
+    bloom_filter_hashes: int = 7  # кол-во хэш-функций
+
+    # Кэш identifier'ов, не найденных при входе (0 — выключен)
+    identifier_negative_cache_ttl_seconds: int = 60
+    identifier_negative_cache_local_size: int = 10000  # записей в памяти воркера
+
+    # Кэш сериализованных профилей для GET /profile/me и /profile/{uuid} (0 — выключен)
+    profile_cache_ttl_seconds: int = 300
+    profile_cache_local_size: int = 1000  # записей в памяти воркера
+
+    model_config = SettingsConfigDict(
+        env_file=".env", extra="ignore", env_prefix="USER_"
+    )
+
+
+# noinspection PyArgumentList
+@lru_cache
+def get_user_settings() -> UserSettings:
+    """
+    Получение конфига пользовательских настроек
+    """
+    return UserSettings()
@@ -4,4 +4,6 @@ NAME_PATTERN: Final[str] = r"^[\p{L}\d\s'_-]+$"
 
 MAX_AVATAR_SIZE: Final[int] = 3 * 1024 * 1024
 
+MAX_BATCH_PROFILES: Final[int] = 200  # макс. кол-во UUID в POST /profile/batch
+
 ALLOWED_AVATAR_CONTENT_TYPES: Final[frozenset[str]] = frozenset({"image/webp"})
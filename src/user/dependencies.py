@@ -0,0 +1,15 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_session
+from .services import UserLoader
+
+
+async def get_user_loader(
+    session: AsyncSession = Depends(get_async_session),
+) -> UserLoader:
+    """
+    Загрузчик пользователей запроса (один на запрос, использует сессию запроса)
+    :param session: Сессия
+    """
+    return UserLoader(session)
@@ -80,3 +80,31 @@ class LoginAlreadyInUseException(BaseAPIException):
             loc=["body", "email"],
             err_type="value_error.login_in_use",
         )
+
+
+class InvalidSearchCursorException(BaseAPIException):
+    """
+    Вызывается если курсор поиска поврежден или создан не этим API
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            msg="Invalid search cursor",
+            loc=["query", "cursor"],
+            err_type="value_error.invalid_cursor",
+        )
+
+
+class SearchCursorWithOffsetException(BaseAPIException):
+    """
+    Вызывается если в поиске вместе с курсором передан offset
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            msg="Offset cannot be used with a cursor",
+            loc=["query", "offset"],
+            err_type="value_error.offset_with_cursor",
+        )
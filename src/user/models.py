@@ -67,6 +67,12 @@ class User(Base):
         back_populates="user"
     )
 
+    __table_args__ = (
+        # Login/email уникальны без учета регистра (индексы используются и при входе)
+        Index("idx_users_login_lower", text("lower(login)"), unique=True),
+        Index("idx_users_email_lower", text("lower(email)"), unique=True),
+    )
+
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
@@ -1,19 +1,32 @@
-from typing import Annotated
+from typing import Annotated, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, File, Path, Query
+from fastapi import APIRouter, Body, Depends, File, Header, Path, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from ..auth.rate_limit_keys import by_user
 from ..auth.schemas import TokenPayloadSchema
 from ..auth.security import token_verification
 from ..database import get_async_session
+from ..rate_limiter import RateLimiter
 from ..schemas import ErrorResponseModel, UploadFileSchema
-from .schemas import PatchUserSchema, PublicUserSchema, UserSchema
+from ..utils import conditional_response
+from .dependencies import get_user_loader
+from .schemas import (
+    BatchProfilesRequestSchema,
+    BatchProfilesSchema,
+    PatchUserSchema,
+    PublicUserSchema,
+    SearchProfilesSchema,
+    UserSchema,
+)
+from .services import UserLoader
 from .usecases import (
     delete_my_profile_avatar,
     get_my_profile,
     get_public_user_profile,
+    get_public_user_profiles,
     patch_my_profile,
     patch_my_profile_avatar,
     search_user_profiles,
@@ -26,13 +39,17 @@ profile_router = APIRouter(prefix="/profile", tags=["Profile"])
     "/search",
     name="Поиск пользователей по имени",
     status_code=status.HTTP_200_OK,
-    response_model=list[PublicUserSchema],  # список публичных профилей
-    description="Возвращает список пользователей, чьё имя совпадает или содержит указанную подстроку",
+    response_model=list[PublicUserSchema] | SearchProfilesSchema,
+    description="Возвращает список пользователей, чьё имя совпадает или содержит указанную подстроку. "
+    "С paginate=cursor (или с cursor) возвращается объект с profiles и next_cursor — курсором "
+    "следующей страницы (передается в параметре cursor без offset, стоимость страницы "
+    "не зависит от глубины)",
     responses={
         200: {
-            "description": "Успешный поиск пользователей",
-            "model": list[PublicUserSchema],
+            "description": "Успешный поиск пользователей (список, а с paginate=cursor — "
+            "страница с курсором)",
         },
+        304: {"description": "Выдача не изменилась (If-None-Match)"},
         400: {
             "description": "Некорректные данные в запросе.",
             "model": ErrorResponseModel,
@@ -49,6 +66,7 @@ profile_router = APIRouter(prefix="/profile", tags=["Profile"])
         500: {"description": "Внутренняя ошибка сервера."},
     },
     dependencies=[
+        Depends(RateLimiter("search_user", times=60, seconds=60, key=by_user)),
         Depends(token_verification),
     ],
 )
@@ -65,11 +83,34 @@ async def search_profiles_route(
     limit: Annotated[
         int, Query(ge=1, le=100, description="Максимальное количество результатов")
     ] = 20,
-    offset: Annotated[int, Query(ge=0, description="Смещение от начала выборки")] = 0,
-) -> list[PublicUserSchema]:
-    pass
-    return await search_user_profiles(
-        name=name, limit=limit, offset=offset, session=session
+    offset: Annotated[
+        int, Query(ge=0, description="Смещение от начала выборки (без cursor)")
+    ] = 0,
+    cursor: Annotated[
+        str | None,
+        Query(
+            max_length=64,
+            description="Курсор следующей страницы (next_cursor предыдущего ответа)",
+        ),
+    ] = None,
+    paginate: Annotated[
+        Literal["offset", "cursor"],
+        Query(
+            description="Пагинация: offset — список, cursor — страница с next_cursor"
+        ),
+    ] = "offset",
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    return conditional_response(
+        await search_user_profiles(
+            name=name,
+            limit=limit,
+            offset=offset,
+            session=session,
+            if_none_match=if_none_match,
+            cursor=cursor,
+            paginate=paginate,
+        )
     )
 
 
@@ -81,6 +122,7 @@ async def search_profiles_route(
     description="Видны все поля",
     responses={
         200: {"description": "Успешное получение профиля", "model": UserSchema},
+        304: {"description": "Профиль не изменился (If-None-Match)"},
         400: {
             "description": "Некорректные данные в запросе.",
             "model": ErrorResponseModel,
@@ -96,12 +138,19 @@ async def search_profiles_route(
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
     },
+    dependencies=[
+        Depends(RateLimiter("get_my_profile_user", times=120, seconds=60, key=by_user)),
+    ],
 )
 async def get_my_profile_route(
     token_payload: Annotated[TokenPayloadSchema, Depends(token_verification)],
     session: Annotated[AsyncSession, Depends(get_async_session)],
-) -> UserSchema:
-    return await get_my_profile(token_payload.sub, session)
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    # Профиль уже сериализован (кэш профилей), повторная валидация не нужна
+    return conditional_response(
+        await get_my_profile(token_payload.sub, session, if_none_match)
+    )
 
 
 @profile_router.patch(
@@ -131,6 +180,11 @@ async def get_my_profile_route(
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
     },
+    dependencies=[
+        Depends(
+            RateLimiter("patch_my_profile_user", times=20, seconds=60, key=by_user)
+        ),
+    ],
 )
 async def patch_my_profile_route(
     patch_schema: Annotated[PatchUserSchema, Body(...)],
@@ -155,6 +209,11 @@ async def patch_my_profile_route(
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
     },
+    dependencies=[
+        Depends(
+            RateLimiter("delete_my_avatar_user", times=10, seconds=60, key=by_user)
+        ),
+    ],
 )
 async def delete_my_avatar_route(
     token_payload: Annotated[TokenPayloadSchema, Depends(token_verification)],
@@ -191,6 +250,9 @@ async def delete_my_avatar_route(
         429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
         500: {"description": "Внутренняя ошибка сервера."},
     },
+    dependencies=[
+        Depends(RateLimiter("patch_my_avatar_user", times=10, seconds=60, key=by_user)),
+    ],
 )
 async def patch_my_avatar_route(
     file: Annotated[
@@ -202,6 +264,48 @@ async def patch_my_avatar_route(
     return await patch_my_profile_avatar(file.file, token_payload.sub, session)
 
 
+@profile_router.post(
+    "/batch",
+    name="Получение публичных профилей нескольких пользователей",
+    status_code=status.HTTP_200_OK,
+    response_model=BatchProfilesSchema,
+    description="Видны только публичные поля. Профили возвращаются в порядке запроса, "
+    "UUID ненайденных пользователей — в missing",
+    responses={
+        200: {
+            "description": "Успешное получение профилей",
+            "model": BatchProfilesSchema,
+        },
+        400: {
+            "description": "Некорректные данные в запросе.",
+            "model": ErrorResponseModel,
+        },
+        401: {
+            "description": "Access token не найден, истек или некорректен",
+            "model": ErrorResponseModel,
+        },
+        422: {
+            "description": "Некорректные данные в запросе (валидация схемы).",
+            "model": ErrorResponseModel,
+        },
+        429: {"description": "Превышены лимиты API.", "model": ErrorResponseModel},
+        500: {"description": "Внутренняя ошибка сервера."},
+    },
+    dependencies=[
+        Depends(
+            RateLimiter("get_public_profiles_user", times=60, seconds=60, key=by_user)
+        ),
+        Depends(token_verification),
+    ],
+)
+async def get_public_user_profiles_route(
+    batch_schema: Annotated[BatchProfilesRequestSchema, Body(...)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    loader: Annotated[UserLoader, Depends(get_user_loader)],
+) -> BatchProfilesSchema:
+    return await get_public_user_profiles(batch_schema.ids, session, loader)
+
+
 @profile_router.get(
     "/{uuid}",
     name="Получение публичного профиля пользователя",
@@ -210,6 +314,7 @@ async def patch_my_avatar_route(
     description="Видны только публичные поля",
     responses={
         200: {"description": "Успешное получение профиля", "model": PublicUserSchema},
+        304: {"description": "Профиль не изменился (If-None-Match)"},
         400: {
             "description": "Некорректные данные в запросе.",
             "model": ErrorResponseModel,
@@ -226,11 +331,18 @@ async def patch_my_avatar_route(
         500: {"description": "Внутренняя ошибка сервера."},
     },
     dependencies=[
+        Depends(
+            RateLimiter("get_public_profile_user", times=120, seconds=60, key=by_user)
+        ),
         Depends(token_verification),
     ],
 )
 async def get_public_user_profile_route(
     uuid: Annotated[UUID, Path(description="UUID пользователя")],
     session: Annotated[AsyncSession, Depends(get_async_session)],
-) -> PublicUserSchema:
-    return await get_public_user_profile(uuid, session)
+    loader: Annotated[UserLoader, Depends(get_user_loader)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    return conditional_response(
+        await get_public_user_profile(uuid, session, if_none_match, loader)
+    )
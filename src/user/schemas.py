@@ -13,7 +13,7 @@ from pydantic import (
 
 from ..auth.constants import LOGIN_PATTERN
 from ..config import get_settings
-from .constants import NAME_PATTERN
+from .constants import MAX_BATCH_PROFILES, NAME_PATTERN
 
 settings = get_settings()
 
@@ -116,6 +116,42 @@ class PublicProfileSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchProfilesRequestSchema(BaseModel):
+    ids: Annotated[
+        list[UUID],
+        Field(
+            ...,
+            min_length=1,
+            max_length=MAX_BATCH_PROFILES,
+            description="UUID пользователей (повторы игнорируются)",
+        ),
+    ]
+
+
+class BatchProfilesSchema(BaseModel):
+    profiles: Annotated[
+        list[PublicUserSchema],
+        Field(..., description="Найденные профили в порядке запроса"),
+    ]
+    missing: Annotated[
+        list[UUID], Field(..., description="UUID, пользователи с которыми не найдены")
+    ]
+
+
+class SearchProfilesSchema(BaseModel):
+    profiles: Annotated[
+        list[PublicUserSchema],
+        Field(..., description="Найденные профили (similarity desc, id)"),
+    ]
+    next_cursor: Annotated[
+        str | None,
+        Field(
+            default=None,
+            description="Курсор следующей страницы (параметр cursor), null — дальше нет",
+        ),
+    ]
+
+
 class PatchUserSchema(BaseModel):
     email: Annotated[
         EmailStr | None,
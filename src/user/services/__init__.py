@@ -1,15 +1,28 @@
+from .identifier_negative_cache_service import identifier_negative_cache
+from .profile_cache_service import ProfileView, profile_cache
+from .user_bloom_filter_service import user_bloom_filter
 from .user_service import (
-    check_email_unique,
-    check_login_unique,
+    UserCredentials,
+    UserLoader,
+    check_user_uniqueness,
     get_user,
-    get_user_by_identifier,
+    get_user_credentials,
     get_user_with_profile,
+    get_users_with_profile,
+    select_user_credentials,
 )
 
 __all__ = [
-    "get_user_by_identifier",
+    "UserCredentials",
+    "UserLoader",
+    "get_user_credentials",
+    "select_user_credentials",
     "get_user",
     "get_user_with_profile",
-    "check_email_unique",
-    "check_login_unique",
+    "get_users_with_profile",
+    "check_user_uniqueness",
+    "user_bloom_filter",
+    "identifier_negative_cache",
+    "profile_cache",
+    "ProfileView",
 ]
@@ -0,0 +1,169 @@
+import hashlib
+import time
+from collections import OrderedDict
+from logging import getLogger
+
+from redis.exceptions import RedisError
+
+from ...metrics import metrics
+from ...redis.client import execute_and_publish, redis_client
+from ...redis.pubsub import pubsub_listener
+from ..config import get_user_settings
+
+logger = getLogger(__name__)
+
+user_settings = get_user_settings()
+
+INVALIDATION_CHANNEL = "user:identifier_negative_cache"
+
+_MISSING = "missing"  # пользователя с таким identifier нет
+_PRESENT = "present"  # отметка инвалидации: identifier только что занят
+
+
+class IdentifierNegativeCache:
+    """
+    Кэш identifier'ов (login/email), по которым пользователь не найден при входе:
+    redis (общий для воркеров) + небольшой LRU в памяти воркера.
+
+    При регистрации и смене email вместо удаления записи ставится отметка
+    "present" с тем же TTL, а отрицательная запись пишется только через SET NX,
+    поэтому вход, прочитавший БД до коммита регистрации, не может вернуть
+    в кэш устаревший промах. Локальные записи других воркеров сбрасываются через pub/sub.
+    Identifier'ы хранятся в виде хэша, без учета регистра.
+    """
+
+    def __init__(self, ttl_seconds: int, local_size: int):
+        self.ttl_seconds = ttl_seconds
+        self._local_size = local_size
+        self._local: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+        self._local_hits = metrics.counter(
+            "user_identifier_negative_cache_local_hits_total",
+            "Промахи входа, отвеченные локальным отрицательным кэшем",
+        )
+        self._redis_hits = metrics.counter(
+            "user_identifier_negative_cache_redis_hits_total",
+            "Промахи входа, отвеченные отрицательным кэшем в redis",
+        )
+        metrics.gauge(
+            "user_identifier_negative_cache_local_size",
+            "Кол-во записей в локальном отрицательном кэше",
+            callback=lambda: len(self._local),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def _digest(identifier: str) -> str:
+        return hashlib.blake2b(identifier.lower().encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _key(digest: str) -> str:
+        return f"negative:identifier:{digest}"
+
+    def _get_local(self, digest: str) -> str | None:
+        entry = self._local.get(digest)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._local[digest]
+            return None
+        self._local.move_to_end(digest)
+        return state
+
+    def _set_local(self, digest: str, state: str) -> None:
+        if self._local_size <= 0:
+            return
+        self._local[digest] = (state, time.monotonic() + self.ttl_seconds)
+        self._local.move_to_end(digest)
+        while len(self._local) > self._local_size:
+            self._local.popitem(last=False)
+
+    async def is_missing(self, identifier: str) -> bool:
+        """
+        :return: True, если известно, что пользователя с таким identifier нет
+        """
+        if not self.enabled:
+            return False
+
+        digest = self._digest(identifier)
+        local_state = self._get_local(digest)
+        if local_state is not None:
+            if local_state == _MISSING:
+                self._local_hits.inc()
+            return local_state == _MISSING
+
+        try:
+            state = await redis_client.get(self._key(digest))
+        except RedisError as e:
+            logger.warning("Identifier negative cache is unavailable: %s", e)
+            return False
+
+        if state == _MISSING:
+            self._set_local(digest, _MISSING)
+            self._redis_hits.inc()
+            return True
+        return False
+
+    async def remember_missing(self, identifier: str) -> None:
+        """
+        Запоминает, что пользователя с таким identifier нет
+        """
+        if not self.enabled:
+            return
+
+        digest = self._digest(identifier)
+        try:
+            stored = await redis_client.set(
+                self._key(digest), _MISSING, ex=self.ttl_seconds, nx=True
+            )
+        except RedisError as e:
+            logger.warning("Identifier negative cache is unavailable: %s", e)
+            return
+
+        if stored:
+            self._set_local(digest, _MISSING)
+
+    async def invalidate(self, *identifiers: str) -> None:
+        """
+        Сбрасывает отрицательные записи во всех воркерах (регистрация, смена email)
+        :param identifiers: Занятые login/email
+        """
+        if not self.enabled:
+            return
+
+        digests = [self._digest(identifier) for identifier in identifiers]
+        for digest in digests:
+            self._set_local(digest, _PRESENT)
+
+        pipe = redis_client.pipeline(transaction=False)
+        for digest in digests:
+            pipe.set(self._key(digest), _PRESENT, ex=self.ttl_seconds)
+        try:
+            await execute_and_publish(pipe, INVALIDATION_CHANNEL, ",".join(digests))
+        except RedisError as e:
+            logger.error("Failed to invalidate identifier negative cache: %s", e)
+
+    def handle_invalidation(self, data: str) -> None:
+        for digest in data.split(","):
+            self._set_local(digest, _PRESENT)
+
+    async def clear_local(self) -> None:
+        """
+        Сброс локального кэша (после переподключения к pub/sub сообщения могли быть пропущены)
+        """
+        self._local.clear()
+
+
+identifier_negative_cache = IdentifierNegativeCache(
+    ttl_seconds=user_settings.identifier_negative_cache_ttl_seconds,
+    local_size=user_settings.identifier_negative_cache_local_size,
+)
+
+pubsub_listener.subscribe(
+    INVALIDATION_CHANNEL, identifier_negative_cache.handle_invalidation
+)
+pubsub_listener.on_reconnect(identifier_negative_cache.clear_local)
@@ -0,0 +1,312 @@
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from logging import getLogger
+from typing import Literal
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from ...metrics import metrics
+from ...redis.client import execute_and_publish, redis_bytes_client
+from ...redis.pubsub import pubsub_listener
+from ...utils import ConditionalContent, etag_matches
+from ..config import get_user_settings
+
+logger = getLogger(__name__)
+
+user_settings = get_user_settings()
+
+INVALIDATION_CHANNEL = "user:profile_cache"
+
+# Срок жизни версии профиля. Истекшая версия заменяется новой — клиент один раз
+# получит профиль целиком, устаревший профиль по старому ETag не отдается
+VERSION_TTL_SECONDS = 30 * 24 * 3600
+
+ProfileView = Literal["me", "public"]  # UserSchema / PublicUserSchema
+
+# Представление профиля и его версия (атомарно), версия не создается.
+# KEYS[1] - profile:{user_id}; KEYS[2] - profile_version:{user_id}
+# ARGV[1] - представление
+_READ_LUA = """
+return {redis.call('HGET', KEYS[1], ARGV[1]), redis.call('GET', KEYS[2])}
+"""
+
+# После успешной загрузки профиля: создает версию, если ее нет, и записывает
+# представление (при TTL > 0) — только если профиль не изменился с момента чтения.
+# KEYS[1] - profile:{user_id}; KEYS[2] - profile_version:{user_id}
+# ARGV[1] - прочитанная версия ('' — ее не было); ARGV[2] - новая версия;
+# ARGV[3] - TTL версии; ARGV[4] - представление; ARGV[5] - данные; ARGV[6] - TTL кэша
+# Возвращает версию профиля или nil, если профиль изменился
+_FILL_LUA = """
+local version = redis.call('GET', KEYS[2])
+if (version or '') ~= ARGV[1] then
+    return false
+end
+if not version then
+    version = ARGV[2]
+    redis.call('SET', KEYS[2], version, 'EX', ARGV[3])
+end
+if tonumber(ARGV[6]) > 0 then
+    redis.call('HSET', KEYS[1], ARGV[4], ARGV[5])
+    redis.call('EXPIRE', KEYS[1], ARGV[6])
+end
+return version
+"""
+
+_read_script = redis_bytes_client.register_script(_READ_LUA)
+_fill_script = redis_bytes_client.register_script(_FILL_LUA)
+
+
+def profile_etag(version: bytes | str) -> str:
+    if isinstance(version, bytes):
+        version = version.decode()
+    return f'"{version}"'
+
+
+class ProfileCache:
+    """
+    Read-through кэш сериализованных профилей (JSON UserSchema/PublicUserSchema):
+    redis (hash profile:{user_id} с обоими представлениями) + небольшой LRU в памяти воркера.
+
+    У каждого профиля есть версия profile_version:{user_id} — случайная строка, которая
+    заменяется при каждом изменении и служит ETag, поэтому If-None-Match проверяется
+    без запроса в БД. Изменение профиля также удаляет hash и рассылает инвалидацию
+    локальных записей через pub/sub. Заполнение после промаха проходит только при
+    неизменной версии, поэтому чтение из БД, начатое до изменения, не вернет в кэш
+    устаревший профиль. Ключи с hash tag — в одном слоте redis cluster.
+    Версия создается только после успешной загрузки профиля (для несуществующих
+    пользователей ключи не появляются). Версии ведутся и при выключенном кэше
+    (ttl_seconds=0).
+    """
+
+    def __init__(self, ttl_seconds: int, local_size: int):
+        self.ttl_seconds = ttl_seconds
+        self._local_size = local_size
+        # (user_id, представление) -> (версия, данные, срок)
+        self._local: OrderedDict[tuple[UUID, str], tuple[bytes, bytes, float]] = (
+            OrderedDict()
+        )
+        self._generation = 0  # растет при каждой инвалидации в этом воркере
+
+        self._local_hits = metrics.counter(
+            "user_profile_cache_local_hits_total",
+            "Профили, отданные из локального кэша",
+        )
+        self._redis_hits = metrics.counter(
+            "user_profile_cache_redis_hits_total", "Профили, отданные из кэша в redis"
+        )
+        self._misses = metrics.counter(
+            "user_profile_cache_misses_total", "Профили, загруженные из БД"
+        )
+        self._not_modified = metrics.counter(
+            "user_profile_cache_not_modified_total",
+            "Запросы профиля с актуальным ETag (ответ 304)",
+        )
+        metrics.gauge(
+            "user_profile_cache_hit_ratio",
+            "Доля профилей, отданных из кэша (локального или redis)",
+            callback=self._hit_ratio,
+        )
+        metrics.gauge(
+            "user_profile_cache_local_size",
+            "Кол-во профилей в локальном кэше",
+            callback=lambda: len(self._local),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _hit_ratio(self) -> float:
+        hits = self._local_hits.value + self._redis_hits.value
+        total = hits + self._misses.value
+        return hits / total if total else 0.0
+
+    @staticmethod
+    def _key(user_id: UUID) -> str:
+        return f"profile:{{{user_id}}}"
+
+    @staticmethod
+    def _version_key(user_id: UUID) -> str:
+        return f"profile_version:{{{user_id}}}"
+
+    @staticmethod
+    def _new_version() -> str:
+        return secrets.token_hex(8)
+
+    def _get_local(
+        self, user_id: UUID, view: ProfileView
+    ) -> tuple[bytes, bytes] | None:
+        entry = self._local.get((user_id, view))
+        if entry is None:
+            return None
+        version, data, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._local[(user_id, view)]
+            return None
+        self._local.move_to_end((user_id, view))
+        return version, data
+
+    def _set_local(
+        self,
+        user_id: UUID,
+        view: ProfileView,
+        version: bytes,
+        data: bytes,
+        generation: int,
+    ) -> None:
+        # За время чтения пришла инвалидация — данные могли устареть
+        if self._local_size <= 0 or generation != self._generation:
+            return
+        self._local[(user_id, view)] = (
+            version,
+            data,
+            time.monotonic() + self.ttl_seconds,
+        )
+        self._local.move_to_end((user_id, view))
+        while len(self._local) > self._local_size:
+            self._local.popitem(last=False)
+
+    def _drop_local(self, user_id: UUID) -> None:
+        self._generation += 1
+        self._local.pop((user_id, "me"), None)
+        self._local.pop((user_id, "public"), None)
+
+    async def get_or_load(
+        self,
+        user_id: UUID,
+        view: ProfileView,
+        load: Callable[[], Awaitable[bytes]],
+        if_none_match: str | None = None,
+    ) -> ConditionalContent:
+        """
+        :param user_id: UUID пользователя
+        :param view: Представление профиля
+        :param load: Загрузка и сериализация профиля из БД при промахе
+        :param if_none_match: Заголовок If-None-Match запроса
+        :return: ETag и JSON профиля (без JSON, если ETag клиента актуален)
+        """
+        if self.enabled:
+            local = self._get_local(user_id, view)
+            if local is not None:
+                version, data = local
+                if etag_matches(if_none_match, profile_etag(version)):
+                    self._not_modified.inc()
+                    return ConditionalContent(profile_etag(version), None)
+                self._local_hits.inc()
+                return ConditionalContent(profile_etag(version), data)
+
+        generation = self._generation
+        try:
+            data, version = await _read_script(
+                keys=[self._key(user_id), self._version_key(user_id)],
+                args=[view],
+                client=redis_bytes_client,
+            )
+        except RedisError as e:
+            logger.warning("Profile cache is unavailable: %s", e)
+            self._misses.inc()
+            return ConditionalContent(None, await load())
+
+        # Версии нет, пока профиль ни разу не загружался (или она истекла)
+        if version is not None:
+            etag = profile_etag(version)
+            if etag_matches(if_none_match, etag):
+                self._not_modified.inc()
+                return ConditionalContent(etag, None)
+
+            if data is not None:
+                self._redis_hits.inc()
+                self._set_local(user_id, view, version, data, generation)
+                return ConditionalContent(etag, data)
+
+        self._misses.inc()
+        # Для несуществующего профиля load() выбросит исключение до записи в redis
+        data = await load()
+
+        try:
+            stored_version = await _fill_script(
+                keys=[self._key(user_id), self._version_key(user_id)],
+                args=[
+                    version or "",
+                    self._new_version(),
+                    VERSION_TTL_SECONDS,
+                    view,
+                    data,
+                    self.ttl_seconds,
+                ],
+                client=redis_bytes_client,
+            )
+        except RedisError as e:
+            logger.warning("Failed to fill profile cache: %s", e)
+            stored_version = None
+
+        if stored_version is None:
+            # Профиль изменился во время загрузки — ETag прочитанной версии устарел
+            return ConditionalContent(
+                None if version is None else profile_etag(version), data
+            )
+        if self.enabled:
+            self._set_local(user_id, view, stored_version, data, generation)
+        return ConditionalContent(profile_etag(stored_version), data)
+
+    async def get_versions(self, user_ids: Sequence[UUID]) -> list[bytes | None] | None:
+        """
+        Версии профилей (одним пайплайном, отсутствующие версии не создаются).
+        Версия появляется при загрузке профиля или его изменении
+        :param user_ids: UUID пользователей
+        :return: Версии в порядке user_ids (None — версии нет)
+            или None, если redis недоступен
+        """
+        if not user_ids:
+            return []
+
+        pipe = redis_bytes_client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.get(self._version_key(user_id))
+        try:
+            return await pipe.execute()
+        except RedisError as e:
+            logger.warning("Profile versions are unavailable: %s", e)
+            return None
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """
+        Меняет версию профиля и сбрасывает его кэш во всех воркерах
+        (после коммита изменения профиля)
+        :param user_id: UUID пользователя
+        """
+        self._drop_local(user_id)
+
+        pipe = redis_bytes_client.pipeline(transaction=True)
+        pipe.set(
+            self._version_key(user_id), self._new_version(), ex=VERSION_TTL_SECONDS
+        )
+        pipe.delete(self._key(user_id))
+        try:
+            await execute_and_publish(pipe, INVALIDATION_CHANNEL, str(user_id))
+        except RedisError as e:
+            logger.error("Failed to invalidate profile cache: %s", e)
+
+    def handle_invalidation(self, data: bytes | str) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        self._drop_local(UUID(data))
+
+    async def clear_local(self) -> None:
+        """
+        Сброс локального кэша (после переподключения к pub/sub сообщения могли быть пропущены)
+        """
+        self._generation += 1
+        self._local.clear()
+
+
+profile_cache = ProfileCache(
+    ttl_seconds=user_settings.profile_cache_ttl_seconds,
+    local_size=user_settings.profile_cache_local_size,
+)
+
+pubsub_listener.subscribe(INVALIDATION_CHANNEL, profile_cache.handle_invalidation)
+pubsub_listener.on_reconnect(profile_cache.clear_local)
@@ -0,0 +1,140 @@
+import hashlib
+from logging import getLogger
+
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import ClusterPipeline
+from redis.exceptions import RedisError
+
+from ...metrics import metrics
+from ...redis.client import redis_client
+from ..config import get_user_settings
+
+logger = getLogger(__name__)
+
+user_settings = get_user_settings()
+
+# Ключи с hash tag: фильтры, флаг готовности и ключи перестроения в одном слоте
+# redis cluster (перестроение подменяет их атомарно)
+BLOOM_LOGIN_KEY = "bloom:{users}:login"
+BLOOM_EMAIL_KEY = "bloom:{users}:email"
+BLOOM_READY_KEY = "bloom:{users}:ready"
+
+
+class UserBloomFilter:
+    """
+    Bloom фильтры занятых логинов и email в redis (битовые карты), значения —
+    без учета регистра, как и их уникальность.
+    Отрицательный ответ точен — значение точно свободно и БД можно не проверять.
+    Ложноположительные ответы и пропуски (например, при сбое redis) безопасны:
+    в первом случае проверка уходит в БД, во втором сработает UNIQUE constraint.
+    """
+
+    def __init__(self, enabled: bool, bits: int, hashes: int):
+        self.enabled = enabled
+        self.bits = bits
+        self.hashes = hashes
+
+        self._skips = metrics.counter(
+            "user_bloom_filter_negatives_total",
+            "Проверки уникальности, отвеченные bloom фильтром без запроса в БД",
+        )
+
+    def offsets(self, value: str) -> list[int]:
+        """
+        Номера битов значения (double hashing по двум половинам blake2b)
+        """
+        digest = hashlib.blake2b(value.lower().encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @staticmethod
+    def _bitfield_args(command: str, offsets: list[int]) -> list[str | int]:
+        args: list[str | int] = []
+        for offset in offsets:
+            args += (
+                [command, "u1", offset]
+                if command == "GET"
+                else [command, "u1", offset, 1]
+            )
+        return args
+
+    async def might_contain(
+        self, *, login: str | None = None, email: str | None = None
+    ) -> tuple[bool, bool] | None:
+        """
+        Проверка логина и email за один запрос в redis
+        :return: (login возможно занят, email возможно занят) или None,
+            если фильтр выключен, не построен или redis недоступен
+        """
+        if not self.enabled:
+            return None
+
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.exists(BLOOM_READY_KEY)
+        if login is not None:
+            pipe.execute_command(
+                "BITFIELD",
+                BLOOM_LOGIN_KEY,
+                *self._bitfield_args("GET", self.offsets(login)),
+            )
+        if email is not None:
+            pipe.execute_command(
+                "BITFIELD",
+                BLOOM_EMAIL_KEY,
+                *self._bitfield_args("GET", self.offsets(email)),
+            )
+
+        try:
+            ready, *bits = await pipe.execute()
+        except RedisError as e:
+            logger.warning("User bloom filter is unavailable: %s", e)
+            return None
+        if not ready:
+            return None
+
+        login_bits = bits.pop(0) if login is not None else [0]
+        email_bits = bits.pop(0) if email is not None else [0]
+        result = all(login_bits), all(email_bits)
+        if not any(result):
+            self._skips.inc()
+        return result
+
+    def queue_add(
+        self,
+        pipe: Pipeline | ClusterPipeline,
+        login: str,
+        email: str,
+        keys: tuple[str, str] = (BLOOM_LOGIN_KEY, BLOOM_EMAIL_KEY),
+    ) -> None:
+        """
+        Добавляет в пайплайн установку битов логина и email
+        :param keys: Ключи фильтров (login, email), отличаются при перестроении
+        """
+        pipe.execute_command(
+            "BITFIELD", keys[0], *self._bitfield_args("SET", self.offsets(login))
+        )
+        pipe.execute_command(
+            "BITFIELD", keys[1], *self._bitfield_args("SET", self.offsets(email))
+        )
+
+    async def add(self, login: str, email: str) -> None:
+        """
+        Добавление логина и email пользователя в фильтры
+        """
+        if not self.enabled:
+            return
+
+        pipe = redis_client.pipeline(transaction=False)
+        self.queue_add(pipe, login, email)
+        try:
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning("Failed to update user bloom filter: %s", e)
+
+
+user_bloom_filter = UserBloomFilter(
+    enabled=user_settings.bloom_filter_enabled,
+    bits=user_settings.bloom_filter_bits,
+    hashes=user_settings.bloom_filter_hashes,
+)
@@ -1,12 +1,15 @@
+import asyncio
 import io
+from typing import NamedTuple
 from uuid import UUID
 
 from fastapi import UploadFile
 from PIL import Image, UnidentifiedImageError
 from pydantic import EmailStr
-from sqlalchemy import or_, select
+from sqlalchemy import Select, any_, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute, joinedload
+from sqlalchemy.orm import joinedload
 
 from ...user import User, UserNotFoundByIdentifierException, UserNotFoundByIdException
 from ..constants import ALLOWED_AVATAR_CONTENT_TYPES, MAX_AVATAR_SIZE
@@ -17,32 +20,61 @@ from ..exceptions import (
     LoginAlreadyInUseException,
     UnsupportedAvatarFormatException,
 )
+from .identifier_negative_cache_service import identifier_negative_cache
+from .user_bloom_filter_service import user_bloom_filter
 
 
-async def get_user_by_identifier(identifier: str, session: AsyncSession) -> User:
+class UserCredentials(NamedTuple):
+    id: UUID
+    hashed_password: str
+
+
+def select_user_credentials(identifier: str) -> Select[UUID, str]:
     """
-    Получение пользователя по identifier
+    Запрос id и хэша пароля пользователя по login/email без учета регистра.
+    Идентификатор с '@' — email (в логине '@' недопустим), иначе login, так что
+    запрос использует один уникальный функциональный индекс
+    (idx_users_email_lower / idx_users_login_lower)
+    :param identifier: Login/Email пользователя
+    """
+    field = User.email if "@" in identifier else User.login
+    return select(User.id, User.hashed_password).where(
+        func.lower(field) == identifier.lower()
+    )
+
+
+async def get_user_credentials(
+    identifier: str, session: AsyncSession
+) -> UserCredentials:
+    """
+    Получение id и хэша пароля пользователя по identifier
     :param identifier: Login/Email пользователя
     :param session: Сессия
     :raises UserNotFoundByIdentifierException: Если пользователь не найден
     """
-    user = (
-        await session.execute(
-            select(User).where(or_(User.email == identifier, User.login == identifier))
-        )
-    ).scalar_one_or_none()
-    if not user:
+    if await identifier_negative_cache.is_missing(identifier):
         raise UserNotFoundByIdentifierException()
-    return user
+
+    row = (await session.execute(select_user_credentials(identifier))).one_or_none()
+    if row is None:
+        await identifier_negative_cache.remember_missing(identifier)
+        raise UserNotFoundByIdentifierException()
+    return UserCredentials(row.id, row.hashed_password)
 
 
-async def get_user(user_id: UUID, session: AsyncSession) -> User:
+async def get_user(
+    user_id: UUID, session: AsyncSession, loader: "UserLoader | None" = None
+) -> User:
     """
     Получение пользователя по identifier
     :param user_id: UUID пользователя
     :param session: Сессия
+    :param loader: Загрузчик пользователей запроса (если передан, запрос идет через него)
     :raises UserNotFoundByIdException: Если пользователь не найден
     """
+    if loader is not None:
+        return await loader.load(user_id)
+
     user = (
         await session.execute(select(User).where(User.id == user_id))
     ).scalar_one_or_none()
@@ -51,13 +83,19 @@ async def get_user(user_id: UUID, session: AsyncSession) -> User:
     return user
 
 
-async def get_user_with_profile(user_id: UUID, session: AsyncSession) -> User:
+async def get_user_with_profile(
+    user_id: UUID, session: AsyncSession, loader: "UserLoader | None" = None
+) -> User:
     """
     Получение пользователя с загруженным UserProfile
     :param user_id: Id пользователя
     :param session: Сессия
+    :param loader: Загрузчик пользователей запроса (если передан, запрос идет через него)
     :raises UserNotFoundByIdException: Если пользователь не найден
     """
+    if loader is not None:
+        return await loader.load(user_id)
+
     user = (
         await session.execute(
             select(User)
@@ -70,40 +108,154 @@ async def get_user_with_profile(user_id: UUID, session: AsyncSession) -> User:
     return user
 
 
-async def user_exists_by_field(
-    field: InstrumentedAttribute,
-    value: str,
-    session: AsyncSession,
-) -> bool:
+async def get_users_with_profile(
+    user_ids: list[UUID], session: AsyncSession
+) -> dict[UUID, User]:
     """
-    Проверяет, существует ли уже пользователь с совпадающем значением в определенным полем
+    Получение пользователей с загруженным UserProfile одним запросом (id = ANY(:ids))
+    :param user_ids: UUID пользователей
     :param session: Сессия
-    :param field: Поле модели
-    :param value: Значение поля
+    :return: Найденные пользователи по UUID (несуществующие отсутствуют)
     """
-    result = await session.execute(select(User).where(field == value))
-    return result.scalar_one_or_none() is not None
+    if not user_ids:
+        return {}
+    users = (
+        await session.execute(
+            select(User)
+            .options(joinedload(User.user_profile))
+            .where(User.id == any_(literal(user_ids, ARRAY(User.id.type))))
+        )
+    ).scalars()
+    return {user.id: user for user in users}
 
 
-async def check_email_unique(email: EmailStr, session: AsyncSession) -> None:
+class UserLoader:
     """
-    Проверяет уникален ли Email.
-    :param email: Email пользователя
-    :param session: Сессия
-    :raises LoginAlreadyInUseException: Если такой email уже используется
+    Загрузчик пользователей (с UserProfile) в рамках одного запроса.
+    UUID, запрошенные любыми корутинами за один проход цикла событий, загружаются
+    одним запросом get_users_with_profile (id = ANY(:ids)), а загруженные
+    пользователи (и отсутствие пользователя) запоминаются до конца запроса —
+    повторные обращения к тем же UUID не идут в БД.
+
+    Использует сессию запроса: пока загрузка не завершена, сессию нельзя
+    параллельно использовать в других корутинах.
     """
-    if await user_exists_by_field(User.email, email, session):
-        raise EmailAlreadyInUseException()
 
+    def __init__(self, session: AsyncSession):
+        self._session = session
+        self._users: dict[UUID, User | None] = {}  # None — пользователь не найден
+        self._pending: dict[UUID, asyncio.Future[User | None]] = {}
+        self._queue: list[UUID] = []
+        self._batch_tasks: set[asyncio.Task] = set()
+
+    async def load(self, user_id: UUID) -> User:
+        """
+        :param user_id: UUID пользователя
+        :raises UserNotFoundByIdException: Если пользователь не найден
+        """
+        if user_id in self._users:
+            user = self._users[user_id]
+        else:
+            # shield — отмена одной ожидающей корутины не отменяет загрузку для остальных
+            user = await asyncio.shield(self._future(user_id))
+        if user is None:
+            raise UserNotFoundByIdException()
+        return user
+
+    async def load_many(self, user_ids: list[UUID]) -> dict[UUID, User]:
+        """
+        :param user_ids: UUID пользователей
+        :return: Найденные пользователи по UUID (несуществующие отсутствуют)
+        """
+        futures = [
+            self._future(user_id)
+            for user_id in dict.fromkeys(user_ids)
+            if user_id not in self._users
+        ]
+        if futures:
+            await asyncio.shield(asyncio.gather(*futures))
+        return {
+            user_id: user
+            for user_id in user_ids
+            if (user := self._users.get(user_id)) is not None
+        }
+
+    def _future(self, user_id: UUID) -> asyncio.Future[User | None]:
+        future = self._pending.get(user_id)
+        if future is not None:  # уже в очереди или загружается
+            return future
+
+        loop = asyncio.get_running_loop()
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        future = self._pending[user_id] = loop.create_future()
+        self._queue.append(user_id)
+        return future
+
+    def _dispatch(self) -> None:
+        batch, self._queue = self._queue, []
+        task = asyncio.create_task(self._load_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _load_batch(self, batch: list[UUID]) -> None:
+        try:
+            users = await get_users_with_profile(batch, self._session)
+        except BaseException as e:
+            for user_id in batch:
+                future = self._pending.pop(user_id)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for user_id in batch:
+            user = self._users[user_id] = users.get(user_id)
+            future = self._pending.pop(user_id)
+            if not future.done():
+                future.set_result(user)
 
-async def check_login_unique(login: str, session: AsyncSession) -> None:
+
+async def check_user_uniqueness(
+    session: AsyncSession,
+    *,
+    login: str | None = None,
+    email: EmailStr | None = None,
+    use_bloom_filter: bool = True,
+) -> None:
     """
-    Проверяет уникален ли Login.
-    :param login: Login пользователя
+    Проверяет уникальность login и/или email без учета регистра одним запросом
+    (только EXISTS по функциональным индексам, без выборки строк).
+    Значения, которых точно нет в bloom фильтре, в БД не проверяются.
     :param session: Сессия
+    :param login: Login пользователя
+    :param email: Email пользователя
+    :param use_bloom_filter: Использовать ли bloom фильтр
+    :raises EmailAlreadyInUseException: Если такой email уже используется
     :raises LoginAlreadyInUseException: Если такой login уже используется
     """
-    if await user_exists_by_field(User.login, login, session):
+    if use_bloom_filter:
+        might_contain = await user_bloom_filter.might_contain(login=login, email=email)
+        if might_contain is not None:
+            login_maybe_taken, email_maybe_taken = might_contain
+            login = login if login_maybe_taken else None
+            email = email if email_maybe_taken else None
+
+    columns = []
+    if email is not None:
+        columns.append(
+            exists().where(func.lower(User.email) == email.lower()).label("email_taken")
+        )
+    if login is not None:
+        columns.append(
+            exists().where(func.lower(User.login) == login.lower()).label("login_taken")
+        )
+    if not columns:
+        return
+
+    taken = (await session.execute(select(*columns))).one()._mapping
+    if taken.get("email_taken"):
+        raise EmailAlreadyInUseException()
+    if taken.get("login_taken"):
         raise LoginAlreadyInUseException()
 
 
@@ -1,12 +1,14 @@
 from .delete_my_profile_avatar import delete_my_profile_avatar
 from .get_my_profile import get_my_profile
 from .get_public_user_profile import get_public_user_profile
+from .get_public_user_profiles import get_public_user_profiles
 from .patch_my_profile import patch_my_profile
 from .patch_my_profile_avatar import patch_my_profile_avatar
 from .search_user_profiles import search_user_profiles
 
 __all__ = [
     "get_public_user_profile",
+    "get_public_user_profiles",
     "get_my_profile",
     "patch_my_profile",
     "patch_my_profile_avatar",
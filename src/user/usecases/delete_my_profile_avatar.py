@@ -3,7 +3,7 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...minio import AVATARS_BUCKET_NAME, get_minio_client
-from ..services import get_user_with_profile
+from ..services import get_user_with_profile, profile_cache
 
 
 async def delete_my_profile_avatar(
@@ -26,3 +26,4 @@ async def delete_my_profile_avatar(
     user.has_avatar = False
     session.add(user)
     await session.commit()
+    await profile_cache.invalidate(user_id)
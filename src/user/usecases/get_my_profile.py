@@ -3,8 +3,9 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...utils import ConditionalContent
 from ..schemas import UserSchema
-from ..services import get_user_with_profile
+from ..services import get_user_with_profile, profile_cache
 
 logger = getLogger(__name__)
 
@@ -12,12 +13,22 @@ logger = getLogger(__name__)
 async def get_my_profile(
     user_id: UUID,
     session: AsyncSession,
-) -> UserSchema:
+    if_none_match: str | None = None,
+) -> ConditionalContent:
     """
-    Получение своего профиля по UUID из access token
+    Получение своего профиля по UUID из access token (через кэш профилей)
     :param user_id: UUID профиля
     :param session: Сессия
+    :param if_none_match: Заголовок If-None-Match
+    :return: ETag и JSON UserSchema (без JSON, если профиль не изменился)
     """
-    return UserSchema.model_validate(
-        await get_user_with_profile(user_id, session), from_attributes=True
-    )
+
+    async def load() -> bytes:
+        user = await get_user_with_profile(user_id, session)
+        return (
+            UserSchema.model_validate(user, from_attributes=True)
+            .model_dump_json(by_alias=True)
+            .encode()
+        )
+
+    return await profile_cache.get_or_load(user_id, "me", load, if_none_match)
@@ -2,19 +2,32 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...utils import ConditionalContent
 from ..schemas import PublicUserSchema
-from ..services import get_user_with_profile
+from ..services import UserLoader, get_user_with_profile, profile_cache
 
 
 async def get_public_user_profile(
     user_id: UUID,
     session: AsyncSession,
-) -> PublicUserSchema:
+    if_none_match: str | None = None,
+    loader: UserLoader | None = None,
+) -> ConditionalContent:
     """
-    Получение публичного профиля пользователя
+    Получение публичного профиля пользователя (через кэш профилей)
     :param user_id: UUID получаемого профиля
     :param session: Сессия
+    :param if_none_match: Заголовок If-None-Match
+    :param loader: Загрузчик пользователей запроса (если передан, запрос идет через него)
+    :return: ETag и JSON PublicUserSchema (без JSON, если профиль не изменился)
     """
-    return PublicUserSchema.model_validate(
-        await get_user_with_profile(user_id, session), from_attributes=True
-    )
+
+    async def load() -> bytes:
+        user = await get_user_with_profile(user_id, session, loader)
+        return (
+            PublicUserSchema.model_validate(user, from_attributes=True)
+            .model_dump_json(by_alias=True)
+            .encode()
+        )
+
+    return await profile_cache.get_or_load(user_id, "public", load, if_none_match)
@@ -0,0 +1,34 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..schemas import BatchProfilesSchema, PublicUserSchema
+from ..services import UserLoader, get_users_with_profile
+
+
+async def get_public_user_profiles(
+    user_ids: list[UUID],
+    session: AsyncSession,
+    loader: UserLoader | None = None,
+) -> BatchProfilesSchema:
+    """
+    Получение публичных профилей нескольких пользователей одним запросом
+    :param user_ids: UUID получаемых профилей
+    :param session: Сессия
+    :param loader: Загрузчик пользователей запроса (если передан, запрос идет через него)
+    :return: Профили в порядке запроса (без повторов) и UUID ненайденных пользователей
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if loader is not None:
+        users = await loader.load_many(user_ids)
+    else:
+        users = await get_users_with_profile(user_ids, session)
+
+    return BatchProfilesSchema(
+        profiles=[
+            PublicUserSchema.model_validate(users[user_id], from_attributes=True)
+            for user_id in user_ids
+            if user_id in users
+        ],
+        missing=[user_id for user_id in user_ids if user_id not in users],
+    )
@@ -7,7 +7,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...utils import update_model_from_schema
 from ..exceptions import EmailAlreadyInUseException
 from ..schemas import PatchUserSchema, UserSchema
-from ..services import check_email_unique, get_user_with_profile
+from ..services import (
+    check_user_uniqueness,
+    get_user_with_profile,
+    identifier_negative_cache,
+    profile_cache,
+    user_bloom_filter,
+)
 
 
 async def patch_my_profile(
@@ -24,7 +30,7 @@ async def patch_my_profile(
     user = await get_user_with_profile(user_id, session)
 
     if patch_schema.email is not None:
-        await check_email_unique(patch_schema.email, session)
+        await check_user_uniqueness(session, email=patch_schema.email)
         user.email = patch_schema.email
 
     if patch_schema.profile is not None:
@@ -40,4 +46,10 @@ async def patch_my_profile(
             raise EmailAlreadyInUseException() from err
         raise
 
+    await profile_cache.invalidate(user_id)
+
+    if patch_schema.email is not None:
+        await user_bloom_filter.add(user.login, user.email)
+        await identifier_negative_cache.invalidate(user.email)
+
     return UserSchema.model_validate(user, from_attributes=True)
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...minio import AVATARS_BUCKET_NAME, get_minio_client
 from ..schemas import UserSchema
-from ..services import get_user_with_profile
+from ..services import get_user_with_profile, profile_cache
 from ..services.user_service import validate_avatar_file
 
 logger = getLogger(__name__)
@@ -38,5 +38,6 @@ async def patch_my_profile_avatar(
     user.has_avatar = True
     session.add(user)
     await session.commit()
+    await profile_cache.invalidate(user_id)
 
     return UserSchema.model_validate(user, from_attributes=True)
@@ -1,9 +1,68 @@
-from sqlalchemy import desc, func, literal, select
+import base64
+import binascii
+import hashlib
+import math
+import struct
+from typing import Literal
+from uuid import UUID
+
+from pydantic import TypeAdapter
+from sqlalchemy import and_, desc, func, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
+from ...utils import ConditionalContent, etag_matches
 from .. import User, UserProfile
-from ..schemas import PublicUserSchema
+from ..exceptions import InvalidSearchCursorException, SearchCursorWithOffsetException
+from ..schemas import PublicUserSchema, SearchProfilesSchema
+from ..services import get_users_with_profile, profile_cache
+
+_list_adapter = TypeAdapter(list[PublicUserSchema])
+_page_adapter = TypeAdapter(SearchProfilesSchema)
+
+_cursor_struct = struct.Struct(">d16s")  # similarity, UUID
+
+
+def encode_search_cursor(score: float, user_id: UUID) -> str:
+    """
+    Непрозрачный курсор позиции в выдаче: (similarity, id) последнего профиля страницы
+    """
+    raw = _cursor_struct.pack(score, user_id.bytes)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, UUID]:
+    """
+    :param cursor: Курсор из encode_search_cursor
+    :return: similarity и UUID последнего профиля предыдущей страницы
+    :raises InvalidSearchCursorException: Если курсор поврежден
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, user_id = _cursor_struct.unpack(raw)
+    except (binascii.Error, struct.error, ValueError) as err:
+        raise InvalidSearchCursorException() from err
+    if not math.isfinite(score):
+        raise InvalidSearchCursorException()
+    return score, UUID(bytes=user_id)
+
+
+def _search_etag(
+    user_ids: list[UUID],
+    versions: list[bytes | None],
+    next_cursor: str | None,
+    envelope: bool,
+) -> str:
+    """
+    ETag выдачи — от состава, порядка и версий найденных профилей и курсора следующей
+    страницы (не от тела ответа), а также от формы ответа: список или конверт
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for user_id, version in zip(user_ids, versions, strict=True):
+        digest.update(user_id.bytes)
+        digest.update(version or b"")
+    digest.update(b"cursor" if envelope else b"offset")
+    digest.update((next_cursor or "").encode())
+    return f'"{digest.hexdigest()}"'
 
 
 async def search_user_profiles(
@@ -11,19 +70,38 @@ async def search_user_profiles(
     limit: int,
     offset: int,
     session: AsyncSession,
-) -> list[PublicUserSchema]:
+    if_none_match: str | None = None,
+    cursor: str | None = None,
+    paginate: Literal["offset", "cursor"] = "offset",
+) -> ConditionalContent:
     """
-    Поиск пользователей по имени
+    Поиск пользователей по имени.
+    Выдача упорядочена по (similarity desc, id). С курсором страница начинается сразу
+    после профиля, на котором закончилась предыдущая (keyset), и ее стоимость не растет
+    с глубиной, в отличие от offset, который отбрасывает все предыдущие совпадения.
+    Сначала выбираются только id найденных пользователей, и если версии их профилей
+    совпадают с If-None-Match, профили не загружаются и не сериализуются.
+    По умолчанию возвращается список профилей, как и до появления курсора. Конверт
+    с next_cursor возвращается только при paginate="cursor" или переданном курсоре
     :param name: Строка для поиска по имени
     :param limit: лимит для поиска (макс. число пользователей найденных за раз)
-    :param offset: Смещение от "топа" похожих пользователей
+    :param offset: Смещение от "топа" похожих пользователей (только без курсора)
     :param session: Сессия
+    :param if_none_match: Заголовок If-None-Match
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param paginate: Способ пагинации: "offset" — список, "cursor" — SearchProfilesSchema
+    :return: ETag и JSON списка PublicUserSchema, а в режиме курсора — SearchProfilesSchema
+        с курсором следующей страницы (без JSON, если выдача не изменилась)
+    :raises InvalidSearchCursorException: Если курсор поврежден
+    :raises SearchCursorWithOffsetException: Если вместе с курсором передан offset
     """
+    if cursor is not None and offset:
+        raise SearchCursorWithOffsetException()
 
     similarity_score = func.similarity(UserProfile.name, name)
 
     query = (
-        select(User, similarity_score.label("score"))
+        select(User.id, similarity_score)
         .join(User.user_profile)
         .join(
             select(func.set_config("pg_trgm.similarity_threshold", "0.1", True)).cte(
@@ -31,17 +109,47 @@ async def search_user_profiles(
             ),
             literal(True, literal_execute=True),
         )
-        .options(joinedload(User.user_profile))
         .where(UserProfile.name.op("%")(name))
-        .order_by(desc(similarity_score))
+        .order_by(desc(similarity_score), User.id)
         .limit(limit)
         .offset(offset)
     )
+    if cursor is not None:
+        last_score, last_id = decode_search_cursor(cursor)
+        query = query.where(
+            or_(
+                similarity_score < last_score,
+                and_(similarity_score == last_score, User.id > last_id),
+            )
+        )
 
-    result = await session.execute(query)
-    users_with_scores = result.all()
+    rows = (await session.execute(query)).all()
+    user_ids = [user_id for user_id, _ in rows]
+    envelope = paginate == "cursor" or cursor is not None
+    next_cursor = (
+        encode_search_cursor(rows[-1][1], rows[-1][0])
+        if envelope and len(rows) == limit
+        else None
+    )
 
-    return [
-        PublicUserSchema.model_validate(user, from_attributes=True)
-        for user, _ in users_with_scores
+    versions = await profile_cache.get_versions(user_ids)
+    etag = (
+        None
+        if versions is None
+        else _search_etag(user_ids, versions, next_cursor, envelope)
+    )
+    if etag is not None and etag_matches(if_none_match, etag):
+        return ConditionalContent(etag, None)
+
+    users = await get_users_with_profile(user_ids, session)
+    profiles = [
+        PublicUserSchema.model_validate(users[user_id], from_attributes=True)
+        for user_id in user_ids
+        if user_id in users
     ]
+    if not envelope:
+        return ConditionalContent(
+            etag, _list_adapter.dump_json(profiles, by_alias=True)
+        )
+    page = SearchProfilesSchema(profiles=profiles, next_cursor=next_cursor)
+    return ConditionalContent(etag, _page_adapter.dump_json(page, by_alias=True))
@@ -1,5 +1,9 @@
+from typing import NamedTuple
+
+from fastapi import Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Mapped
+from starlette import status
 
 from .database import Base as SQlAlchemyBase
 
@@ -10,3 +14,36 @@ async def update_model_from_schema(
     update_data = schema.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(model, key, value)
+
+
+class ConditionalContent(NamedTuple):
+    etag: str | None  # None — ETag недоступен, ответ без него
+    content: bytes | None  # JSON; None — у клиента актуальная версия (ответ 304)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (слабое сравнение, RFC 9110 13.1.2)
+    :param if_none_match: Значение заголовка If-None-Match
+    :param etag: Текущий ETag ресурса
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def conditional_response(result: ConditionalContent) -> Response:
+    """
+    Ответ с уже сериализованным JSON и ETag или 304, если у клиента актуальная версия.
+    Клиент должен перепроверять ответ при каждом запросе (no-cache)
+    """
+    headers = {"Cache-Control": "private, no-cache"}
+    if result.etag is not None:
+        headers["ETag"] = result.etag
+    if result.content is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(result.content, media_type="application/json", headers=headers)
@@ -1,8 +1,13 @@
 import uuid
 
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
 from starlette import status
 
 from src.auth import auth_router
+from src.database import AsyncSessionLocal
+from src.user.services import select_user_credentials
 from tests.conftest import settings
 
 
@@ -96,3 +101,63 @@ async def test_sign_in_invalid_password_schema(client):
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     assert response.json()["detail"] is not None
+
+
+async def test_sign_in_case_insensitive_identifier(client):
+    unique = uuid.uuid4().hex[:16]
+    payload = {
+        "name": f"User{unique}",
+        "login": f"User{unique}",
+        "email": f"user{unique}@example.com",
+        "password": f"Pass{unique}word",
+    }
+    await client.post(f"{auth_router.prefix}/sign_up", json=payload)
+
+    for identifier in (payload["login"].upper(), payload["email"].upper()):
+        signin_payload = {"identifier": identifier, "password": payload["password"]}
+        response = await client.post(
+            f"{auth_router.prefix}/sign_in", json=signin_payload
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.parametrize(
+    ("identifier", "index_name"),
+    [
+        ("SomeLogin", "idx_users_login_lower"),
+        ("some@example.com", "idx_users_email_lower"),
+    ],
+)
+async def test_sign_in_query_uses_lower_index(identifier, index_name):
+    # Запрос входа должен использовать один функциональный индекс, а не BitmapOr
+    query = select_user_credentials(identifier).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = "\n".join(
+            (await session.execute(text(f"EXPLAIN {query}"))).scalars().all()
+        )
+
+    assert index_name in plan
+    assert "BitmapOr" not in plan
+
+
+async def test_sign_in_after_sign_up_of_unknown_identifier(client):
+    # Промах при входе кэшируется, но регистрация должна его сбрасывать
+    unique = uuid.uuid4().hex[:16]
+    payload = {
+        "name": f"User{unique}",
+        "login": f"User{unique}",
+        "email": f"user{unique}@example.com",
+        "password": f"Pass{unique}word",
+    }
+    signin_payload = {"identifier": payload["login"], "password": payload["password"]}
+
+    response = await client.post(f"{auth_router.prefix}/sign_in", json=signin_payload)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    await client.post(f"{auth_router.prefix}/sign_up", json=payload)
+
+    response = await client.post(f"{auth_router.prefix}/sign_in", json=signin_payload)
+    assert response.status_code == status.HTTP_200_OK
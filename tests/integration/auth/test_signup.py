@@ -115,3 +115,28 @@ async def test_invalid_schema_sign_up(client):
     response = await client.post(f"{auth_router.prefix}/sign_up", json=payload)
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
     assert response.json()["detail"] is not None
+
+
+async def test_conflict_sign_up_case_insensitive(client):
+    # Login и email, отличающиеся только регистром, считаются занятыми
+    unique = uuid.uuid4().hex[:16]
+    payload = {
+        "name": f"User{unique}",
+        "login": f"User{unique}",
+        "email": f"user{unique}@example.com",
+        "password": f"Pass{unique}word",
+    }
+    response = await client.post(f"{auth_router.prefix}/sign_up", json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    for field in ("login", "email"):
+        other = uuid.uuid4().hex[:16]
+        conflicting = {
+            "name": f"User{other}",
+            "login": f"User{other}",
+            "email": f"user{other}@example.com",
+            "password": f"Pass{other}word",
+            field: payload[field].upper(),
+        }
+        response = await client.post(f"{auth_router.prefix}/sign_up", json=conflicting)
+        assert response.status_code == status.HTTP_409_CONFLICT
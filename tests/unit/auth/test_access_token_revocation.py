@@ -0,0 +1,84 @@
+import time
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from src.auth.schemas import TokenPayloadSchema
+from src.auth.services import access_token_revocation_service as service
+from src.auth.utils import JWTUtils
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    """Локальная замена Redis вместо настоящего клиента"""
+    client = fake_redis()
+    monkeypatch.setattr(service, "redis_client", client)
+    service.access_token_revocations.clear()
+    yield client
+    service.access_token_revocations.clear()
+
+
+def _payload(user_id, issued_at: datetime) -> TokenPayloadSchema:
+    return TokenPayloadSchema(
+        sub=user_id,
+        iat=issued_at,
+        exp=issued_at + timedelta(minutes=15),
+    )
+
+
+async def test_revoke_rejects_only_older_tokens(redis):
+    """
+    Отзываются токены, выпущенные до отзыва; новые и чужие токены остаются валидными
+    """
+    user_id = uuid4()
+    now = datetime.now(UTC)
+
+    await service.revoke_access_tokens(user_id)
+
+    assert service.is_access_token_revoked(
+        _payload(user_id, now - timedelta(seconds=5))
+    )
+    assert not service.is_access_token_revoked(
+        _payload(user_id, now + timedelta(seconds=1))
+    )
+    assert not service.is_access_token_revoked(
+        _payload(uuid4(), now - timedelta(seconds=5))
+    )
+    assert 0 < await redis.ttl(f"revoked_before:{user_id}") <= 15 * 60
+
+
+async def test_resync_restores_watermarks_from_redis(redis):
+    """
+    После переподключения к pub/sub водяные знаки загружаются из redis
+    """
+    user_id = uuid4()
+    now = datetime.now(UTC)
+    await redis.set(f"revoked_before:{user_id}", int(now.timestamp()), ex=60)
+
+    await service._resync_revocations()
+
+    assert service.is_access_token_revoked(
+        _payload(user_id, now - timedelta(seconds=5))
+    )
+
+
+async def test_same_second_tokens_are_told_apart(redis, monkeypatch):
+    """
+    Токен, выпущенный в ту же секунду до отзыва, отзывается, а после — нет
+    """
+    user_id = uuid4()
+    second = int(datetime.now(UTC).timestamp())
+
+    monkeypatch.setattr(time, "time", lambda: second + 0.1)
+    stolen = JWTUtils.decode_token(JWTUtils.create_access_token(user_id))
+
+    monkeypatch.setattr(time, "time", lambda: second + 0.5)
+    await service.revoke_access_tokens(user_id)
+
+    monkeypatch.setattr(time, "time", lambda: second + 0.6)
+    issued_after = JWTUtils.decode_token(JWTUtils.create_access_token(user_id))
+
+    assert service.is_access_token_revoked(stolen)
+    assert not service.is_access_token_revoked(issued_after)
+    assert await redis.get(f"revoked_before:{user_id}") == f"{second}.5"
@@ -0,0 +1,79 @@
+import time
+from uuid import uuid4
+
+import pytest
+
+from src.auth.exceptions import InvalidTokenException, TokenExpiredException
+from src.auth.jwt_codecs import HS256JWTCodec, JoseJWTCodec, JWTCodec
+
+SECRET = "test-secret"
+
+CODECS: dict[str, JWTCodec] = {
+    "native": HS256JWTCodec(SECRET),
+    "jose": JoseJWTCodec(SECRET, "HS256"),
+}
+
+# Токен, выпущенный одной реализацией, должна принимать и отклонять так же другая
+CODEC_PAIRS = [
+    pytest.param(CODECS[encoder], CODECS[decoder], id=f"{encoder}->{decoder}")
+    for encoder in CODECS
+    for decoder in CODECS
+]
+
+
+def _claims(**overrides) -> dict:
+    now = int(time.time())
+    return {
+        "iat": now,
+        "sub": str(uuid4()),
+        "exp": now + 60,
+        "jti": str(uuid4()),
+    } | overrides
+
+
+@pytest.mark.parametrize(("encoder", "decoder"), CODEC_PAIRS)
+def test_round_trip(encoder: JWTCodec, decoder: JWTCodec):
+    claims = _claims()
+
+    assert decoder.decode(encoder.encode(claims)) == claims
+
+
+@pytest.mark.parametrize(("encoder", "decoder"), CODEC_PAIRS)
+def test_expired_token(encoder: JWTCodec, decoder: JWTCodec):
+    token = encoder.encode(_claims(exp=int(time.time()) - 10))
+
+    with pytest.raises(TokenExpiredException):
+        decoder.decode(token)
+
+
+@pytest.mark.parametrize(("encoder", "decoder"), CODEC_PAIRS)
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"nbf": int(time.time()) + 3600},
+        {"iat": "yesterday"},
+        {"nbf": "tomorrow"},
+        {"exp": "never"},
+        {"sub": 42},
+        {"jti": 42},
+        {"aud": "another-service"},
+    ],
+    ids=["future_nbf", "iat", "nbf", "exp", "sub", "jti", "aud"],
+)
+def test_invalid_claims(encoder: JWTCodec, decoder: JWTCodec, overrides: dict):
+    token = encoder.encode(_claims(**overrides))
+
+    with pytest.raises(InvalidTokenException):
+        decoder.decode(token)
+
+
+@pytest.mark.parametrize(("encoder", "decoder"), CODEC_PAIRS)
+def test_token_signed_with_another_secret(encoder: JWTCodec, decoder: JWTCodec):
+    other = (
+        HS256JWTCodec("other-secret")
+        if isinstance(encoder, HS256JWTCodec)
+        else JoseJWTCodec("other-secret", "HS256")
+    )
+
+    with pytest.raises(InvalidTokenException):
+        decoder.decode(other.encode(_claims()))
@@ -0,0 +1,88 @@
+from uuid import uuid4
+
+import pytest
+
+from src.auth.config import AuthSettings
+from src.auth.services.memory_refresh_token_store import InMemoryRefreshTokenStore
+from src.auth.services.refresh_token_store import (
+    RedisRefreshTokenStore,
+    create_refresh_token_store,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(clock):
+    return InMemoryRefreshTokenStore(ttl_seconds=100, max_tokens=3, clock=clock)
+
+
+async def test_rotate_refresh_token_is_single_use(store):
+    user_id, old_jti, new_jti = uuid4(), uuid4(), uuid4()
+    await store.add_new_refresh_token(user_id, old_jti)
+
+    assert await store.rotate_refresh_token(user_id, old_jti, new_jti)
+    assert not await store.rotate_refresh_token(user_id, old_jti, uuid4())
+
+    assert await store.is_refresh_jti_valid(user_id, new_jti)
+    assert not await store.is_refresh_jti_valid(user_id, old_jti)
+
+
+async def test_oldest_tokens_are_trimmed(store, clock):
+    user_id = uuid4()
+    jtis = [uuid4() for _ in range(5)]
+    for jti in jtis:
+        clock.now += 1
+        await store.add_new_refresh_token(user_id, jti)
+
+    valid = [await store.is_refresh_jti_valid(user_id, jti) for jti in jtis]
+    assert valid == [False, False, True, True, True]
+
+
+async def test_tokens_expire_unless_extended(store, clock):
+    """
+    Выпуск нового токена продлевает срок жизни всего набора, как EXPIRE в redis
+    """
+    first_user, second_user = uuid4(), uuid4()
+    first_jti, second_jti = uuid4(), uuid4()
+    await store.add_new_refresh_token(first_user, first_jti)
+    await store.add_new_refresh_token(second_user, second_jti)
+
+    clock.now += 60
+    await store.add_new_refresh_token(first_user, uuid4())
+    clock.now += 60
+
+    assert await store.is_refresh_jti_valid(first_user, first_jti)
+    assert not await store.is_refresh_jti_valid(second_user, second_jti)
+
+
+async def test_remove_all_except_keeps_only_one(store):
+    user_id, keep_jti = uuid4(), uuid4()
+    await store.add_new_refresh_token(user_id, keep_jti)
+    await store.add_new_refresh_token(user_id, uuid4())
+    await store.add_new_refresh_token(user_id, uuid4())
+
+    assert await store.remove_all_refresh_tokens_except(user_id, keep_jti) == 2
+    assert await store.is_refresh_jti_valid(user_id, keep_jti)
+    assert await store.remove_all_refresh_tokens(user_id) == 1
+    assert await store.remove_all_refresh_tokens_except(user_id, keep_jti) == 0
+
+
+def test_backend_is_selected_by_setting():
+    """
+    Хранилище выбирается AUTH_REFRESH_TOKEN_STORE, по умолчанию — redis
+    """
+    assert AuthSettings.model_fields["refresh_token_store"].default == "redis"
+    assert isinstance(create_refresh_token_store("redis"), RedisRefreshTokenStore)
+    assert isinstance(create_refresh_token_store("memory"), InMemoryRefreshTokenStore)
@@ -0,0 +1,87 @@
+from uuid import uuid4
+
+import pytest
+
+from src.auth.commands import migrate_refresh_jti as command
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    """Локальная замена Redis вместо настоящего клиента"""
+    client = fake_redis(decode_responses=False)
+    monkeypatch.setattr(command, "redis_bytes_client", client)
+    return client
+
+
+async def _migrate(to: str) -> None:
+    await command.migrate(to, batch_size=10, sample_size=10, dry_run=False)
+
+
+async def test_migration_round_trip(redis):
+    """
+    jti переводятся в 16 байт и обратно, время выпуска и TTL ключа сохраняются
+    """
+    user_id, first, second = uuid4(), uuid4(), uuid4()
+    key = f"refresh:{user_id}"
+    original = [(str(first).encode(), 100.0), (str(second).encode(), 200.0)]
+    await redis.zadd(key, dict(original))
+    await redis.expire(key, 1000)
+    unrelated = str(uuid4()).encode()
+    await redis.set("unrelated", unrelated)
+
+    await _migrate("compact")
+
+    assert await redis.zrange(key, 0, -1, withscores=True) == [
+        (first.bytes, 100.0),
+        (second.bytes, 200.0),
+    ]
+    assert 0 < await redis.ttl(key) <= 1000
+
+    await _migrate("text")
+
+    assert await redis.zrange(key, 0, -1, withscores=True) == original
+    assert 0 < await redis.ttl(key) <= 1000
+    assert await redis.get("unrelated") == unrelated
+
+
+async def test_migration_is_idempotent_on_mixed_keys(redis):
+    """
+    Ключ с обеими формами (часть токенов выпущена после включения настройки)
+    конвертируется полностью, повторный запуск ничего не меняет
+    """
+    key = f"refresh:{uuid4()}"
+    text_jti, compact_jti = uuid4(), uuid4()
+    await redis.zadd(key, {str(text_jti): 1, compact_jti.bytes: 2})
+
+    await _migrate("compact")
+    await _migrate("compact")
+
+    assert await redis.zrange(key, 0, -1) == [text_jti.bytes, compact_jti.bytes]
+
+    await _migrate("text")
+    await _migrate("text")
+
+    assert await redis.zrange(key, 0, -1) == [
+        str(text_jti).encode(),
+        str(compact_jti).encode(),
+    ]
+
+
+@pytest.mark.parametrize("sampled", [False, True])
+async def test_report_without_sampled_memory(redis, monkeypatch, capsys, sampled):
+    """
+    Пустая выборка или нулевой MEMORY USAGE (ключи истекли) — отчет без экономии в %
+    """
+    if sampled:
+        await redis.zadd(f"refresh:{uuid4()}", {str(uuid4()): 1})
+
+        async def memory_usage(keys):
+            return 0
+
+        monkeypatch.setattr(command, "memory_usage", memory_usage)
+
+    await _migrate("compact")
+
+    report = capsys.readouterr().out
+    assert f"MEMORY USAGE of {int(sampled)} sampled keys: 0 B" in report
+    assert "saved" not in report
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.auth.exceptions import PasswordHashingOverloadedException
+from src.auth.services.password_hashing_service import HashingAdmissionController
+
+
+def _controller(
+    workers: int = 2, memory_budget_mib: int = 512, max_waiters: int = 0
+) -> HashingAdmissionController:
+    return HashingAdmissionController(
+        workers=workers,
+        memory_budget_mib=memory_budget_mib,
+        memory_per_hash_kib=65536,
+        max_waiters=max_waiters,
+        max_wait_seconds=0.05,
+    )
+
+
+def test_slots_are_capped_by_workers_and_memory_budget():
+    assert _controller().slots == 2  # бюджет допускает 8
+    assert _controller(workers=16).slots == 8
+    assert _controller(memory_budget_mib=16).slots == 1
+
+
+async def _hold(controller: HashingAdmissionController, release: asyncio.Event):
+    async with controller.admit():
+        await release.wait()
+
+
+async def test_rejects_when_queue_is_full():
+    controller, release = _controller(), asyncio.Event()
+    holders = [asyncio.create_task(_hold(controller, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHashingOverloadedException) as exc_info:
+        async with controller.admit():
+            pass
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "1"}
+
+    release.set()
+    await asyncio.gather(*holders)
+    async with controller.admit():  # слоты освобождены
+        pass
+
+
+async def test_waiter_is_admitted_or_rejected_by_timeout():
+    controller, release = _controller(max_waiters=1), asyncio.Event()
+    holders = [asyncio.create_task(_hold(controller, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHashingOverloadedException):
+        async with controller.admit():
+            pass
+
+    waiter = asyncio.create_task(_hold(controller, asyncio.Event()))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*holders)
+    await asyncio.sleep(0)
+    assert not waiter.done()  # допущен и держит слот
+    waiter.cancel()
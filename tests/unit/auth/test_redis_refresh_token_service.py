@@ -0,0 +1,209 @@
+from uuid import uuid4
+
+import pytest
+
+from src.auth.constants import MAX_REFRESH_TOKENS
+from src.auth.services import redis_refresh_token_service as service
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    """Локальная замена Redis вместо настоящих клиентов"""
+    client = fake_redis()
+    monkeypatch.setattr(service, "redis_client", client)
+    monkeypatch.setattr(
+        service, "redis_bytes_client", fake_redis(decode_responses=False)
+    )
+    return client
+
+
+async def test_remove_all_except_keeps_only_one(redis):
+    """
+    Остается только указанный токен, его время выпуска и TTL ключа сохраняются
+    """
+    user_id, keep_jti = uuid4(), uuid4()
+    await redis.zadd(f"refresh:{user_id}", {str(keep_jti): 100})
+    await redis.zadd(f"refresh:{user_id}", {str(uuid4()): 200 for _ in range(3)})
+    await redis.expire(f"refresh:{user_id}", 1000)
+
+    removed = await service.remove_all_refresh_tokens_except(user_id, keep_jti)
+
+    assert removed == 3
+    assert await redis.zrange(f"refresh:{user_id}", 0, -1, withscores=True) == [
+        (str(keep_jti), 100.0)
+    ]
+    assert 0 < await redis.ttl(f"refresh:{user_id}") <= 1000
+
+
+async def test_remove_all_except_unknown_jti_removes_everything(redis):
+    """
+    Если сохраняемого токена уже нет, удаляются все токены пользователя
+    """
+    user_id = uuid4()
+    await redis.zadd(f"refresh:{user_id}", {str(uuid4()): 1, str(uuid4()): 2})
+
+    removed = await service.remove_all_refresh_tokens_except(user_id, uuid4())
+
+    assert removed == 2
+    assert not await redis.exists(f"refresh:{user_id}")
+
+
+async def test_remove_all_refresh_tokens(redis):
+    user_id = uuid4()
+    for _ in range(3):
+        await service.add_new_refresh_token(user_id, uuid4())
+
+    assert await service.remove_all_refresh_tokens(user_id) == 3
+    assert await service.remove_all_refresh_tokens(user_id) == 0
+    assert not await redis.exists(f"refresh:{user_id}")
+
+
+async def test_add_new_refresh_token_trims_to_max(redis):
+    user_id = uuid4()
+    for _ in range(MAX_REFRESH_TOKENS + 2):
+        await service.add_new_refresh_token(user_id, uuid4())
+
+    assert await redis.zcard(f"refresh:{user_id}") == MAX_REFRESH_TOKENS
+    assert await redis.ttl(f"refresh:{user_id}") > 0
+
+
+async def test_rotate_refresh_token_is_single_use(redis):
+    """
+    Старый jti заменяется новым, повторная ротация тем же jti не проходит
+    """
+    user_id, old_jti, new_jti = uuid4(), uuid4(), uuid4()
+    await service.add_new_refresh_token(user_id, old_jti)
+
+    assert await service.rotate_refresh_token(user_id, old_jti, new_jti)
+    assert not await service.rotate_refresh_token(user_id, old_jti, uuid4())
+
+    assert await service.is_refresh_jti_valid(user_id, new_jti)
+    assert not await service.is_refresh_jti_valid(user_id, old_jti)
+
+
+@pytest.fixture
+def hash_tagged_keys(monkeypatch):
+    """Раскладка refresh:{<user_id>} с подхватом ключей старой раскладки"""
+    monkeypatch.setattr(service.auth_settings, "refresh_token_hash_tagged_keys", True)
+    monkeypatch.setattr(service, "_LEGACY_KEY_FALLBACK", True)
+
+
+async def test_legacy_key_is_picked_up_by_rotation(redis, hash_tagged_keys):
+    """
+    Токен, выпущенный до смены раскладки, проходит ротацию и переезжает в новый ключ
+    """
+    user_id, old_jti, new_jti = uuid4(), uuid4(), uuid4()
+    await redis.zadd(f"refresh:{user_id}", {str(old_jti): 100})
+    await redis.expire(f"refresh:{user_id}", 1000)
+
+    assert await service.rotate_refresh_token(user_id, old_jti, new_jti)
+
+    assert not await redis.exists(f"refresh:{user_id}")
+    assert await redis.zrange(f"refresh:{{{user_id}}}", 0, -1) == [str(new_jti)]
+    assert await service.is_refresh_jti_valid(user_id, new_jti)
+
+
+async def test_legacy_key_is_picked_up_on_read_miss(redis, hash_tagged_keys):
+    user_id, jti = uuid4(), uuid4()
+    await redis.zadd(f"refresh:{user_id}", {str(jti): 100})
+
+    assert await service.is_refresh_jti_valid(user_id, jti)
+    assert not await service.is_refresh_jti_valid(user_id, uuid4())
+    assert await redis.zrange(f"refresh:{{{user_id}}}", 0, -1) == [str(jti)]
+
+
+async def test_legacy_key_is_ignored_without_fallback(redis, monkeypatch):
+    """
+    После миграции (AUTH_REFRESH_TOKEN_LEGACY_KEY_FALLBACK=0) старая раскладка не читается
+    """
+    monkeypatch.setattr(service.auth_settings, "refresh_token_hash_tagged_keys", True)
+    monkeypatch.setattr(service, "_LEGACY_KEY_FALLBACK", False)
+    user_id, jti = uuid4(), uuid4()
+    await redis.zadd(f"refresh:{user_id}", {str(jti): 100})
+
+    assert not await service.is_refresh_jti_valid(user_id, jti)
+    assert not await service.rotate_refresh_token(user_id, jti, uuid4())
+    assert await redis.exists(f"refresh:{user_id}")
+    assert not await redis.exists(f"refresh:{{{user_id}}}")
+
+
+async def test_move_refresh_key_merges_into_existing_key(redis):
+    """
+    Токены обоих ключей объединяются в пределах лимита, сохраняется наибольший TTL
+    """
+    user_id = uuid4()
+    await redis.zadd(
+        f"refresh:{user_id}", {str(uuid4()): i for i in range(MAX_REFRESH_TOKENS)}
+    )
+    await redis.expire(f"refresh:{user_id}", 2000)
+    await redis.zadd(f"refresh:{{{user_id}}}", {str(uuid4()): 10_000})
+    await redis.expire(f"refresh:{{{user_id}}}", 1000)
+
+    assert await service.move_refresh_key(user_id, to_hash_tagged=True)
+    assert not await service.move_refresh_key(user_id, to_hash_tagged=True)
+
+    scores = await redis.zrange(f"refresh:{{{user_id}}}", 0, -1, withscores=True)
+    assert len(scores) == MAX_REFRESH_TOKENS
+    assert scores[-1][1] == 10_000
+    assert 1000 < await redis.ttl(f"refresh:{{{user_id}}}") <= 2000
+
+
+@pytest.fixture
+def compact_jti(monkeypatch):
+    monkeypatch.setattr(service.auth_settings, "refresh_token_compact_jti", True)
+
+
+async def test_compact_jti_is_stored_as_16_bytes(redis, compact_jti):
+    user_id, old_jti, new_jti, other_jti = uuid4(), uuid4(), uuid4(), uuid4()
+    await service.add_new_refresh_token(user_id, old_jti)
+    await service.add_new_refresh_token(user_id, other_jti)
+
+    assert await service.is_refresh_jti_valid(user_id, old_jti)
+    assert await service.rotate_refresh_token(user_id, old_jti, new_jti)
+    assert not await service.rotate_refresh_token(user_id, old_jti, uuid4())
+    assert not await service.is_refresh_jti_valid(user_id, old_jti)
+
+    assert await service.remove_all_refresh_tokens_except(user_id, new_jti) == 1
+    members = await service.redis_bytes_client.zrange(f"refresh:{user_id}", 0, -1)
+    assert members == [new_jti.bytes]
+    assert await service.is_refresh_jti_valid(user_id, new_jti)
+    assert not await service.is_refresh_jti_valid(user_id, other_jti)
+
+
+async def test_compact_mode_accepts_text_jti(redis, compact_jti):
+    """
+    Ключи, еще не прошедшие миграцию на компактный формат, остаются валидными
+    """
+    user_id, old_jti, new_jti = uuid4(), uuid4(), uuid4()
+    await redis.zadd(f"refresh:{user_id}", {str(old_jti): 100})
+
+    assert await service.is_refresh_jti_valid(user_id, old_jti)
+    assert await service.rotate_refresh_token(user_id, old_jti, new_jti)
+
+    members = await service.redis_bytes_client.zrange(f"refresh:{user_id}", 0, -1)
+    assert members == [new_jti.bytes]
+
+
+async def test_text_mode_accepts_compact_jti(redis):
+    """
+    После отключения компактного формата (откат) токены в компактной форме
+    остаются валидными до завершения миграции --to text
+    """
+    user_id, jti, kept_jti, removed_jti = uuid4(), uuid4(), uuid4(), uuid4()
+    bytes_client = service.redis_bytes_client
+    await bytes_client.zadd(
+        f"refresh:{user_id}",
+        {jti.bytes: 100, kept_jti.bytes: 200, removed_jti.bytes: 300},
+    )
+
+    assert await service.is_refresh_jti_valid(user_id, jti)
+    new_jti = uuid4()
+    assert await service.rotate_refresh_token(user_id, jti, new_jti)
+
+    await service.remove_refresh_token(user_id, removed_jti)
+    assert not await service.is_refresh_jti_valid(user_id, removed_jti)
+
+    assert await service.remove_all_refresh_tokens_except(user_id, kept_jti) == 1
+    assert await redis.zrange(f"refresh:{user_id}", 0, -1, withscores=True) == [
+        (str(kept_jti), 200.0)
+    ]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from src.auth.services.refresh_token_client_cache import RefreshTokenClientCache
+
+KEY, JTI = "refresh:user", "jti"
+
+
+@pytest.fixture
+def cache() -> RefreshTokenClientCache:
+    cache = RefreshTokenClientCache(max_keys=100)
+    cache.active = True
+    return cache
+
+
+class FakeStore:
+    """Счетчик обращений к redis и текущее значение проверки"""
+
+    def __init__(self, valid: bool):
+        self.valid = valid
+        self.calls = 0
+
+    async def fetch(self) -> bool:
+        self.calls += 1
+        return self.valid
+
+
+async def test_hit_until_invalidated(cache):
+    store = FakeStore(valid=True)
+
+    assert await cache.get_or_fetch(KEY, JTI, store.fetch)
+    assert await cache.get_or_fetch(KEY, JTI, store.fetch)
+    assert store.calls == 1
+
+    store.valid = False
+    cache.handle_invalidation([KEY])
+
+    assert not await cache.get_or_fetch(KEY, JTI, store.fetch)
+    assert store.calls == 2
+
+
+async def test_invalidation_during_fetch_is_not_lost(cache):
+    """
+    Ротация в другом воркере во время чтения: ответ redis получен до ротации,
+    сообщение инвалидации обработано раньше ответа — устаревший ответ не кэшируется
+    """
+    store = FakeStore(valid=False)
+    reply_sent, invalidated = asyncio.Event(), asyncio.Event()
+
+    async def racing_fetch() -> bool:
+        reply_sent.set()
+        await invalidated.wait()
+        return True  # значение до ротации
+
+    read = asyncio.create_task(cache.get_or_fetch(KEY, JTI, racing_fetch))
+    await reply_sent.wait()
+    cache.handle_invalidation([KEY])
+    invalidated.set()
+
+    assert await read
+    assert not await cache.get_or_fetch(KEY, JTI, store.fetch)
+    assert store.calls == 1
+
+
+async def test_inactive_cache_always_fetches(cache):
+    store = FakeStore(valid=True)
+    cache.deactivate()
+
+    await cache.get_or_fetch(KEY, JTI, store.fetch)
+    await cache.get_or_fetch(KEY, JTI, store.fetch)
+
+    assert store.calls == 2
@@ -0,0 +1,44 @@
+import time
+from uuid import uuid4
+
+import pytest
+
+from src.auth.services import refresh_token_sweeper_service as sweeper_module
+from src.auth.services.refresh_token_sweeper_service import RefreshTokenSweeper
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    client = fake_redis()
+    monkeypatch.setattr(sweeper_module, "redis_client", client)
+    return client
+
+
+async def test_sweep_removes_only_expired_jti(redis):
+    """
+    Удаляются только jti старше времени жизни refresh токена, пустые ключи исчезают
+    """
+    now = int(time.time())
+    active_user, dead_user = uuid4(), uuid4()
+    fresh_jti = str(uuid4())
+    await redis.zadd(
+        f"refresh:{active_user}", {fresh_jti: now, str(uuid4()): now - 7200}
+    )
+    await redis.zadd(f"refresh:{dead_user}", {str(uuid4()): now - 7200})
+    await redis.set("unrelated", "1")
+
+    sweeper = RefreshTokenSweeper(
+        interval_seconds=60,
+        batch_size=1,
+        max_keys_per_second=10_000,
+        max_age_seconds=3600,
+    )
+    result = await sweeper.sweep_once()
+
+    assert result.keys_scanned == 2
+    assert result.keys_cleaned == 2
+    assert result.keys_deleted == 1
+    assert result.members_removed == 2
+    assert await redis.zrange(f"refresh:{active_user}", 0, -1) == [fresh_jti]
+    assert not await redis.exists(f"refresh:{dead_user}")
+    assert await redis.exists("unrelated")
@@ -0,0 +1,88 @@
+import importlib
+from uuid import uuid4
+
+import pytest
+from argon2 import PasswordHasher
+from sqlalchemy.dialects import postgresql
+
+from src.auth.exceptions import PasswordHashingOverloadedException
+from src.auth.utils import PasswordUtils
+
+# Имя модуля в src.auth.usecases перекрыто одноименной функцией
+usecase_module = importlib.import_module("src.auth.usecases.rehash_user_password")
+rehash_user_password = usecase_module.rehash_user_password
+
+
+class RecordingSession:
+    """Сессия, которая запоминает выполненные запросы вместо обращения к БД"""
+
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = RecordingSession()
+    monkeypatch.setattr(usecase_module, "AsyncSessionLocal", lambda: session)
+    return session
+
+
+@pytest.fixture
+def new_hash(monkeypatch):
+    async def hash_password(password):
+        return f"new-hash-of-{password}"
+
+    monkeypatch.setattr(
+        usecase_module.password_hashing_engine, "hash_password", hash_password
+    )
+
+
+def test_needs_rehash_only_for_other_parameters():
+    old_hash = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash("pw")
+
+    assert PasswordUtils.check_needs_rehash(old_hash)
+    assert not PasswordUtils.check_needs_rehash(PasswordUtils.hash_password("pw"))
+    assert not PasswordUtils.check_needs_rehash("not an argon2 hash")
+
+
+async def test_hash_is_replaced_only_if_password_is_unchanged(session, new_hash):
+    user_id = uuid4()
+
+    await rehash_user_password(user_id, "old-hash", "pw")
+
+    assert session.committed
+    [statement] = session.statements
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert "WHERE users.id = %(id_1)s::UUID AND users.hashed_password = " in str(
+        compiled
+    )
+    assert compiled.params["id_1"] == user_id
+    assert "old-hash" in compiled.params.values()
+    assert compiled.params["hashed_password"] == "new-hash-of-pw"
+
+
+async def test_overloaded_pool_skips_rehash(session, monkeypatch):
+    async def overloaded(password):
+        raise PasswordHashingOverloadedException(retry_after=1)
+
+    monkeypatch.setattr(
+        usecase_module.password_hashing_engine, "hash_password", overloaded
+    )
+
+    await rehash_user_password(uuid4(), "old-hash", "pw")
+
+    assert session.statements == []
+    assert not session.committed
@@ -0,0 +1,75 @@
+import importlib
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+from src.auth.schemas import TokenPayloadSchema
+from src.auth.services.verified_token_cache import VerifiedTokenCache
+
+# Имя модуля в src.auth.services перекрыто одноименным синглтоном
+cache_module = importlib.import_module("src.auth.services.verified_token_cache")
+
+NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _payload(user_id: UUID, ttl_seconds: int = 60) -> TokenPayloadSchema:
+    return TokenPayloadSchema(
+        sub=user_id, iat=NOW, exp=NOW + timedelta(seconds=ttl_seconds)
+    )
+
+
+def _freeze_time(monkeypatch, moment: datetime) -> None:
+    monkeypatch.setattr(cache_module.time, "time", moment.timestamp)
+
+
+def test_entry_lives_until_token_exp(monkeypatch):
+    cache = VerifiedTokenCache(max_size=10)
+    payload = _payload(uuid4(), ttl_seconds=60)
+    _freeze_time(monkeypatch, NOW)
+
+    cache.put("token", payload)
+    assert cache.get("token") is payload
+    assert cache.get("other-token") is None
+
+    _freeze_time(monkeypatch, NOW + timedelta(seconds=60))
+    assert cache.get("token") is None
+    # Истекшая запись удалена, в т.ч. из индекса по пользователю
+    assert cache._by_user == {}
+
+
+def test_evict_user_removes_only_their_tokens(monkeypatch):
+    cache = VerifiedTokenCache(max_size=10)
+    user, other = uuid4(), uuid4()
+    _freeze_time(monkeypatch, NOW)
+
+    cache.put("first", _payload(user))
+    cache.put("second", _payload(user))
+    cache.put("other", _payload(other))
+    cache.evict_user(user)
+
+    assert cache.get("first") is None
+    assert cache.get("second") is None
+    assert cache.get("other") is not None
+
+
+def test_least_recently_used_token_is_dropped(monkeypatch):
+    cache = VerifiedTokenCache(max_size=2)
+    user = uuid4()
+    _freeze_time(monkeypatch, NOW)
+
+    cache.put("first", _payload(user))
+    cache.put("second", _payload(user))
+    cache.get("first")  # second — самый давно использованный
+    cache.put("third", _payload(user))
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+    assert len(cache._by_user[user]) == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = VerifiedTokenCache(max_size=0)
+
+    cache.put("token", _payload(uuid4()))
+
+    assert cache.get("token") is None
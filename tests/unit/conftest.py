@@ -0,0 +1,30 @@
+from collections.abc import AsyncGenerator, Callable
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+
+@pytest.fixture
+async def fake_redis() -> AsyncGenerator[Callable[..., FakeAsyncRedis]]:
+    """
+    Фабрика клиентов локальной замены Redis (с поддержкой Lua).
+    Клиенты одного теста работают с одним сервером, как redis_client и
+    redis_bytes_client приложения. После теста данные удаляются, клиенты закрываются
+    """
+    server = FakeServer()
+    clients: list[FakeAsyncRedis] = []
+
+    def make_client(decode_responses: bool = True) -> FakeAsyncRedis:
+        """
+        :param decode_responses: Декодировать ответы в str (как redis_client),
+            False — bytes (как redis_bytes_client)
+        """
+        client = FakeAsyncRedis(server=server, decode_responses=decode_responses)
+        clients.append(client)
+        return client
+
+    yield make_client
+    if clients:
+        await clients[0].flushall()
+    for client in clients:
+        await client.aclose()
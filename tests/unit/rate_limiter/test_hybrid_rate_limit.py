@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from src.rate_limiter import hybrid as hybrid_module
+
+TIMES, INTERVAL_MS, TOLERANCE_MS = 10, 6000, 60000  # 10 запросов в минуту
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    """Локальная замена Redis вместо настоящего клиента"""
+    client = fake_redis()
+    monkeypatch.setattr(hybrid_module, "redis_client", client)
+    return client
+
+
+def _worker() -> hybrid_module.HybridRateLimitState:
+    return hybrid_module.HybridRateLimitState(
+        enabled=True, sync_interval_seconds=60, max_error=0.2
+    )
+
+
+async def _admitted(worker, attempts: int) -> int:
+    results = [
+        await worker.check("rate_limit:test:key", TIMES, INTERVAL_MS, TOLERANCE_MS)
+        for _ in range(attempts)
+    ]
+    return sum(result is None for result in results)
+
+
+async def test_workers_share_quota_within_error_bound(redis):
+    """
+    Два воркера вместе не превышают лимит больше, чем на свою локальную долю
+    """
+    first, second = _worker(), _worker()
+
+    admitted = await _admitted(first, 8)
+    await first.sync()
+    admitted += await _admitted(second, 10)
+    await second.sync()
+    admitted += await _admitted(first, 10)
+
+    assert TIMES <= admitted <= TIMES + 2 * first.local_quota(TIMES)
+
+
+async def test_rejections_are_answered_locally(redis):
+    """
+    После исчерпания лимита отказы не требуют обращения к redis
+    """
+    worker = _worker()
+    await _admitted(worker, TIMES + 5)
+    await redis.flushall()
+
+    assert await _admitted(worker, 3) == 0
+
+
+async def test_failed_sync_is_retried(redis, monkeypatch):
+    """
+    Любая ошибка синхронизации (не только RedisError) не теряет расход
+    и не останавливает фоновую задачу
+    """
+    worker = hybrid_module.HybridRateLimitState(
+        enabled=True, sync_interval_seconds=0.01, max_error=0.2
+    )
+    await _admitted(worker, 2)
+
+    consume = hybrid_module.gcra_consume_script
+    calls = []
+
+    async def failing_once(keys, args, client):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("CROSSSLOT Keys in request don't hash to the same slot")
+        return await consume(keys=keys, args=args, client=client)
+
+    monkeypatch.setattr(hybrid_module, "gcra_consume_script", failing_once)
+    worker.start()
+    try:
+        for _ in range(100):
+            if len(calls) >= 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        assert worker.running
+        await worker.stop()
+
+    # Оба запроса отправлены повторной синхронизацией после ошибки
+    assert calls[0] == calls[1] == [2, INTERVAL_MS]
@@ -0,0 +1,35 @@
+import pytest
+from starlette.requests import Request
+
+from src.rate_limiter import RateLimiter, RateLimitExceededException
+from src.rate_limiter import limiter as limiter_module
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    """Локальная замена Redis вместо настоящего клиента"""
+    client = fake_redis()
+    monkeypatch.setattr(limiter_module, "redis_client", client)
+    monkeypatch.setattr(limiter_module.rate_limit_settings, "enabled", True)
+    return client
+
+
+def _request(ip: str) -> Request:
+    return Request(
+        {"type": "http", "headers": [(b"x-real-ip", ip.encode())], "client": None}
+    )
+
+
+async def test_limit_allows_burst_then_rejects(redis):
+    limiter = RateLimiter("test", times=3, seconds=60)
+
+    for _ in range(3):
+        await limiter(_request("10.0.0.1"))
+
+    with pytest.raises(RateLimitExceededException) as exc_info:
+        await limiter(_request("10.0.0.1"))
+    assert exc_info.value.headers is not None
+    assert 0 < int(exc_info.value.headers["Retry-After"]) <= 20
+
+    # Лимит считается отдельно для каждого клиента
+    await limiter(_request("10.0.0.2"))
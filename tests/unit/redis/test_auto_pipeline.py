@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ResponseError
+
+from src.metrics import metrics
+from src.redis.client import AutoPipelineRedis
+
+
+@pytest.fixture
+def redis(fake_redis):
+    """Автоматически конвейеризующий клиент поверх локальной замены Redis (с поддержкой Lua)"""
+    return AutoPipelineRedis(connection_pool=fake_redis().connection_pool)
+
+
+def _batches() -> int:
+    return metrics.snapshot()["redis_auto_pipeline_commands"]["count"]
+
+
+async def test_commands_of_one_tick_share_pipeline(redis):
+    await redis.zadd("refresh:user", {"a": 1, "b": 2})
+    before = _batches()
+
+    results = await asyncio.gather(
+        redis.zscore("refresh:user", "a"),
+        redis.zmscore("refresh:user", ["b", "missing"]),
+        redis.zrem("refresh:user", "a"),
+        redis.zcard("refresh:user"),
+    )
+
+    assert results == [1.0, [2.0, None], 1, 1]
+    assert _batches() == before + 1
+
+
+async def test_error_is_delivered_only_to_its_command(redis):
+    await redis.zadd("refresh:user", {"a": 1})
+
+    incr, score = await asyncio.gather(
+        redis.incr("refresh:user"),
+        redis.zscore("refresh:user", "a"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(incr, ResponseError)
+    assert score == 1.0
+
+
+async def test_scripts_are_loaded_on_noscript(redis):
+    script = redis.register_script("return redis.call('ZCARD', KEYS[1])")
+    await redis.zadd("refresh:user", {"a": 1, "b": 2})
+
+    results = await asyncio.gather(
+        *(script(keys=["refresh:user"], client=redis) for _ in range(3))
+    )
+
+    assert results == [2, 2, 2]
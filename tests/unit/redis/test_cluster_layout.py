@@ -0,0 +1,57 @@
+from uuid import uuid4
+
+import pytest
+from redis.crc import key_slot
+
+from src.redis.client import execute_and_publish
+from src.user.commands.rebuild_user_bloom_filter import _REBUILD_KEYS
+from src.user.services.profile_cache_service import profile_cache
+from src.user.services.user_bloom_filter_service import (
+    BLOOM_EMAIL_KEY,
+    BLOOM_LOGIN_KEY,
+    BLOOM_READY_KEY,
+)
+
+
+def _slots(*keys: str) -> set[int]:
+    return {key_slot(key.encode()) for key in keys}
+
+
+def test_bloom_keys_share_slot():
+    """
+    Перестроение подменяет фильтры одним скриптом — в кластере ключи должны быть в одном слоте
+    """
+    keys = (*_REBUILD_KEYS, BLOOM_LOGIN_KEY, BLOOM_EMAIL_KEY, BLOOM_READY_KEY)
+    assert len(_slots(*keys)) == 1
+
+
+def test_profile_keys_share_slot():
+    user_id = uuid4()
+    assert (
+        len(_slots(profile_cache._key(user_id), profile_cache._version_key(user_id)))
+        == 1
+    )
+
+
+@pytest.fixture
+def redis(fake_redis):
+    return fake_redis()
+
+
+async def test_execute_and_publish(redis):
+    """
+    Сообщение публикуется после команд пайплайна, результат PUBLISH не возвращается
+    """
+    pubsub = redis.pubsub()
+    await pubsub.subscribe("channel")
+    await pubsub.get_message(timeout=1)  # подтверждение подписки
+
+    pipe = redis.pipeline(transaction=True)
+    pipe.set("key", "value")
+    pipe.get("key")
+
+    assert await execute_and_publish(pipe, "channel", "message") == [True, "value"]
+    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+    assert message is not None and message["data"] == "message"
+
+    await pubsub.aclose()
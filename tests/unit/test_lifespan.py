@@ -0,0 +1,62 @@
+import importlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+main_module = importlib.import_module("src.main")
+
+
+@pytest.fixture
+def components(monkeypatch):
+    """Компоненты приложения, заменённые моками; events — порядок start/stop"""
+    events: list[str] = []
+    mocks = {}
+    for name, is_async_start in (
+        ("redis_manager", True),
+        ("password_hashing_engine", True),
+        ("refresh_token_sweeper", False),
+        ("pubsub_listener", False),
+        ("hybrid_rate_limit_state", False),
+    ):
+        start_mock = AsyncMock() if is_async_start else MagicMock()
+        start_mock.side_effect = lambda name=name: events.append(f"start {name}")
+        stop_mock = AsyncMock(
+            side_effect=lambda name=name: events.append(f"stop {name}")
+        )
+        component = MagicMock(start=start_mock, stop=stop_mock)
+        monkeypatch.setattr(main_module, name, component)
+        mocks[name] = component
+    return mocks, events
+
+
+async def test_components_are_stopped_in_reverse_order(components):
+    _, events = components
+
+    async with main_module.lifespan(MagicMock()):
+        assert len(events) == 5
+
+    assert events[5:] == [
+        event.replace("start", "stop") for event in reversed(events[:5])
+    ]
+
+
+async def test_failed_start_stops_started_components(components):
+    mocks, events = components
+    error = RuntimeError("pubsub is down")
+    mocks["pubsub_listener"].start.side_effect = error
+
+    with pytest.raises(RuntimeError) as exc_info:
+        async with main_module.lifespan(MagicMock()):
+            pass
+
+    assert exc_info.value is error
+    assert events == [
+        "start redis_manager",
+        "start password_hashing_engine",
+        "start refresh_token_sweeper",
+        "stop refresh_token_sweeper",
+        "stop password_hashing_engine",
+        "stop redis_manager",
+    ]
+    mocks["pubsub_listener"].stop.assert_not_awaited()
+    mocks["hybrid_rate_limit_state"].start.assert_not_called()
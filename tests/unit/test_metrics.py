@@ -0,0 +1,48 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.metrics import MetricsRegistry, metrics
+
+
+def test_registration_is_idempotent_and_typed():
+    registry = MetricsRegistry()
+
+    counter = registry.counter("requests_total", "Запросы")
+    assert registry.counter("requests_total", "Другое описание") is counter
+
+    with pytest.raises(TypeError):
+        registry.gauge("requests_total", "Запросы")
+
+
+def test_snapshot():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Запросы").inc(3)
+    registry.gauge("queue_size", "Очередь", callback=lambda: 7)
+    histogram = registry.histogram("latency_seconds", "Латентность", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+
+    assert registry.snapshot() == {
+        "requests_total": {"type": "counter", "value": 3},
+        "queue_size": {"type": "gauge", "value": 7},
+        "latency_seconds": {
+            "type": "histogram",
+            "count": 4,
+            "sum": 2.65,
+            "buckets": {"0.1": 2, "1": 3, "+Inf": 4},
+        },
+    }
+
+
+async def test_metrics_endpoint(app):
+    metrics.counter("test_metrics_endpoint_total", "Счетчик теста").inc()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://localhost"
+    ) as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["test_metrics_endpoint_total"] == {"type": "counter", "value": 1}
+    assert body["auth_password_hashing_rejected_timeout_total"]["type"] == "counter"
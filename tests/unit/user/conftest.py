@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models  # noqa: F401
+from src.user.models import User, UserProfile
+
+
+@pytest.fixture
+def users() -> dict[UUID, User]:
+    """Пользователи «в БД» для session"""
+    return {}
+
+
+@pytest.fixture
+def session(users) -> AsyncMock:
+    """
+    Сессия-заглушка: execute выполняет выборку get_users_with_profile по UUID,
+    переданным в запрос (id = ANY(:ids)), из users
+    """
+    session = AsyncMock(spec=AsyncSession)
+
+    async def execute(statement):
+        (user_ids,) = statement.compile().params.values()
+        result = MagicMock()
+        result.scalars.return_value = [
+            users[user_id] for user_id in user_ids if user_id in users
+        ]
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+@pytest.fixture
+def make_user(users) -> Callable[..., User]:
+    """Создает пользователя с профилем и добавляет его в users"""
+
+    def make_user(name: str = "User", show_email: bool = False) -> User:
+        user_id = uuid4()
+        user = User(
+            id=user_id,
+            login=f"user_{user_id.hex[:8]}",
+            email=f"{user_id.hex[:8]}@example.com",
+            hashed_password="",
+            has_avatar=False,
+            created_at=datetime(2026, 1, 1),
+            user_profile=UserProfile(
+                id=user_id,
+                name=name,
+                show_email=show_email,
+                show_discord=False,
+                show_telegram=False,
+            ),
+        )
+        users[user_id] = user
+        return user
+
+    return make_user
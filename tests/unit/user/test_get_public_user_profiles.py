@@ -0,0 +1,77 @@
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from src.user.constants import MAX_BATCH_PROFILES
+from src.user.schemas import BatchProfilesRequestSchema
+from src.user.services import UserLoader
+from src.user.usecases.get_public_user_profiles import get_public_user_profiles
+
+
+async def test_profiles_follow_request_order(session, make_user):
+    first, second, third = make_user("First"), make_user("Second", True), make_user()
+
+    result = await get_public_user_profiles([third.id, first.id, second.id], session)
+
+    assert [profile.id for profile in result.profiles] == [
+        third.id,
+        first.id,
+        second.id,
+    ]
+    assert [profile.profile.name for profile in result.profiles] == [
+        "User",
+        "First",
+        "Second",
+    ]
+    # email отдается только при show_email
+    assert [profile.email for profile in result.profiles] == [None, None, second.email]
+    assert result.missing == []
+
+
+async def test_duplicates_are_loaded_and_returned_once(session, make_user):
+    user = make_user()
+
+    result = await get_public_user_profiles([user.id, user.id, user.id], session)
+
+    assert [profile.id for profile in result.profiles] == [user.id]
+    session.execute.assert_awaited_once()
+
+
+async def test_missing_users_are_listed_in_request_order(session, make_user):
+    user, first_missing, second_missing = make_user(), uuid4(), uuid4()
+
+    result = await get_public_user_profiles(
+        [second_missing, user.id, first_missing, second_missing], session
+    )
+
+    assert [profile.id for profile in result.profiles] == [user.id]
+    assert result.missing == [second_missing, first_missing]
+
+
+async def test_loader_serves_already_loaded_users(session, make_user):
+    """
+    С загрузчиком запроса из БД загружаются только пользователи, которых он еще не знает
+    """
+    user, missing = make_user(), uuid4()
+    loader = UserLoader(session)
+    await loader.load(user.id)
+
+    result = await get_public_user_profiles([missing, user.id], session, loader)
+
+    assert [profile.id for profile in result.profiles] == [user.id]
+    assert result.missing == [missing]
+    assert session.execute.await_count == 2
+    (statement,) = session.execute.await_args.args
+    assert list(statement.compile().params.values()) == [[missing]]
+
+
+@pytest.mark.parametrize("count", [0, MAX_BATCH_PROFILES + 1])
+def test_request_size_is_bounded(count):
+    with pytest.raises(ValidationError):
+        BatchProfilesRequestSchema(ids=[uuid4() for _ in range(count)])
+
+
+def test_max_batch_is_accepted():
+    ids = [uuid4() for _ in range(MAX_BATCH_PROFILES)]
+    assert BatchProfilesRequestSchema(ids=ids).ids == ids
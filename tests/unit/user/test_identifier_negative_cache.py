@@ -0,0 +1,39 @@
+import pytest
+
+from src.user.services import identifier_negative_cache_service as service
+
+
+@pytest.fixture
+def cache(monkeypatch, fake_redis):
+    """Отрицательный кэш поверх локальной замены Redis"""
+    monkeypatch.setattr(service, "redis_client", fake_redis())
+    return service.IdentifierNegativeCache(ttl_seconds=60, local_size=100)
+
+
+async def test_missing_identifier_is_cached_case_insensitive(cache):
+    await cache.remember_missing("NoSuchUser")
+
+    assert await cache.is_missing("nosuchuser")
+    assert not await cache.is_missing("OtherUser")
+
+
+async def test_invalidation_wins_over_late_miss(cache):
+    """
+    Промах, прочитанный из БД до коммита регистрации, не возвращается в кэш после инвалидации
+    """
+    await cache.invalidate("NewUser", "new@example.com")
+    await cache.remember_missing("NewUser")
+
+    assert not await cache.is_missing("NewUser")
+
+
+async def test_invalidation_message_evicts_local_entry(cache):
+    """
+    Локальная запись другого воркера сбрасывается сообщением pub/sub
+    """
+    await cache.remember_missing("NewUser")
+    await service.redis_client.delete(cache._key(cache._digest("NewUser")))
+
+    cache.handle_invalidation(cache._digest("NewUser"))
+
+    assert not await cache.is_missing("NewUser")
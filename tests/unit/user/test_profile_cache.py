@@ -0,0 +1,121 @@
+from uuid import uuid4
+
+import pytest
+
+from src.user import UserNotFoundByIdException
+from src.user.services import profile_cache_service as service
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    """Локальная замена Redis вместо настоящего клиента"""
+    client = fake_redis(decode_responses=False)
+    monkeypatch.setattr(service, "redis_bytes_client", client)
+    return client
+
+
+def _cache() -> service.ProfileCache:
+    return service.ProfileCache(ttl_seconds=60, local_size=100)
+
+
+class Loader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.calls = 0
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        return self.data
+
+
+async def test_profile_is_loaded_once_and_shared_via_redis(redis):
+    user_id, load = uuid4(), Loader(b'{"id": 1}')
+    first, second = _cache(), _cache()
+
+    results = [
+        await first.get_or_load(user_id, "me", load),
+        await first.get_or_load(user_id, "me", load),
+        await second.get_or_load(user_id, "me", load),
+    ]
+
+    assert load.calls == 1
+    assert {result.content for result in results} == {b'{"id": 1}'}
+    assert len({result.etag for result in results}) == 1
+    assert (await second.get_or_load(user_id, "public", load)).content == b'{"id": 1}'
+    assert load.calls == 2
+
+
+async def test_invalidation_reaches_other_workers(redis):
+    user_id = uuid4()
+    writer, reader = _cache(), _cache()
+    await reader.get_or_load(user_id, "public", Loader(b"old"))
+
+    await writer.invalidate(user_id)
+    reader.handle_invalidation(str(user_id))
+
+    result = await reader.get_or_load(user_id, "public", Loader(b"new"))
+    assert result.content == b"new"
+
+
+async def test_load_started_before_invalidation_is_not_cached(redis):
+    """
+    Профиль, прочитанный из БД до изменения, не попадает в кэш после инвалидации
+    """
+    user_id, cache = uuid4(), _cache()
+
+    async def stale_load() -> bytes:
+        await cache.invalidate(user_id)  # изменение профиля во время чтения
+        return b"stale"
+
+    assert (await cache.get_or_load(user_id, "me", stale_load)).content == b"stale"
+    result = await cache.get_or_load(user_id, "me", Loader(b"fresh"))
+    assert result.content == b"fresh"
+
+
+async def test_current_etag_is_answered_without_loading(redis):
+    """
+    Актуальный If-None-Match — ответ без данных и без загрузки профиля, изменение меняет ETag
+    """
+    user_id, cache = uuid4(), service.ProfileCache(ttl_seconds=0, local_size=0)
+    etag = (await cache.get_or_load(user_id, "me", Loader(b"v1"))).etag
+
+    load = Loader(b"v1")
+    result = await cache.get_or_load(user_id, "me", load, if_none_match=etag)
+    assert result == (etag, None)
+    assert load.calls == 0
+
+    await cache.invalidate(user_id)
+    result = await cache.get_or_load(user_id, "me", Loader(b"v2"), if_none_match=etag)
+    assert result.etag != etag
+    assert result.content == b"v2"
+
+
+async def test_versions_are_stable_until_invalidation(redis):
+    first_user, second_user, cache = uuid4(), uuid4(), _cache()
+
+    versions = await cache.get_versions([first_user, second_user])
+    assert versions is not None
+    assert await cache.get_versions([first_user, second_user]) == versions
+
+    await cache.invalidate(second_user)
+    changed = await cache.get_versions([first_user, second_user])
+    assert changed is not None
+    assert changed[0] == versions[0]
+    assert changed[1] != versions[1]
+
+
+@pytest.mark.parametrize("ttl_seconds", [60, 0])
+async def test_missing_user_leaves_no_keys(redis, ttl_seconds):
+    """
+    Запрос несуществующего профиля и версий не создает ключей в redis
+    """
+    user_id = uuid4()
+    cache = service.ProfileCache(ttl_seconds=ttl_seconds, local_size=100)
+
+    async def not_found() -> bytes:
+        raise UserNotFoundByIdException()
+
+    with pytest.raises(UserNotFoundByIdException):
+        await cache.get_or_load(user_id, "public", not_found, if_none_match='"x"')
+    assert await cache.get_versions([user_id, uuid4()]) == [None, None]
+    assert await redis.keys("*") == []
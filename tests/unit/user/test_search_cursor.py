@@ -0,0 +1,160 @@
+import importlib
+import json
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from src.user.exceptions import (
+    InvalidSearchCursorException,
+    SearchCursorWithOffsetException,
+)
+from src.user.usecases.search_user_profiles import (
+    decode_search_cursor,
+    encode_search_cursor,
+    search_user_profiles,
+)
+
+search_module = importlib.import_module("src.user.usecases.search_user_profiles")
+
+
+def test_cursor_round_trip():
+    user_id = uuid4()
+    # similarity в postgres — real, значение должно вернуться без потерь
+    score = 0.4285714328289032
+
+    cursor = encode_search_cursor(score, user_id)
+
+    assert "=" not in cursor
+    assert decode_search_cursor(cursor) == (score, user_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor",
+        encode_search_cursor(0.5, uuid4())[:-2],
+        encode_search_cursor(float("nan"), uuid4()),
+    ],
+)
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidSearchCursorException):
+        decode_search_cursor(cursor)
+
+
+@pytest.fixture
+def found(session, make_user, monkeypatch):
+    """
+    Поиск находит двух пользователей (similarity 0.8 и 0.5), версии профилей — из заглушки
+    """
+    users = [make_user("Anna"), make_user("Anne")]
+    rows = MagicMock()
+    rows.all.return_value = [(users[0].id, 0.8), (users[1].id, 0.5)]
+    load = session.execute.side_effect
+
+    async def execute(statement):
+        # поиск выбирает (id, similarity), загрузка профилей — пользователей целиком
+        if len(statement.selected_columns) == 2:
+            return rows
+        return await load(statement)
+
+    async def get_versions(user_ids):
+        return [b"v1" for _ in user_ids]
+
+    session.execute.side_effect = execute
+    monkeypatch.setattr(search_module.profile_cache, "get_versions", get_versions)
+    return users
+
+
+async def test_list_is_returned_without_cursor_pagination(session, found):
+    result = await search_user_profiles("Ann", limit=2, offset=0, session=session)
+
+    assert result.content is not None
+    assert [profile["id"] for profile in json.loads(result.content)] == [
+        str(user.id) for user in found
+    ]
+
+
+async def test_next_cursor_is_returned_in_body(session, found):
+    result = await search_user_profiles(
+        "Ann", limit=2, offset=0, session=session, paginate="cursor"
+    )
+
+    assert result.content is not None
+    page = json.loads(result.content)
+    assert [profile["id"] for profile in page["profiles"]] == [
+        str(user.id) for user in found
+    ]
+    assert decode_search_cursor(page["next_cursor"]) == (0.5, found[1].id)
+
+
+async def test_cursor_implies_cursor_pagination(session, found):
+    result = await search_user_profiles(
+        "Ann",
+        limit=3,
+        offset=0,
+        session=session,
+        cursor=encode_search_cursor(0.9, uuid4()),
+    )
+
+    assert result.content is not None
+    assert set(json.loads(result.content)) == {"profiles", "next_cursor"}
+
+
+async def test_last_page_has_no_cursor(session, found):
+    result = await search_user_profiles(
+        "Ann", limit=3, offset=0, session=session, paginate="cursor"
+    )
+
+    assert result.content is not None
+    assert json.loads(result.content)["next_cursor"] is None
+
+
+async def test_not_modified_page_is_not_loaded(session, found):
+    """
+    ETag учитывает курсор и форму ответа: та же выдача с другим limit или списком
+    вместо страницы — другой ETag
+    """
+    full = await search_user_profiles(
+        "Ann", limit=2, offset=0, session=session, paginate="cursor"
+    )
+    assert full.etag is not None
+
+    cached = await search_user_profiles(
+        "Ann",
+        limit=2,
+        offset=0,
+        session=session,
+        if_none_match=full.etag,
+        paginate="cursor",
+    )
+    last_page = await search_user_profiles(
+        "Ann",
+        limit=3,
+        offset=0,
+        session=session,
+        if_none_match=full.etag,
+        paginate="cursor",
+    )
+    as_list = await search_user_profiles(
+        "Ann", limit=2, offset=0, session=session, if_none_match=full.etag
+    )
+
+    assert cached == (full.etag, None)
+    assert last_page.etag != full.etag
+    assert as_list.etag != full.etag
+    # профили не загружались только для ответа, совпавшего с If-None-Match
+    assert session.execute.await_count == 7
+
+
+async def test_offset_with_cursor_is_rejected(session):
+    with pytest.raises(SearchCursorWithOffsetException):
+        await search_user_profiles(
+            "Ann",
+            limit=20,
+            offset=20,
+            session=session,
+            cursor=encode_search_cursor(0.5, uuid4()),
+        )
+    session.execute.assert_not_awaited()
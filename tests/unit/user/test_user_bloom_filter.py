@@ -0,0 +1,44 @@
+import pytest
+
+from src.user.services import user_bloom_filter_service as service
+
+
+@pytest.fixture
+async def bloom(monkeypatch, fake_redis):
+    """Включенный bloom фильтр поверх локальной замены Redis"""
+    client = fake_redis()
+    monkeypatch.setattr(service, "redis_client", client)
+    await client.set(service.BLOOM_READY_KEY, 1)
+    return service.UserBloomFilter(enabled=True, bits=2**16, hashes=7)
+
+
+async def test_added_values_might_be_contained(bloom):
+    """
+    Добавленные значения всегда "возможно заняты", остальные — по отдельности для login и email
+    """
+    await bloom.add("SuperUniqueLogin", "user@example.com")
+
+    assert await bloom.might_contain(
+        login="SuperUniqueLogin", email="user@example.com"
+    ) == (True, True)
+    assert await bloom.might_contain(
+        login="AnotherLogin", email="user@example.com"
+    ) == (False, True)
+    assert await bloom.might_contain(login="AnotherLogin") == (False, False)
+
+
+async def test_values_are_case_insensitive(bloom):
+    await bloom.add("SuperUniqueLogin", "User@Example.com")
+
+    assert await bloom.might_contain(
+        login="superuniquelogin", email="user@example.com"
+    ) == (True, True)
+
+
+async def test_not_ready_filter_is_not_used(bloom):
+    """
+    Пока фильтр не построен, ответ неизвестен и проверка должна идти в БД
+    """
+    await service.redis_client.delete(service.BLOOM_READY_KEY)
+
+    assert await bloom.might_contain(login="AnotherLogin") is None
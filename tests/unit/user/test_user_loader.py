@@ -0,0 +1,71 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.user import UserNotFoundByIdException
+from src.user.services import user_service as service
+
+
+def _queried_ids(session) -> list[list[UUID]]:
+    """UUID, запрошенные каждым запросом сессии"""
+    return [
+        next(iter(call.args[0].compile().params.values()))
+        for call in session.execute.await_args_list
+    ]
+
+
+async def test_loads_in_the_same_tick_are_batched(session, make_user):
+    first, second = make_user(), make_user()
+    loader = service.UserLoader(session)
+
+    results = await asyncio.gather(
+        loader.load(first.id),
+        loader.load(second.id),
+        loader.load(first.id),
+        loader.load_many([second.id, first.id]),
+    )
+
+    assert results == [first, second, first, {second.id: second, first.id: first}]
+    assert _queried_ids(session) == [[first.id, second.id]]
+    (statement,) = session.execute.await_args.args
+    assert "users.id = ANY" in str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_repeated_ids_are_served_from_identity_map(session, make_user):
+    user, missing_id = make_user(), uuid4()
+    loader = service.UserLoader(session)
+
+    assert await loader.load(user.id) is user
+    with pytest.raises(UserNotFoundByIdException):
+        await loader.load(missing_id)
+    assert await loader.load_many([user.id, missing_id]) == {user.id: user}
+    with pytest.raises(UserNotFoundByIdException):
+        await service.get_user(missing_id, session=session, loader=loader)
+
+    assert _queried_ids(session) == [[user.id], [missing_id]]
+
+
+async def test_failed_query_is_raised_to_every_waiter(session, make_user):
+    """
+    Ошибка запроса передается всем ожидающим (тот же объект исключения),
+    неудачная загрузка не запоминается
+    """
+    user = make_user()
+    error = ConnectionError("db is down")
+    execute, session.execute.side_effect = session.execute.side_effect, error
+    loader = service.UserLoader(session)
+
+    results = await asyncio.gather(
+        loader.load(user.id),
+        loader.load(user.id),
+        loader.load_many([uuid4(), user.id]),
+        return_exceptions=True,
+    )
+
+    assert all(result is error for result in results)
+    assert session.execute.await_count == 1
+
+    session.execute.side_effect = execute
+    assert await loader.load(user.id) is user